@@ -0,0 +1,182 @@
+'''
+Benchmark of the Tcl input file writers on synthetic meshes.
+
+It runs mpc_solver_write_input.write_tcl outside of STKO, using the PyMpc stand-in
+(pympc_standin.py) and the synthetic models of synthetic_model.py, and reports the time
+spent in each phase of the export. Use it to check the scaling of the writers with the
+model size and the number of partitions before and after a change.
+
+Note that mesh queries (shape functions, jacobians, ...) are implemented in python
+by the stand-in, so their cost is higher than in STKO. Compare timings of the same phase
+across revisions, rather than absolute values.
+
+Usage:
+	python benchmarks/bench_export.py [-s SIZE [SIZE ...]] [-p PARTITIONS [PARTITIONS ...]]
+		[-e ELEMENT] [--no-mass] [--no-region] [--no-recorder] [--profile FILE] [--keep DIR]
+
+SIZE is the number of elements along each side of the box (SIZE^3 hexahedra,
+(SIZE+1)^3 nodes): 10, 21, 46 and 99 give about 10^3, 10^4, 10^5 and 10^6 nodes.
+'''
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pympc_standin
+pympc_standin.install()
+import synthetic_model
+
+# the functions timed as export phases: (phase name, module, function name)
+PHASES = (
+	('node map', 'opensees.utils.write_node', 'node_map_ndm_ndf'),
+	('mass map', 'opensees.utils.write_node', 'fill_node_mass_map'),
+	('materials/sections', 'opensees.utils.write_physical_properties', 'write_physical_properties'),
+	('nodes', 'opensees.utils.write_node', 'write_node'),
+	('nodes', 'opensees.utils.write_node', 'write_node_partition'),
+	('nodes', 'opensees.utils.write_node', 'write_node_not_assigned'),
+	('nodes', 'opensees.utils.write_node', 'write_node_not_assigned_partition'),
+	('elements', 'opensees.utils.write_element', 'write_geom'),
+	('elements', 'opensees.utils.write_element', 'write_geom_partition'),
+	('elements', 'opensees.utils.write_element', 'write_inter'),
+	('elements', 'opensees.utils.write_element', 'write_inter_partition'),
+	('analysis steps', 'opensees.utils.write_analysis_steps', 'write_analysis_steps'),
+	('mpco cdata', 'opensees.utils.tcl_input', 'process_info.updateMpcoCdataFiles'),
+	)
+
+class _timer_t:
+	def __init__(self):
+		self.phases = {}
+		self.active = 0
+	def wrap(self, phase, func):
+		def wrapper(*args, **kwargs):
+			# nested phases are accounted to the outermost one
+			self.active += 1
+			start = time.perf_counter()
+			try:
+				return func(*args, **kwargs)
+			finally:
+				self.active -= 1
+				if self.active == 0:
+					self.phases[phase] = self.phases.get(phase, 0.0) + time.perf_counter() - start
+		return wrapper
+
+_timer = _timer_t()
+_timers_installed = False
+
+def _install_timers(timer):
+	global _timers_installed
+	if _timers_installed:
+		return
+	_timers_installed = True
+	import importlib
+	for phase, module_name, func_name in PHASES:
+		target = importlib.import_module(module_name)
+		names = func_name.split('.')
+		for name in names[:-1]:
+			target = getattr(target, name)
+		setattr(target, names[-1], timer.wrap(phase, getattr(target, names[-1])))
+
+def _dir_size(path):
+	size = 0
+	for root, _, files in os.walk(path):
+		for fname in files:
+			size += os.path.getsize(os.path.join(root, fname))
+	return size
+
+def run(opt, out_dir, profile = None):
+	'''
+	builds the synthetic model and exports it in out_dir.
+	returns a dict with the build time, the total export time and the time of each phase
+	'''
+	import opensees.mpc_solver_write_input as writer
+	start = time.perf_counter()
+	doc = synthetic_model.build(opt)
+	build_time = time.perf_counter() - start
+	timer = _timer
+	timer.phases = {}
+	_install_timers(timer)
+	stdout = sys.stdout
+	sys.stdout = open(os.devnull, 'w')
+	try:
+		start = time.perf_counter()
+		if profile:
+			import cProfile
+			cProfile.runctx('writer.write_tcl(out_dir)', globals(), {'writer': writer, 'out_dir': out_dir}, profile)
+		else:
+			writer.write_tcl(out_dir)
+		total = time.perf_counter() - start
+	finally:
+		sys.stdout.close()
+		sys.stdout = stdout
+	return {
+		'nodes': len(doc.mesh.nodes),
+		'elements': len(doc.mesh.elements),
+		'build': build_time,
+		'export': total,
+		'phases': timer.phases,
+		'size': _dir_size(out_dir),
+		}
+
+def main(argv = None):
+	parser = argparse.ArgumentParser(description = 'Benchmark of the Tcl input file writers on synthetic meshes')
+	parser.add_argument('-s', '--sizes', type = int, nargs = '+', default = [10, 21], help = 'number of elements along each side of the box')
+	parser.add_argument('-p', '--partitions', type = int, nargs = '+', default = [1], help = 'number of partitions')
+	parser.add_argument('-e', '--element', default = 'stdBrick', help = 'the brick element property (default = stdBrick)')
+	parser.add_argument('--no-mass', action = 'store_true', help = 'do not assign a volume mass')
+	parser.add_argument('--no-region', action = 'store_true', help = 'do not add a region')
+	parser.add_argument('--no-recorder', action = 'store_true', help = 'do not add an MPCO recorder')
+	parser.add_argument('--profile', default = None, help = 'write cProfile stats of the last run to this file')
+	parser.add_argument('--keep', default = None, help = 'export in this directory instead of a temporary one (last run only)')
+	args = parser.parse_args(argv)
+
+	phase_names = []
+	for phase, _, _ in PHASES:
+		if not phase in phase_names:
+			phase_names.append(phase)
+	# warm-up: the first export imports all solver modules
+	opt = synthetic_model.model_options_t()
+	opt.nx = opt.ny = opt.nz = 1
+	out_dir = tempfile.mkdtemp(prefix = 'stko_bench_')
+	try:
+		run(opt, out_dir)
+	finally:
+		shutil.rmtree(out_dir, ignore_errors = True)
+	
+	header = ['nodes', 'NP', 'build'] + phase_names + ['export', 'MB']
+	print(' | '.join('{:>10}'.format(i[:10]) for i in header))
+	runs = [(size, np) for size in args.sizes for np in args.partitions]
+	for irun, (size, np) in enumerate(runs):
+		last = irun == len(runs) - 1
+		opt = synthetic_model.model_options_t()
+		opt.nx = opt.ny = opt.nz = size
+		opt.partitions = np
+		opt.element = args.element
+		opt.mass = not args.no_mass
+		opt.region = not args.no_region
+		opt.recorder = not args.no_recorder
+		if last and args.keep:
+			out_dir = os.path.abspath(args.keep)
+			if os.path.exists(out_dir):
+				shutil.rmtree(out_dir)
+			cleanup = False
+		else:
+			out_dir = tempfile.mkdtemp(prefix = 'stko_bench_')
+			cleanup = True
+		try:
+			res = run(opt, out_dir, profile = args.profile if last else None)
+		finally:
+			if cleanup:
+				shutil.rmtree(out_dir, ignore_errors = True)
+		row = [res['nodes'], np, res['build']] + [res['phases'].get(i, 0.0) for i in phase_names] + [res['export'], res['size']/1.0e6]
+		print(' | '.join('{:>10}'.format(i) if isinstance(i, int) else '{:>10.3f}'.format(i) for i in row))
+	if args.profile:
+		import pstats
+		pstats.Stats(args.profile).sort_stats('cumulative').print_stats(30)
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
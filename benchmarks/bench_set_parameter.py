@@ -0,0 +1,171 @@
+'''
+Benchmark of the setParameter writer in "From Table" mode.
+
+It exports a synthetic model (see synthetic_model.py) with a setParameter step driven by
+a synthetic Random Material Table, and reports the size, the number of commands and the
+load time of the generated setParameter file. The same values are reported for the
+equivalent file with one command per element and argument (the format written before
+the commands were grouped by value), expanded from the generated one.
+
+The load time is the time needed to source the file in a Tcl interpreter (tclsh by default),
+where setParameter is a procedure that does nothing. It measures the cost of parsing and
+dispatching the commands, not the cost of updating the parameters in OpenSees.
+
+Usage:
+	python benchmarks/bench_set_parameter.py [-s SIZE [SIZE ...]] [-p PARTITIONS [PARTITIONS ...]]
+		[-m MATERIALS] [-a ARGUMENTS] [--tcl INTERPRETER] [--keep DIR]
+
+SIZE is the number of elements along each side of the box (SIZE^3 hexahedra).
+'''
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pympc_standin
+pympc_standin.install()
+import synthetic_model
+import numpy as np
+
+def write_table(fname, opt, materials, arguments, seed = 0):
+	'''
+	writes a Random Material Table with the given number of materials and arguments,
+	and one material point for each element, at random positions in the box
+	'''
+	rng = np.random.default_rng(seed)
+	npts = opt.nx*opt.ny*opt.nz
+	values = rng.uniform(1.0, 2.0, (materials, arguments))
+	points = rng.uniform(0.0, 1.0, (npts, 3))*np.asarray([opt.nx, opt.ny, opt.nz], dtype=float)
+	ids = rng.integers(1, materials + 1, npts)
+	with open(fname, 'w') as f:
+		f.write('{}\n'.format(materials))
+		f.write('{}\n'.format(','.join('arg{}'.format(j+1) for j in range(arguments))))
+		f.write('{}\n'.format(npts))
+		for i in range(materials):
+			f.write('{},{}\n'.format(i + 1, ','.join('{:.6g}'.format(v) for v in values[i])))
+		for i in range(npts):
+			f.write('{:.6g},{:.6g},{:.6g},{}\n'.format(points[i, 0], points[i, 1], points[i, 2], ids[i]))
+
+def expand(fname, out_name):
+	'''
+	expands the grouped setParameter commands of fname into one command per element and argument.
+	returns the number of commands
+	'''
+	with open(fname, 'r') as f:
+		lines = f.read().replace('\\\n', ' ').split('\n')
+	count = 0
+	with open(out_name, 'w') as f:
+		for line in lines:
+			words = line.split()
+			if len(words) > 0 and words[0] == 'setParameter':
+				# setParameter -val VALUE -ele ID1 ID2 ... ARG
+				indent = line[:len(line) - len(line.lstrip())]
+				for ele_id in words[4:-1]:
+					f.write('{}setParameter -val {} -ele {} {}\n'.format(indent, words[2], ele_id, words[-1]))
+					count += 1
+			elif line:
+				f.write('{}\n'.format(line))
+	return count
+
+def count_commands(fname):
+	with open(fname, 'r') as f:
+		return sum(1 for line in f if line.lstrip().startswith('setParameter'))
+
+def load_time(interpreter, fname, partitions):
+	'''
+	returns the time (in seconds) needed to source fname in all processes,
+	or None if the interpreter is not available
+	'''
+	script = (
+		'proc setParameter {args} {}\n'
+		'set start [clock microseconds]\n'
+		'for {set STKO_VAR_process_id 0} {$STKO_VAR_process_id < %d} {incr STKO_VAR_process_id} {\n'
+		'\tsource {%s}\n'
+		'}\n'
+		'puts [expr {([clock microseconds] - $start)*1.0e-6}]\n') % (max(1, partitions), fname)
+	try:
+		res = subprocess.run([interpreter], input = script, capture_output = True, text = True, check = True)
+		return float(res.stdout.strip().split()[-1])
+	except (OSError, subprocess.CalledProcessError, ValueError, IndexError):
+		return None
+
+def run(opt, out_dir, materials, arguments):
+	'''
+	builds the synthetic model with a setParameter step and exports it in out_dir.
+	returns the name of the generated setParameter file
+	'''
+	import opensees.mpc_solver_write_input as writer
+	table = os.path.join(out_dir, 'table.rmt')
+	write_table(table, opt, materials, arguments)
+	doc = synthetic_model.build(opt)
+	sid = len(doc.analysisSteps) + 1
+	doc.analysisSteps[sid] = pympc_standin.component_t(sid, 'setParameter',
+		'opensees.analysis_steps.Misc_commands.setParameter', 'Misc_commands', {
+		'SelectionSets': [1],
+		'Include Auto-Generated Elements': False,
+		'Parameter Mode': 'From Table',
+		'Table File': table})
+	stdout = sys.stdout
+	sys.stdout = open(os.devnull, 'w')
+	try:
+		writer.write_tcl(out_dir)
+	finally:
+		sys.stdout.close()
+		sys.stdout = stdout
+	return os.path.join(out_dir, 'setParameter_{}.tcl'.format(sid))
+
+def main(argv = None):
+	parser = argparse.ArgumentParser(description = 'Benchmark of the setParameter writer in "From Table" mode')
+	parser.add_argument('-s', '--sizes', type = int, nargs = '+', default = [10, 21], help = 'number of elements along each side of the box')
+	parser.add_argument('-p', '--partitions', type = int, nargs = '+', default = [1], help = 'number of partitions')
+	parser.add_argument('-m', '--materials', type = int, default = 500, help = 'number of materials in the table (default = 500)')
+	parser.add_argument('-a', '--arguments', type = int, default = 3, help = 'number of arguments of each material (default = 3)')
+	parser.add_argument('--tcl', default = 'tclsh', help = 'the Tcl interpreter used to measure the load time (default = tclsh)')
+	parser.add_argument('--keep', default = None, help = 'export in this directory instead of a temporary one (last run only)')
+	args = parser.parse_args(argv)
+
+	header = ['elements', 'NP', 'MB', 'commands', 'load', 'MB (1/ele)', 'cmd (1/ele)', 'load (1/ele)']
+	print(' | '.join('{:>12}'.format(i) for i in header))
+	runs = [(size, parts) for size in args.sizes for parts in args.partitions]
+	for irun, (size, parts) in enumerate(runs):
+		last = irun == len(runs) - 1
+		opt = synthetic_model.model_options_t()
+		opt.nx = opt.ny = opt.nz = size
+		opt.partitions = parts
+		opt.mass = False
+		opt.region = False
+		opt.recorder = False
+		if last and args.keep:
+			out_dir = os.path.abspath(args.keep)
+			if os.path.exists(out_dir):
+				shutil.rmtree(out_dir)
+			os.makedirs(out_dir)
+			cleanup = False
+		else:
+			out_dir = tempfile.mkdtemp(prefix = 'stko_bench_')
+			cleanup = True
+		try:
+			grouped = run(opt, out_dir, args.materials, args.arguments)
+			expanded = os.path.join(out_dir, 'setParameter_expanded.tcl')
+			expanded_count = expand(grouped, expanded)
+			row = [size**3, parts,
+				os.path.getsize(grouped)/1.0e6, count_commands(grouped), load_time(args.tcl, grouped, parts),
+				os.path.getsize(expanded)/1.0e6, expanded_count, load_time(args.tcl, expanded, parts)]
+		finally:
+			if cleanup:
+				shutil.rmtree(out_dir, ignore_errors = True)
+		def fmt(i):
+			if i is None:
+				return '{:>12}'.format('-')
+			if isinstance(i, int):
+				return '{:>12}'.format(i)
+			return '{:>12.3f}'.format(i)
+		print(' | '.join(fmt(i) for i in row))
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
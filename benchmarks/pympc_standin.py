@@ -0,0 +1,599 @@
+'''
+A lightweight stand-in for the PyMpc API, used to run the input file writers
+outside of STKO (see bench_export.py).
+
+It implements only what the writers need to export a model:
+- the document (geometries, mesh, partitions, properties, conditions, analysis steps, ...)
+- XObjects, whose attributes are created from the makeXObjectMetaData of each module
+- permissive placeholders for all other PyMpc names (GUI, charts, enums, units, ...)
+
+Usage:
+	import pympc_standin
+	pympc_standin.install()
+	doc = pympc_standin.document_t()
+	...
+	pympc_standin.set_document(doc)
+'''
+
+import os
+import re
+import math
+import sys
+import types
+
+class _auto_t:
+	'''
+	a permissive placeholder: attributes, calls and arithmetic always succeed.
+	attributes are cached, so that enum-like values (e.g. MpcAttributeType.Real)
+	are unique objects that can be compared by identity
+	'''
+	def __init__(self, name = 'auto', *args, **kwargs):
+		self.__dict__['_name'] = name
+		self.__dict__['_children'] = {}
+	def __mro_entries__(self, bases):
+		# classes derived from a placeholder (e.g. GUI widgets) are plain classes
+		return (object,)
+	def __getattr__(self, name):
+		if name.startswith('__'):
+			raise AttributeError(name)
+		item = self._children.get(name, None)
+		if item is None:
+			item = _auto_t('{}.{}'.format(self._name, name))
+			self._children[name] = item
+		return item
+	def __setattr__(self, name, value):
+		self._children[name] = value
+	def __call__(self, *args, **kwargs):
+		return _auto_t('{}()'.format(self._name))
+	def __repr__(self):
+		return self._name
+	def __iter__(self):
+		return iter([])
+	def __len__(self):
+		return 0
+	def __bool__(self):
+		return True
+	def __hash__(self):
+		return id(self)
+	def __eq__(self, other):
+		return self is other
+	def _op(self, *args):
+		return self
+	__add__ = __radd__ = __sub__ = __rsub__ = _op
+	__mul__ = __rmul__ = __truediv__ = __rtruediv__ = __pow__ = _op
+	__neg__ = __pos__ = _op
+
+class dict_t(dict):
+	'''
+	a dict with the getlastkey method of PyMpc collections
+	'''
+	def getlastkey(self, default):
+		return max(self.keys()) if len(self) > 0 else default
+
+class vec3_t:
+	def __init__(self, x = 0.0, y = 0.0, z = 0.0):
+		self.x = x
+		self.y = y
+		self.z = z
+	def __getitem__(self, i):
+		return (self.x, self.y, self.z)[i]
+	def __sub__(self, other):
+		return vec3_t(self.x - other.x, self.y - other.y, self.z - other.z)
+	def __add__(self, other):
+		return vec3_t(self.x + other.x, self.y + other.y, self.z + other.z)
+
+# =================================================================================
+# meta-data (what makeXObjectMetaData creates)
+# =================================================================================
+
+class attribute_meta_data_t:
+	'''
+	stand-in for MpcAttributeMetaData.
+	only type, name, default value and source list are relevant here
+	'''
+	def __init__(self):
+		self.__dict__['default'] = None
+		self.__dict__['source_list'] = []
+		self.__dict__['_other'] = _auto_t('MpcAttributeMetaData')
+	def __getattr__(self, name):
+		if name.startswith('__'):
+			raise AttributeError(name)
+		return getattr(self._other, name)
+	def setDefault(self, value):
+		self.__dict__['default'] = value
+	def setSourceList(self, value):
+		self.__dict__['source_list'] = list(value)
+
+class xobject_meta_data_t:
+	'''
+	stand-in for MpcXObjectMetaData
+	'''
+	def __init__(self):
+		self.__dict__['attributes'] = []
+		self.__dict__['exclusive'] = []
+		self.__dict__['_other'] = _auto_t('MpcXObjectMetaData')
+	def __getattr__(self, name):
+		if name.startswith('__'):
+			raise AttributeError(name)
+		return getattr(self._other, name)
+	def addAttribute(self, at):
+		self.attributes.append(at)
+	def getAttribute(self, name):
+		for at in self.attributes:
+			if at.name == name:
+				return at
+		return None
+	def setBooleanAutoExclusiveDependency(self, source, target):
+		self.exclusive.append((source.name, target.name))
+
+# =================================================================================
+# XObjects
+# =================================================================================
+
+class quantity_t:
+	def __init__(self, value):
+		self.value = value
+		self.referenceValue = value
+
+class attribute_t:
+	'''
+	stand-in for MpcAttribute. The value is taken from the default value in the meta-data
+	'''
+	def __init__(self, meta, value):
+		self.meta = meta
+		self.set(value)
+	def set(self, value):
+		self.value = value
+	@property
+	def boolean(self):
+		return bool(self.value)
+	@property
+	def integer(self):
+		return int(self.value)
+	@property
+	def real(self):
+		return float(self.value)
+	@property
+	def string(self):
+		return str(self.value)
+	@property
+	def index(self):
+		return int(self.value)
+	@property
+	def indexVector(self):
+		return list(self.value)
+	@property
+	def stringVector(self):
+		return list(self.value)
+	@property
+	def quantityScalar(self):
+		return quantity_t(float(self.value))
+	@property
+	def quantityVector(self):
+		return quantity_t(list(self.value))
+	@property
+	def quantityVector3(self):
+		v = self.value
+		if isinstance(v, (int, float)):
+			v = (v, v, v)
+		elif len(v) == 0:
+			v = (0.0, 0.0, 0.0)
+		return quantity_t(vec3_t(*v))
+	@property
+	def customObject(self):
+		return self.value
+
+def _default_value(meta):
+	if meta.default is not None:
+		return meta.default
+	T = _attribute_type
+	t = meta.type
+	if t is T.Boolean:
+		return False
+	if t is T.Integer or t is T.Index:
+		return 0
+	if t is T.Real or t is T.QuantityScalar:
+		return 0.0
+	if t is T.String:
+		return meta.source_list[0] if len(meta.source_list) > 0 else ''
+	if t is T.IndexVector or t is T.QuantityVector or t is T.QuantityVector3 or t is T.StringVector:
+		return []
+	return None
+
+class component_t:
+	'''
+	a component of the document (physical property, element property, condition, ...)
+	owning an XObject
+	'''
+	def __init__(self, id, name, module_name, xnamespace, values = None):
+		self.id = id
+		self.componentId = id
+		self.name = name
+		self.componentName = name
+		self.XObject = xobject_t(self, module_name, xnamespace, values)
+
+class xobject_t:
+	'''
+	stand-in for MpcXObject, with attributes created from the module's meta-data
+	'''
+	def __init__(self, parent, module_name, xnamespace, values = None):
+		import importlib
+		self.parent = parent
+		self.Xnamespace = xnamespace
+		self.name = module_name.split('.')[-1]
+		module = importlib.import_module(module_name)
+		meta = module.makeXObjectMetaData()
+		self.attributes = {}
+		for at in meta.attributes:
+			self.attributes[at.name] = attribute_t(at, _default_value(at))
+		if values:
+			for name, value in values.items():
+				if not name in self.attributes:
+					raise Exception('unknown attribute "{}" in {}'.format(name, module_name))
+				self.attributes[name].set(value)
+		# booleans driven by a string attribute (e.g. "Dimension" -> "2D", "3D")
+		for source, target in meta.exclusive:
+			self.attributes[target].set(self.attributes[source].string == target)
+	def getAttribute(self, name):
+		return self.attributes.get(name, None)
+
+# =================================================================================
+# document and mesh
+# =================================================================================
+
+class node_t:
+	def __init__(self, id, x, y, z):
+		self.id = id
+		self.x = x
+		self.y = y
+		self.z = z
+		self.position = vec3_t(x, y, z)
+
+class integration_point_t:
+	def __init__(self, x, y, z, w):
+		self.x = x
+		self.y = y
+		self.z = z
+		self.w = w
+
+class integration_rule_t:
+	def __init__(self, points):
+		self.integrationPoints = points
+
+class matrix_t:
+	'''
+	stand-in for the jacobian matrix (rows = parametric directions).
+	det is the measure of the mapping (length, area or volume)
+	'''
+	def __init__(self, rows):
+		self.rows = rows
+	def det(self):
+		J = self.rows
+		if len(J) == 1:
+			return math.sqrt(sum(i*i for i in J[0]))
+		if len(J) == 2:
+			a, b = J
+			c = (a[1]*b[2] - a[2]*b[1], a[2]*b[0] - a[0]*b[2], a[0]*b[1] - a[1]*b[0])
+			return math.sqrt(sum(i*i for i in c))
+		a, b, c = J
+		return (a[0]*(b[1]*c[2] - b[2]*c[1]) - a[1]*(b[0]*c[2] - b[2]*c[0]) + a[2]*(b[0]*c[1] - b[1]*c[0]))
+
+# linear lagrangian shape functions. key = number of nodes, value = (natural coordinates of nodes, parametric dimension)
+_G = 1.0/math.sqrt(3.0)
+_SHAPES = {
+	2: (((-1.0,), (1.0,)), 1),
+	4: (((-1.0, -1.0), (1.0, -1.0), (1.0, 1.0), (-1.0, 1.0)), 2),
+	8: (((-1.0, -1.0, -1.0), (1.0, -1.0, -1.0), (1.0, 1.0, -1.0), (-1.0, 1.0, -1.0),
+		(-1.0, -1.0, 1.0), (1.0, -1.0, 1.0), (1.0, 1.0, 1.0), (-1.0, 1.0, 1.0)), 3),
+	}
+_RULES = {}
+def _rule(dim):
+	# 2x2x2 gauss rule
+	rule = _RULES.get(dim, None)
+	if rule is None:
+		points = []
+		for k in ((-_G, _G) if dim > 2 else (0.0,)):
+			for j in ((-_G, _G) if dim > 1 else (0.0,)):
+				for i in (-_G, _G):
+					points.append(integration_point_t(i, j, k, 1.0))
+		rule = integration_rule_t(points)
+		_RULES[dim] = rule
+	return rule
+
+class element_t:
+	def __init__(self, id, nodes, family):
+		self.id = id
+		self.nodes = nodes
+		self.family = family
+	def geometryFamilyType(self):
+		return self.family
+	@property
+	def integrationRule(self):
+		return _rule(_SHAPES[len(self.nodes)][1])
+	def shapeFunctionsAt(self, gp):
+		xi = (gp.x, gp.y, gp.z)
+		N = []
+		for nat in _SHAPES[len(self.nodes)][0]:
+			v = 1.0
+			for d in range(len(nat)):
+				v *= 0.5*(1.0 + nat[d]*xi[d])
+			N.append(v)
+		return N
+	def jacobianAt(self, gp):
+		xi = (gp.x, gp.y, gp.z)
+		natural, dim = _SHAPES[len(self.nodes)]
+		rows = []
+		for r in range(dim):
+			row = [0.0, 0.0, 0.0]
+			for nat, node in zip(natural, self.nodes):
+				v = 0.5*nat[r]
+				for d in range(dim):
+					if d != r:
+						v *= 0.5*(1.0 + nat[d]*xi[d])
+				row[0] += v*node.x
+				row[1] += v*node.y
+				row[2] += v*node.z
+			rows.append(row)
+		return matrix_t(rows)
+	def computeCenter(self):
+		# the point at the natural center of the element
+		N = self.shapeFunctionsAt(integration_point_t(0.0, 0.0, 0.0, 0.0))
+		C = vec3_t()
+		for Ni, node in zip(N, self.nodes):
+			C.x += Ni*node.x
+			C.y += Ni*node.y
+			C.z += Ni*node.z
+		return C
+	def numberOfMasterNodes(self):
+		return 0
+	def numberOfSlaveNodes(self):
+		return 0
+
+class domain_t:
+	def __init__(self, id, elements):
+		self.id = id
+		self.elements = elements
+
+class meshed_geometry_t:
+	def __init__(self):
+		self.vertices = []
+		self.edges = []
+		self.faces = []
+		self.solids = []
+
+class property_assignment_t:
+	def __init__(self, num_vertices, num_edges, num_faces, num_solids):
+		self.onVertices = [None]*num_vertices
+		self.onEdges = [None]*num_edges
+		self.onFaces = [None]*num_faces
+		self.onSolids = [None]*num_solids
+
+class geometry_t:
+	def __init__(self, id, name, mesh_of_geom):
+		self.id = id
+		self.name = name
+		nv = len(mesh_of_geom.vertices)
+		ne = len(mesh_of_geom.edges)
+		nf = len(mesh_of_geom.faces)
+		ns = len(mesh_of_geom.solids)
+		self.physicalPropertyAssignment = property_assignment_t(nv, ne, nf, ns)
+		self.elementPropertyAssignment = property_assignment_t(nv, ne, nf, ns)
+
+class geometry_subset_t:
+	def __init__(self, vertices = None, edges = None, faces = None, solids = None):
+		self.vertices = vertices or []
+		self.edges = edges or []
+		self.faces = faces or []
+		self.solids = solids or []
+
+class assignment_t:
+	def __init__(self):
+		self.geometries = {}
+		self.interactions = []
+
+class selection_set_t:
+	def __init__(self, id, name):
+		self.id = id
+		self.name = name
+		self.geometries = {}
+		self.interactions = []
+
+class partition_data_t:
+	'''
+	stand-in for the partition data of the mesh.
+	a node is on all partitions of the elements connected to it
+	'''
+	def __init__(self, element_partition, node_partitions):
+		self.element_partition = element_partition
+		self.node_partitions = node_partitions
+		num = 1
+		for p in element_partition.values():
+			num = max(num, p + 1)
+		self.partitions = list(range(num)) if len(element_partition) > 0 and num > 1 else []
+	def elementPartition(self, ele_id):
+		return self.element_partition.get(ele_id, 0)
+	def isNodeOnParition(self, node_id, process_id):
+		return process_id in self.node_partitions.get(node_id, (0,))
+	def nodePartition(self, node_id):
+		return self.node_partitions.get(node_id, (0,))[0]
+
+class mesh_t:
+	def __init__(self):
+		self.nodes = dict_t()
+		self.elements = dict_t()
+		self.meshedGeometries = {}
+		self.meshedInteractions = {}
+		self.partitionData = partition_data_t({}, {})
+	def getMeshedGeometry(self, id):
+		return self.meshedGeometries.get(id, None)
+	def getMeshedInteraction(self, id):
+		return self.meshedInteractions.get(id, None)
+	def getElement(self, id):
+		return self.elements.get(id, None)
+
+class document_t:
+	def __init__(self):
+		self.mesh = mesh_t()
+		self.geometries = dict_t()
+		self.interactions = dict_t()
+		self.physicalProperties = dict_t()
+		self.elementProperties = dict_t()
+		self.conditions = dict_t()
+		self.definitions = dict_t()
+		self.analysisSteps = dict_t()
+		self.selectionSets = dict_t()
+	def unregisterMetaDataAll(self):
+		pass
+
+class monitor_t:
+	'''
+	a silent progress monitor
+	'''
+	def __getattr__(self, name):
+		return lambda *args, **kwargs: None
+
+class mesh_io_mpco_cdata_t:
+	'''
+	stand-in for MpcMeshIOMpcoCdata. writes only the node and element sections
+	'''
+	def __init__(self, fname):
+		self.fname = fname
+		self.partition = None
+	def setPartition(self, partition):
+		self.partition = partition
+	def write(self, mesh):
+		pd = mesh.partitionData
+		with open(self.fname, 'w') as f:
+			f.write('*NODES\n')
+			for node_id, node in mesh.nodes.items():
+				if self.partition is None or pd.isNodeOnParition(node_id, self.partition):
+					f.write('{} {} {} {}\n'.format(node_id, node.x, node.y, node.z))
+			f.write('*ELEMENTS\n')
+			for ele_id, ele in mesh.elements.items():
+				if self.partition is None or pd.elementPartition(ele_id) == self.partition:
+					f.write('{} {}\n'.format(ele_id, ' '.join(str(node.id) for node in ele.nodes)))
+
+# =================================================================================
+# installation
+# =================================================================================
+
+class _auto_module_t(types.ModuleType):
+	'''
+	a module whose missing names are placeholders
+	'''
+	def __getattr__(self, name):
+		if name.startswith('__'):
+			raise AttributeError(name)
+		item = _auto_t('{}.{}'.format(self.__name__, name))
+		setattr(self, name, item)
+		return item
+
+# GUI packages shipped with STKO. They are imported by some modules (testers, dialogs, plots)
+# but they are never used when writing the input files
+_HOST_PACKAGES = ('PySide2', 'shiboken2', 'matplotlib', 'mpl_toolkits')
+
+class _host_finder_t:
+	'''
+	a meta path finder that provides placeholder modules for the missing host packages
+	'''
+	def __init__(self, packages):
+		self.packages = packages
+	def find_spec(self, fullname, path, target = None):
+		import importlib.machinery
+		if fullname.split('.')[0] in self.packages:
+			return importlib.machinery.ModuleSpec(fullname, self, is_package = True)
+		return None
+	def create_module(self, spec):
+		module = _auto_module_t(spec.name)
+		module.__path__ = []
+		return module
+	def exec_module(self, module):
+		pass
+
+_attribute_type = _auto_t('MpcAttributeType')
+_document = None
+_monitor = monitor_t()
+_solvers_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def set_document(doc):
+	global _document
+	_document = doc
+
+def _all_mpc_names():
+	'''
+	all Mpc* and Fx* names used by the solver modules
+	'''
+	names = set()
+	pattern = re.compile(r'\b(?:Mpc|Fx)[A-Za-z0-9_]+')
+	for path, _, files in os.walk(os.path.join(_solvers_dir, 'opensees')):
+		for fname in files:
+			if fname.endswith('.py'):
+				with open(os.path.join(path, fname), 'r', encoding='utf-8', errors='ignore') as f:
+					names.update(pattern.findall(f.read()))
+	return names
+
+def install():
+	'''
+	installs the PyMpc stand-in modules in sys.modules
+	'''
+	if 'PyMpc' in sys.modules:
+		return
+	PyMpc = _auto_module_t('PyMpc')
+	App = _auto_module_t('PyMpc.App')
+	Utils = _auto_module_t('PyMpc.Utils')
+	Units = _auto_module_t('PyMpc.Units')
+	Math = _auto_module_t('PyMpc.Math')
+	IO = _auto_module_t('PyMpc.IO')
+	# App
+	App.caeDocument = lambda: _document
+	App.monitor = lambda: _monitor
+	App.currentSolverCommand = lambda: ''
+	App.getReferencedComponents = lambda *args: []
+	App.getReferencingComponents = lambda *args: []
+	App.updateActiveView = lambda *args: None
+	# Utils
+	Utils.get_external_solvers_dir = lambda: _solvers_dir
+	# Units
+	for name in ('L', 'F', 'M', 't', 'T', 'l'):
+		setattr(Units, name, _auto_t('Units.{}'.format(name)))
+	# IO
+	IO.write_cout = lambda x: sys.stdout.write(x)
+	IO.write_cerr = lambda x: sys.stderr.write(x)
+	# Math
+	Math.vec3 = vec3_t
+	Math.double_array = lambda x = None: list(x) if x is not None else []
+	Math.int_array = lambda x = None: list(x) if x is not None else []
+	Math.mat = lambda *args: _auto_t('Math.mat')
+	Math.vec = lambda *args: _auto_t('Math.vec')
+	Math.vertex = lambda *args: _auto_t('Math.vertex')
+	Math.quaternion = lambda *args: _auto_t('Math.quaternion')
+	# all Mpc* and Fx* names
+	names = []
+	for name in _all_mpc_names():
+		setattr(PyMpc, name, _auto_t(name))
+		names.append(name)
+	PyMpc.MpcAttributeType = _attribute_type
+	PyMpc.MpcAttributeMetaData = attribute_meta_data_t
+	PyMpc.MpcXObjectMetaData = xobject_meta_data_t
+	PyMpc.MpcMeshIOMpcoCdata = mesh_io_mpco_cdata_t
+	PyMpc.App = App
+	PyMpc.Utils = Utils
+	PyMpc.Units = Units
+	PyMpc.Math = Math
+	PyMpc.IO = IO
+	PyMpc.__all__ = names + ['App', 'Utils', 'Units', 'Math', 'IO']
+	sys.modules['PyMpc'] = PyMpc
+	sys.modules['PyMpc.App'] = App
+	sys.modules['PyMpc.Utils'] = Utils
+	sys.modules['PyMpc.Units'] = Units
+	sys.modules['PyMpc.Math'] = Math
+	sys.modules['PyMpc.IO'] = IO
+	# host packages not available outside of STKO.
+	import importlib.util
+	missing = [i for i in _HOST_PACKAGES if importlib.util.find_spec(i) is None]
+	# other PyMpc sub-modules (IO, ...) are placeholders as well
+	PyMpc.__path__ = []
+	sys.meta_path.append(_host_finder_t(set(missing + ['PyMpc'])))
+	# make opensees and mpc_utils_html importable
+	if not _solvers_dir in sys.path:
+		sys.path.insert(0, _solvers_dir)
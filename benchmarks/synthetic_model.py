@@ -0,0 +1,160 @@
+'''
+Synthetic structured models for the export benchmarks.
+
+A model is a single box geometry of nx*ny*nz hexahedra (1 solid domain and 6 face domains),
+optionally split into slab partitions along X, with:
+- an elastic nD material and a brick element property on the solid
+- a fix condition on the bottom face
+- an optional volume mass condition on the solid
+- an optional region and MPCO recorder
+- a constraint pattern with the fix condition and a static analysis
+'''
+
+import pympc_standin as sti
+
+# face domains of the box: (name, axis, side)
+FACES = (('bottom', 2, 0), ('top', 2, 1), ('left', 0, 0), ('right', 0, 1), ('front', 1, 0), ('back', 1, 1))
+
+class model_options_t:
+	def __init__(self):
+		# number of elements along X, Y and Z
+		self.nx = 10
+		self.ny = 10
+		self.nz = 10
+		# number of partitions (slabs along X)
+		self.partitions = 1
+		# brick element formulation (module name in element_properties.brick_elements)
+		self.element = 'stdBrick'
+		# optional components
+		self.mass = True
+		self.region = True
+		self.recorder = True
+
+def build(opt):
+	'''
+	builds the synthetic document
+	'''
+	import PyMpc
+	hexa = PyMpc.MpcElementGeometryFamilyType.Hexahedron
+	quad = PyMpc.MpcElementGeometryFamilyType.Quadrilateral
+	nx, ny, nz = opt.nx, opt.ny, opt.nz
+	doc = sti.document_t()
+	sti.set_document(doc)
+	mesh = doc.mesh
+
+	# nodes
+	def node_id(i, j, k):
+		return 1 + i + j*(nx+1) + k*(nx+1)*(ny+1)
+	nodes = [None]*((nx+1)*(ny+1)*(nz+1))
+	for k in range(nz+1):
+		for j in range(ny+1):
+			for i in range(nx+1):
+				n = sti.node_t(node_id(i, j, k), float(i), float(j), float(k))
+				nodes[n.id-1] = n
+				mesh.nodes[n.id] = n
+	def node(i, j, k):
+		return nodes[node_id(i, j, k)-1]
+
+	# partitions (slabs along X)
+	P = max(1, opt.partitions)
+	def slab(i):
+		return min(P-1, i*P//nx)
+
+	# solid elements
+	element_partition = {}
+	solid = []
+	eid = 0
+	for k in range(nz):
+		for j in range(ny):
+			for i in range(nx):
+				eid += 1
+				e = sti.element_t(eid, [
+					node(i, j, k), node(i+1, j, k), node(i+1, j+1, k), node(i, j+1, k),
+					node(i, j, k+1), node(i+1, j, k+1), node(i+1, j+1, k+1), node(i, j+1, k+1)], hexa)
+				solid.append(e)
+				mesh.elements[eid] = e
+				if P > 1:
+					element_partition[eid] = slab(i)
+
+	# face elements (not written, they have no element property)
+	mog = sti.meshed_geometry_t()
+	mog.solids.append(sti.domain_t(0, solid))
+	dims = (nx, ny, nz)
+	for face_id, (name, axis, side) in enumerate(FACES):
+		a1, a2 = [a for a in range(3) if a != axis]
+		elements = []
+		for q in range(dims[a2]):
+			for p in range(dims[a1]):
+				def fnode(dp, dq):
+					ijk = [0, 0, 0]
+					ijk[axis] = side*dims[axis]
+					ijk[a1] = p + dp
+					ijk[a2] = q + dq
+					return node(*ijk)
+				eid += 1
+				e = sti.element_t(eid, [fnode(0, 0), fnode(1, 0), fnode(1, 1), fnode(0, 1)], quad)
+				elements.append(e)
+				mesh.elements[eid] = e
+				if P > 1:
+					element_partition[eid] = slab(min(int(min(n.x for n in e.nodes)), nx-1))
+		mog.faces.append(sti.domain_t(face_id, elements))
+	mesh.meshedGeometries[1] = mog
+
+	# node partitions
+	if P > 1:
+		node_partitions = {}
+		for n in nodes:
+			i = int(n.x)
+			parts = sorted(set(slab(ii) for ii in (i-1, i) if 0 <= ii < nx))
+			node_partitions[n.id] = tuple(parts)
+		mesh.partitionData = sti.partition_data_t(element_partition, node_partitions)
+
+	# geometry
+	geom = sti.geometry_t(1, 'Box', mog)
+	doc.geometries[1] = geom
+
+	# physical and element properties
+	mat = sti.component_t(1, 'Elastic', 'opensees.physical_properties.materials.nD.ElasticIsotropic', 'materials.nD',
+		{'E': 30000.0, 'v': 0.2})
+	doc.physicalProperties[1] = mat
+	ele = sti.component_t(1, 'Brick', 'opensees.element_properties.brick_elements.{}'.format(opt.element), 'brick_elements')
+	doc.elementProperties[1] = ele
+	geom.physicalPropertyAssignment.onSolids[0] = mat
+	geom.elementPropertyAssignment.onSolids[0] = ele
+
+	# conditions
+	fix = sti.component_t(1, 'Fix Bottom', 'opensees.conditions.Constraints.sp.fix', 'Constraints.sp',
+		{'Dimension': '3D', 'Ux': True, 'Uy': True, 'Uz': True})
+	fix.assignment = sti.assignment_t()
+	fix.assignment.geometries[geom] = sti.geometry_subset_t(faces = [0])
+	doc.conditions[1] = fix
+	if opt.mass:
+		mass = sti.component_t(2, 'Mass', 'opensees.conditions.Mass.VolumeMass', 'Mass',
+			{'mass': 2.5})
+		mass.assignment = sti.assignment_t()
+		mass.assignment.geometries[geom] = sti.geometry_subset_t(solids = [0])
+		doc.conditions[2] = mass
+
+	# selection set (used by the region)
+	sset = sti.selection_set_t(1, 'All')
+	sset.geometries[1] = sti.geometry_subset_t(solids = [0])
+	doc.selectionSets[1] = sset
+
+	# analysis steps
+	steps = []
+	def add_step(module, xnamespace, values = None):
+		sid = len(steps) + 1
+		step = sti.component_t(sid, module, 'opensees.analysis_steps.{}.{}'.format(xnamespace, module), xnamespace, values)
+		steps.append(step)
+		doc.analysisSteps[sid] = step
+	if opt.region:
+		add_step('region', 'Misc_commands', {'SelectionSets': [1]})
+	if opt.recorder:
+		add_step('MPCORecorder', 'Recorders', {'name': 'results.mpco', 'displacement': True, 'material.stress': True})
+	add_step('constraintPattern', 'Patterns.addPattern', {'sp': [1]})
+	if P > 1:
+		add_step('AnalysesCommand', 'Analyses', {'numbererType': 'Parallel Reverse Cuthill-McKee Numberer', 'system': 'Mumps'})
+	else:
+		add_step('AnalysesCommand', 'Analyses')
+
+	return doc
@@ -0,0 +1,196 @@
+'''
+A headless batch runner for multi-run studies
+(IDA records, parameter sweeps, Random Material Table realizations, ...).
+
+Each item is a directory with an exported model. Models are run through a local
+pool of processes, with the same command line used by mpc_run_solver.run:
+	"command" "script" np
+without opening a terminal for each run.
+
+- at most max_jobs runs are executed at the same time
+- the sum of the MPI ranks (np) of all running jobs never exceeds max_ranks
+- the output of each run is written to RunSolver.log in the model directory
+- the exit code of each run is written to RunSolver.status in the model directory
+- when resuming, directories that already completed successfully are skipped
+
+Usage:
+	python mpc_run_batch.py COMMAND DIR [DIR ...] [-s main.tcl] [-n NP] [-j JOBS] [-r RANKS] [--force]
+or from python:
+	import mpc_run_batch
+	results = mpc_run_batch.run_batch(command, dirs, np = 4, max_ranks = 16)
+'''
+
+import os
+import sys
+import time
+import json
+import shutil
+import subprocess
+import argparse
+
+LOG_FILE_NAME = 'RunSolver.log'
+STATUS_FILE_NAME = 'RunSolver.status'
+
+def _err(msg):
+	return 'Error in mpc_run_batch:\n{}'.format(msg)
+
+def read_status(wdir):
+	'''
+	returns the status of the last run in a directory (a dict), or None
+	'''
+	fname = os.path.join(wdir, STATUS_FILE_NAME)
+	if not os.path.isfile(fname):
+		return None
+	try:
+		with open(fname, 'r') as f:
+			return json.load(f)
+	except Exception:
+		return None
+
+def write_status(wdir, status):
+	fname = os.path.join(wdir, STATUS_FILE_NAME)
+	with open(fname, 'w') as f:
+		json.dump(status, f, indent=1)
+
+class _job_t:
+	def __init__(self, wdir):
+		self.wdir = wdir
+		self.process = None
+		self.log = None
+		self.start = 0.0
+
+def run_batch(command, dirs, script = 'main.tcl', np = 1, max_jobs = None, max_ranks = None, resume = True, poll_interval = 0.5):
+	'''
+	runs all models in dirs and returns a dict (KEY = directory, VALUE = exit code).
+	- command, script, np: the same arguments used by mpc_run_solver.run
+	- max_jobs: the maximum number of concurrent runs (default = max_ranks // np)
+	- max_ranks: the maximum number of MPI ranks in use at the same time (default = cpu count)
+	- resume: if True, skip directories whose last run completed with exit code 0
+	'''
+
+	# check the command. relative paths are resolved here, since each job runs in its own directory
+	if os.path.isfile(command):
+		command = os.path.abspath(command)
+	elif shutil.which(command) is None:
+		raise Exception(_err('Cannot find the command "{}"'.format(command)))
+	
+	# check limits
+	if np < 1:
+		raise Exception(_err('np should be at least 1 (given: {})'.format(np)))
+	if max_ranks is None:
+		max_ranks = max(np, os.cpu_count() or 1)
+	if np > max_ranks:
+		raise Exception(_err('np ({}) exceeds the MPI rank budget ({})'.format(np, max_ranks)))
+	if max_jobs is None:
+		max_jobs = max_ranks // np
+	max_jobs = max(1, min(max_jobs, max_ranks // np))
+
+	# collect jobs
+	results = {}
+	pending = []
+	for wdir in dirs:
+		wdir = os.path.abspath(wdir)
+		if not os.path.isfile(os.path.join(wdir, script)):
+			raise Exception(_err('Cannot find "{}" in "{}"'.format(script, wdir)))
+		if resume:
+			status = read_status(wdir)
+			if status is not None and status.get('exit_code', None) == 0:
+				print('skipping (already completed): {}'.format(wdir))
+				results[wdir] = 0
+				continue
+		pending.append(_job_t(wdir))
+	print('running {} jobs ({} skipped), {} concurrent jobs with {} ranks each'.format(
+		len(pending), len(results), max_jobs, np))
+
+	# process all jobs
+	running = []
+	def launch(job):
+		# returns False if the job cannot be started
+		job.log = open(os.path.join(job.wdir, LOG_FILE_NAME), 'w')
+		job.start = time.time()
+		try:
+			write_status(job.wdir, {'command': [command, script, np], 'start': job.start, 'exit_code': None})
+			job.process = subprocess.Popen(
+				[command, script, str(np)],
+				cwd = job.wdir,
+				stdout = job.log,
+				stderr = subprocess.STDOUT)
+		except Exception as ex:
+			job.log.close()
+			try:
+				write_status(job.wdir, {'command': [command, script, np], 'start': job.start, 'end': time.time(), 'exit_code': None, 'error': str(ex)})
+			except OSError:
+				pass
+			results[job.wdir] = None
+			print('FAILED [cannot start: {}]: {}'.format(ex, job.wdir))
+			return False
+		print('started [{}]: {}'.format(job.process.pid, job.wdir))
+		return True
+	def finalize(job, exit_code):
+		job.log.close()
+		end = time.time()
+		write_status(job.wdir, {'command': [command, script, np], 'start': job.start, 'end': end, 'exit_code': exit_code})
+		results[job.wdir] = exit_code
+		print('{} [exit code = {}, {:.1f} s]: {}'.format(
+			'completed' if exit_code == 0 else 'FAILED', exit_code, end - job.start, job.wdir))
+	def stop(job):
+		# stops a running job. it will be re-run when resuming
+		try:
+			job.process.terminate()
+			job.process.wait()
+		finally:
+			job.log.close()
+		write_status(job.wdir, {'command': [command, script, np], 'start': job.start, 'end': time.time(), 'exit_code': None, 'interrupted': True})
+	try:
+		while pending or running:
+			# start new jobs within the limits
+			while pending and len(running) < max_jobs and (len(running) + 1)*np <= max_ranks:
+				job = pending.pop(0)
+				if launch(job):
+					running.append(job)
+			# check running jobs
+			still_running = []
+			for job in running:
+				exit_code = job.process.poll()
+				if exit_code is None:
+					still_running.append(job)
+				else:
+					finalize(job, exit_code)
+			if len(still_running) == len(running):
+				time.sleep(poll_interval)
+			running = still_running
+	except BaseException:
+		# interrupted (KeyboardInterrupt) or unexpected error:
+		# don't leave orphaned solver processes
+		for job in running:
+			if job.wdir in results:
+				continue # already completed
+			try:
+				stop(job)
+			except Exception:
+				pass
+		raise
+	
+	# summary
+	failed = [wdir for wdir, exit_code in results.items() if exit_code != 0]
+	print('done: {} completed, {} failed'.format(len(results) - len(failed), len(failed)))
+	for wdir in failed:
+		print('    FAILED [exit code = {}]: {}'.format(results[wdir], wdir))
+	return results
+
+def main(argv = None):
+	parser = argparse.ArgumentParser(description = 'Run multiple exported models through a local process pool')
+	parser.add_argument('command', help = 'the solver command (the same used to run a single model)')
+	parser.add_argument('dirs', nargs = '+', help = 'the directories of the exported models')
+	parser.add_argument('-s', '--script', default = 'main.tcl', help = 'the main script in each directory (default = main.tcl)')
+	parser.add_argument('-n', '--np', type = int, default = 1, help = 'the number of MPI ranks of each run (default = 1)')
+	parser.add_argument('-j', '--jobs', type = int, default = None, help = 'the maximum number of concurrent runs (default = RANKS // NP)')
+	parser.add_argument('-r', '--ranks', type = int, default = None, help = 'the maximum number of MPI ranks in use at the same time (default = cpu count)')
+	parser.add_argument('--force', action = 'store_true', help = 'run also the models that already completed successfully')
+	args = parser.parse_args(argv)
+	results = run_batch(args.command, args.dirs, script = args.script, np = args.np,
+		max_jobs = args.jobs, max_ranks = args.ranks, resume = not args.force)
+	return 0 if all(exit_code == 0 for exit_code in results.values()) else 1
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -10,6 +10,7 @@ import opensees.analysis_steps.Analyses.analysis as analysis
 import opensees.analysis_steps.Analyses.analyze as analyze
 import opensees.analysis_steps.Analyses.loadConst as loadConst
 import opensees.analysis_steps.Analyses.wipeAnalysis as wipeAnalysis
+import opensees.utils.checkpoint_utils as cpu
 import PyMpc.App
 import os
 
@@ -98,6 +99,13 @@ def onAttributeChanged(editor, xobj, attribute_name):
 			xobj.getAttribute('min factor').visible = False
 			xobj.getAttribute('max factor incr').visible = False
 			xobj.getAttribute('min factor incr').visible = False
+			xobj.getAttribute('fallback algorithms').visible = False
+			xobj.getAttribute('fallback tests').visible = False
+			xobj.getAttribute('batch analyze').visible = False
+			xobj.getAttribute('max batch steps').visible = False
+			xobj.getAttribute('step controller').visible = False
+			xobj.getAttribute('controller kI').visible = False
+			xobj.getAttribute('controller kP').visible = False
 		else:
 			xobj.getAttribute('Time Step Type').visible = True
 	if is_static:
@@ -206,7 +214,8 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
-			pinfo.out_file.write(template.replace(
+			template = cpu.replace_checkpoint(pinfo, template, True)
+			pinfo.out_file.write(replace_adaptive(template, True).replace(
 			'__initial_num_incr__', str(numIncr_at)).replace(
 			'__max_iter__', str(iter)).replace(
 			'__des_iter__', str(int(des_iter))).replace(
@@ -222,6 +231,7 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
+			template = cpu.replace_checkpoint(pinfo, template, True)
 			pinfo.out_file.write(template.replace(
 			'__initial_num_incr__', str(numIncr_at)).replace(
 			'__total_time__', str(duration)).replace(
@@ -316,7 +326,8 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
-			pinfo.out_file.write(template.replace(
+			template = cpu.replace_checkpoint(pinfo, template, False)
+			pinfo.out_file.write(replace_adaptive(template, False).replace(
 			'__trial_disp_incr__', str(trial_disp_incr)).replace(
 			'__max_iter__', str(iter)).replace(
 			'__des_iter__', str(int(des_iter))).replace(
@@ -334,6 +345,7 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
+			template = cpu.replace_checkpoint(pinfo, template, False)
 			pinfo.out_file.write(template.replace(
 			'__trial_disp_incr__', str(trial_disp_incr)).replace(
 			'__max_iter__', str(iter)).replace(
@@ -358,6 +370,7 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
+			template = cpu.replace_checkpoint(pinfo, template, False)
 			pinfo.out_file.write(template.replace(
 			'__initial_num_incr__', str(numIncr_at)).replace(
 			'__total_time__', str(duration)).replace(
@@ -368,7 +381,8 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
-			pinfo.out_file.write(template.replace(
+			template = cpu.replace_checkpoint(pinfo, template, False)
+			pinfo.out_file.write(replace_adaptive(template, False).replace(
 			'__initial_num_incr__', str(numIncr_at)).replace(
 			'__max_iter__', str(iter)).replace(
 			'__des_iter__', str(int(des_iter))).replace(
@@ -404,6 +418,7 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
+			template = cpu.replace_checkpoint(pinfo, template, False)
 			pinfo.out_file.write(template.replace(
 			'__initial_num_incr__', str(numIncr_at)).replace(
 			'__total_time__', str(duration)).replace(
@@ -414,7 +429,8 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
-			pinfo.out_file.write(template.replace(
+			template = cpu.replace_checkpoint(pinfo, template, False)
+			pinfo.out_file.write(replace_adaptive(template, False).replace(
 			'__initial_num_incr__', str(numIncr_at)).replace(
 			'__max_iter__', str(iter)).replace(
 			'__des_iter__', str(int(des_iter))).replace(
@@ -440,6 +456,7 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
+			template = cpu.replace_checkpoint(pinfo, template, False)
 			pinfo.out_file.write(template.replace(
 			'__initial_num_incr__', str(numIncr_at)).replace(
 			'__total_time__', str(duration)).replace(
@@ -450,7 +467,8 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
-			pinfo.out_file.write(template.replace(
+			template = cpu.replace_checkpoint(pinfo, template, False)
+			pinfo.out_file.write(replace_adaptive(template, False).replace(
 			'__initial_num_incr__', str(numIncr_at)).replace(
 			'__max_iter__', str(iter)).replace(
 			'__des_iter__', str(int(des_iter))).replace(
@@ -473,6 +491,7 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
+			template = cpu.replace_checkpoint(pinfo, template, True)
 			pinfo.out_file.write(template.replace(
 			'__initial_num_incr__', str(numIncr_at)).replace(
 			'__total_time__', str(duration)).replace(
@@ -483,7 +502,8 @@ def writeTcl(pinfo):
 			template_file = open(template_filename, 'r')
 			template = template_file.read()
 			template_file.close()
-			pinfo.out_file.write(template.replace(
+			template = cpu.replace_checkpoint(pinfo, template, True)
+			pinfo.out_file.write(replace_adaptive(template, True).replace(
 			'__initial_num_incr__', str(numIncr_at)).replace(
 			'__max_iter__', str(iter)).replace(
 			'__des_iter__', str(int(des_iter))).replace(
@@ -497,6 +517,9 @@ def writeTcl(pinfo):
 	
 	sopt = ''
 	
+	# checkpoint and restart runtime (written once, only if the document has a checkpoint step)
+	cpu.write_setup(pinfo)
+	
 	# now write the string into the file
 	pinfo.out_file.write('\n{}# analyses command\n'.format(pinfo.indent))
 	pinfo.out_file.write('{}domainChange\n'.format(pinfo.indent))
@@ -526,6 +549,61 @@ def writeTcl(pinfo):
 	# algorithm
 	algorithm.writeTcl_algorithm(pinfo, xobj)
 	
+	# common options of the adaptive templates:
+	# - fallback algorithms (and tests), tried in order before reducing the increment factor,
+	#   then the main test and algorithm are restored
+	# - batch mode: the integrator is re-issued only when the increment changes, and
+	#   (if can_batch) steps are performed in batches while the increment factor is stable.
+	#   batches are possible only if the domain time advances by the increment at each step
+	#   (transient and load control), because it is used to count the committed steps
+	#   when a batch fails
+	# - step controller: the law used to update the increment factor after a converged step
+	def replace_adaptive(template, can_batch):
+		def tcl_list(items):
+			return '{{{}}}'.format(' '.join('{{{}}}'.format(i.strip()) for i in items))
+		def get_list(name):
+			# optional, it may be missing in documents saved by older versions
+			at = xobj.getAttribute(name)
+			if at is None:
+				return []
+			return [i for i in at.stringVector]
+		fallback_algorithms = get_list('fallback algorithms')
+		fallback_tests = get_list('fallback tests')
+		if len(fallback_tests) > len(fallback_algorithms):
+			raise Exception('Error: the number of fallback tests ({}) should not be greater than the number of fallback algorithms ({})'.format(
+				len(fallback_tests), len(fallback_algorithms)))
+		def get_batch():
+			# optional, it may be missing in documents saved by older versions
+			at = xobj.getAttribute('batch analyze')
+			if at is None or not at.boolean:
+				return (0, 1)
+			max_batch_steps = geta('max batch steps').integer
+			if max_batch_steps < 1:
+				raise Exception('Error: max batch steps should be >= 1')
+			return (1, max_batch_steps if can_batch else 1)
+		batch_mode, max_batch_steps = get_batch()
+		def get_controller():
+			# optional, it may be missing in documents saved by older versions
+			at = xobj.getAttribute('step controller')
+			if at is None or at.string != 'PI':
+				return (0, 0.3, 0.4)
+			kI = geta('controller kI').real
+			kP = geta('controller kP').real
+			if kI <= 0.0 or kP < 0.0:
+				raise Exception('Error: controller kI should be > 0 and controller kP should be >= 0')
+			return (1, kI, kP)
+		step_controller, controller_kI, controller_kP = get_controller()
+		return template.replace(
+			'__fallback_algorithms__', tcl_list(fallback_algorithms)).replace(
+			'__fallback_tests__', tcl_list(fallback_tests)).replace(
+			'__test__', test.getTclTest(xobj, iter_override = iter_ov)).replace(
+			'__algorithm__', algorithm.getTclAlgorithm(xobj)).replace(
+			'__batch_mode__', str(batch_mode)).replace(
+			'__max_batch_steps__', str(max_batch_steps)).replace(
+			'__step_controller__', str(step_controller)).replace(
+			'__controller_kI__', str(controller_kI)).replace(
+			'__controller_kP__', str(controller_kP))
+	
 	# integrator
 	integrator.writeTcl_integrator(pinfo, xobj)
 	
@@ -565,8 +643,8 @@ def writeTcl(pinfo):
 			WriteHSConstraint()
 		else:
 			# standard proc for non-adaptive types
-			# analyze
-			analyze.writeTcl_analyze(pinfo, xobj)
+			# analyze (a stage that is skipped at restart if completed before the last checkpoint)
+			cpu.write_stage(pinfo, analyze.getTclAnalyze(xobj))
 	else:
 		# Transient analyses
 		pinfo.out_file.write('{}analysis {}\n'.format(pinfo.indent, 'Transient'))
@@ -838,7 +838,7 @@ def algorithmCommand(xom, group_suffix=''):
 	xom.setBooleanAutoExclusiveDependency(at_algorithm, at_BFGS)
 	xom.setBooleanAutoExclusiveDependency(at_algorithm, at_Broyden)
 
-def writeTcl_algorithm(pinfo, xobj):
+def getTclAlgorithm(xobj):
 	
 	'''
 	algorithm Linear <-secant> <-initial> <-factorOnce>
@@ -876,7 +876,7 @@ def writeTcl_algorithm(pinfo, xobj):
 		if factorOnce_at.boolean:
 			sopt += ' -factorOnce'
 		
-		str_tcl = '{}algorithm Linear{}\n'.format(pinfo.indent, sopt)
+		str_tcl = 'algorithm Linear{}'.format(sopt)
 	
 	elif algorithm == 'Newton':
 		use_formTangent_at = xobj.getAttribute('use_formTangent/Newton')
@@ -890,7 +890,7 @@ def writeTcl_algorithm(pinfo, xobj):
 			
 			sopt += ' {}'.format(formTangent)
 		
-		str_tcl = '{}algorithm Newton{}\n'.format(pinfo.indent, sopt)
+		str_tcl = 'algorithm Newton{}'.format(sopt)
 	
 	elif algorithm == 'Newton with Line Search':
 		type_at = xobj.getAttribute('-type')
@@ -948,7 +948,7 @@ def writeTcl_algorithm(pinfo, xobj):
 			
 			sopt += ' -maxEta {}'.format(maxEta)
 		
-		str_tcl = '{}algorithm NewtonLineSearch{}\n'.format(pinfo.indent, sopt)
+		str_tcl = 'algorithm NewtonLineSearch{}'.format(sopt)
 	
 	elif algorithm == 'Modified Newton':
 		use_formTangent_at = xobj.getAttribute('use_formTangent/ModifiedNewton')
@@ -962,7 +962,7 @@ def writeTcl_algorithm(pinfo, xobj):
 			
 			sopt += ' {}'.format(formTangent)
 		
-		str_tcl = '{}algorithm ModifiedNewton{}\n'.format(pinfo.indent, sopt)
+		str_tcl = 'algorithm ModifiedNewton{}'.format(sopt)
 	
 	elif algorithm == 'Krylov-Newton':
 		iterate_at = xobj.getAttribute('-iterate/KrylovNewton')
@@ -998,7 +998,7 @@ def writeTcl_algorithm(pinfo, xobj):
 			
 			sopt += ' -maxDim {}'.format(maxDim)
 		
-		str_tcl = '{}algorithm KrylovNewton{}\n'.format(pinfo.indent, sopt)
+		str_tcl = 'algorithm KrylovNewton{}'.format(sopt)
 	
 	elif algorithm == 'Secant Newton':
 		iterate_at = xobj.getAttribute('-iterate/SecantNewton')
@@ -1034,7 +1034,7 @@ def writeTcl_algorithm(pinfo, xobj):
 			
 			sopt += ' -maxDim {}'.format(maxDim)
 		
-		str_tcl = '{}algorithm SecantNewton{}\n'.format(pinfo.indent, sopt)
+		str_tcl = 'algorithm SecantNewton{}'.format(sopt)
 	
 	elif algorithm == 'BFGS':
 		use_formTangent_at = xobj.getAttribute('use_formTangent/BFGS')
@@ -1059,7 +1059,7 @@ def writeTcl_algorithm(pinfo, xobj):
 			
 			sopt += ' -count {}'.format(count)
 		
-		str_tcl = '{}algorithm BFGS{}\n'.format(pinfo.indent, sopt)
+		str_tcl = 'algorithm BFGS{}'.format(sopt)
 	
 	elif algorithm == 'Broyden':
 		use_formTangent_at = xobj.getAttribute('use_formTangent/Broyden')
@@ -1084,8 +1084,11 @@ def writeTcl_algorithm(pinfo, xobj):
 			
 			sopt += ' -count {}'.format(count)
 		
-		str_tcl = '{}algorithm Broyden{}\n'.format(pinfo.indent, sopt)
+		str_tcl = 'algorithm Broyden{}'.format(sopt)
 	
+	return str_tcl
+
+def writeTcl_algorithm(pinfo, xobj):
 	
 	# now write the string into the file
-	pinfo.out_file.write(str_tcl)
\ No newline at end of file
+	pinfo.out_file.write('{}{}\n'.format(pinfo.indent, getTclAlgorithm(xobj)))
\ No newline at end of file
@@ -117,6 +117,106 @@ def analyzeCommand(xom):
 		html_end()
 		)
 	
+	at_fallback_algorithms = MpcAttributeMetaData()
+	at_fallback_algorithms.type = MpcAttributeType.StringVector
+	at_fallback_algorithms.name = 'fallback algorithms'
+	at_fallback_algorithms.group = 'AdaptiveControl'
+	at_fallback_algorithms.description = (
+		html_par(html_begin()) +
+		html_par(html_boldtext('fallback algorithms')+'<br/>')+ 
+		html_par('An optional ordered list of solution algorithms (without the "algorithm" keyword, '
+			'for example: KrylovNewton, NewtonLineSearch, ModifiedNewton -initial).<br/>'
+			'When the main algorithm does not converge, they are tried in order with the same increment, '
+			'before reducing the increment factor. The main algorithm is restored after each attempt.') +
+		html_end()
+		)
+	
+	at_fallback_tests = MpcAttributeMetaData()
+	at_fallback_tests.type = MpcAttributeType.StringVector
+	at_fallback_tests.name = 'fallback tests'
+	at_fallback_tests.group = 'AdaptiveControl'
+	at_fallback_tests.description = (
+		html_par(html_begin()) +
+		html_par(html_boldtext('fallback tests')+'<br/>')+ 
+		html_par('An optional list of test commands (without the "test" keyword, '
+			'for example: NormDispIncr 1.0e-6 50), one for each fallback algorithm.<br/>'
+			'If this list is shorter than the list of fallback algorithms, the main test is used for the remaining ones.') +
+		html_end()
+		)
+	
+	at_batch = MpcAttributeMetaData()
+	at_batch.type = MpcAttributeType.Boolean
+	at_batch.name = 'batch analyze'
+	at_batch.group = 'AdaptiveControl'
+	at_batch.description = (
+		html_par(html_begin()) +
+		html_par(html_boldtext('batch analyze')+'<br/>')+ 
+		html_par('If checked, the integrator is re-issued only when the increment changes. '
+			'Moreover, for transient and load control analyses, while the increment factor is stable '
+			'the steps are performed in batches (analyze N), doubling the number of steps of each batch up to "max batch steps". '
+			'In practice the factor is stable only while it is at its maximum value (max factor), '
+			'so batches are used only when the analysis converges easily with the maximum increment.<br/>'
+			'Note: steps are never batched if functions must be called before or after each step '
+			'(monitors, custom error controls, ...). In that case only the integrator is re-issued less often.') +
+		html_end()
+		)
+	
+	at_max_batch_steps = MpcAttributeMetaData()
+	at_max_batch_steps.type = MpcAttributeType.Integer
+	at_max_batch_steps.name = 'max batch steps'
+	at_max_batch_steps.group = 'AdaptiveControl'
+	at_max_batch_steps.setDefault(16)
+	at_max_batch_steps.description = (
+		html_par(html_begin()) +
+		html_par(html_boldtext('max batch steps')+'<br/>')+ 
+		html_par('The maximum number of steps performed by a single analyze command in batch mode') +
+		html_end()
+		)
+	
+	at_step_controller = MpcAttributeMetaData()
+	at_step_controller.type = MpcAttributeType.String
+	at_step_controller.name = 'step controller'
+	at_step_controller.group = 'AdaptiveControl'
+	at_step_controller.description = (
+		html_par(html_begin()) +
+		html_par(html_boldtext('step controller')+'<br/>')+ 
+		html_par('The law used to update the increment factor after a converged step.<br/>'
+			'- Iterations: factor_increment = desired_iter/num_iter<br/>'
+			'- PI: proportional-integral controller on the normalized error e = num_iter/desired_iter:<br/>'
+			'factor_increment = (1/e)^kI * (e(old)/e)^kP, smoothed with 1 + atan(factor_increment - 1).<br/>'
+			'If the error norm contracts slowly in the last iteration, e is taken as at least 1 (no growth). '
+			'The increment factor is not increased right after a rejected step. '
+			'The PI controller gives smoother increments and fewer rejected steps in strongly nonlinear analyses.') +
+		html_end()
+		)
+	at_step_controller.sourceType = MpcAttributeSourceType.List
+	at_step_controller.setSourceList(['Iterations', 'PI'])
+	at_step_controller.setDefault('Iterations')
+	
+	at_controller_kI = MpcAttributeMetaData()
+	at_controller_kI.type = MpcAttributeType.Real
+	at_controller_kI.name = 'controller kI'
+	at_controller_kI.group = 'AdaptiveControl'
+	at_controller_kI.setDefault(0.3)
+	at_controller_kI.description = (
+		html_par(html_begin()) +
+		html_par(html_boldtext('controller kI')+'<br/>')+ 
+		html_par('The integral gain of the PI step controller (> 0)') +
+		html_end()
+		)
+	
+	at_controller_kP = MpcAttributeMetaData()
+	at_controller_kP.type = MpcAttributeType.Real
+	at_controller_kP.name = 'controller kP'
+	at_controller_kP.group = 'AdaptiveControl'
+	at_controller_kP.setDefault(0.4)
+	at_controller_kP.description = (
+		html_par(html_begin()) +
+		html_par(html_boldtext('controller kP')+'<br/>')+ 
+		html_par('The proportional gain of the PI step controller (>= 0)') +
+		html_end()
+		)
+	
 	xom.addAttribute(at_time_step_type)
 	xom.addAttribute(at_adaptive)
 	xom.addAttribute(at_fixed)
@@ -127,15 +227,29 @@ def analyzeCommand(xom):
 	xom.addAttribute(at_min_factor)
 	xom.addAttribute(at_max_factor_incr)
 	xom.addAttribute(at_min_factor_incr)
+	xom.addAttribute(at_fallback_algorithms)
+	xom.addAttribute(at_fallback_tests)
+	xom.addAttribute(at_batch)
+	xom.addAttribute(at_max_batch_steps)
+	xom.addAttribute(at_step_controller)
+	xom.addAttribute(at_controller_kI)
+	xom.addAttribute(at_controller_kP)
 	
 	xom.setBooleanAutoExclusiveDependency(at_time_step_type, at_adaptive)
 	xom.setVisibilityDependency(at_adaptive, at_max_factor)
 	xom.setVisibilityDependency(at_adaptive, at_min_factor)
 	xom.setVisibilityDependency(at_adaptive, at_max_factor_incr)
 	xom.setVisibilityDependency(at_adaptive, at_min_factor_incr)
+	xom.setVisibilityDependency(at_adaptive, at_fallback_algorithms)
+	xom.setVisibilityDependency(at_adaptive, at_fallback_tests)
+	xom.setVisibilityDependency(at_adaptive, at_batch)
+	xom.setVisibilityDependency(at_adaptive, at_max_batch_steps)
+	xom.setVisibilityDependency(at_adaptive, at_step_controller)
+	xom.setVisibilityDependency(at_adaptive, at_controller_kI)
+	xom.setVisibilityDependency(at_adaptive, at_controller_kP)
 
 
-def writeTcl_analyze(pinfo, xobj):
+def getTclAnalyze(xobj):
 	
 	# analyze $numIncr <$dt> <$dtMin $dtMax $Jd>
 	
@@ -156,7 +270,11 @@ def writeTcl_analyze(pinfo, xobj):
 		duration = duration_at.real
 		sopt += ' {}'.format(duration)
 	
-	str_tcl = '{}analyze {}{}\n'.format(pinfo.indent, numIncr, sopt)
+	return 'analyze {}{}'.format(numIncr, sopt)
+
+def writeTcl_analyze(pinfo, xobj):
+	
+	str_tcl = '{}{}\n'.format(pinfo.indent, getTclAnalyze(xobj))
 	
 	# now write the string into the file
 	pinfo.out_file.write(str_tcl)
\ No newline at end of file
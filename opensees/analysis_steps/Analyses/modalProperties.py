@@ -78,6 +78,9 @@ def writeTcl(pinfo):
 	at_reportFileName = geta('reportFileName').string
 	at_unorm = geta('-unorm').boolean
 	
+	# store the options, used by the responseSpectrum modal combination
+	pinfo.custom_data['modalProperties'] = {'-unorm': at_unorm}
+	
 	str_tcl = '{}modalProperties'.format(pinfo.indent)
 	if at_print:
 		str_tcl += ' -print'
@@ -1,7 +1,12 @@
 from PyMpc import *
 from mpc_utils_html import *
+import opensees.utils.selection_index_utils as siu
+import numpy as np
 import os
 
+# number of node ids per line in the node lists of the combination
+_IDS_PER_LINE = 20
+
 def makeXObjectMetaData():
 	
 	'''
@@ -49,18 +54,228 @@ def makeXObjectMetaData():
 		'Optional. Mandatory if -mode option is used. The 1-based index of the unique mode to process.'
 		)
 	
+	at_combination = mka(
+		MpcAttributeType.String, 
+		'combination', 
+		'Optional. If not None, all modes are processed for all the "directions" in the same analysis step, '
+		'and the modal responses (nodal displacements) are combined with the selected rule (SRSS or CQC). '
+		'The responses of different directions are combined with the SRSS rule. '
+		'The modal properties are taken from the modalProperties command (with the same -unorm option, if it was called before).<br/>'
+		'Only the combined envelope is set in the domain, and committed at the end. '
+		'Note: recorders defined before this command are called also for each mode and direction '
+		'(a warning is given at export).'
+		)
+	at_combination.sourceType = MpcAttributeSourceType.List
+	at_combination.setSourceList(['None', 'SRSS', 'CQC'])
+	at_combination.setDefault('None')
+	
+	at_directions = mka(
+		MpcAttributeType.String, 
+		'directions', 
+		'Optional. Used if combination is not None. A list of 1-based DOF indices to excite, for example: 1 2. '
+		'If empty, the "direction" is used.'
+		)
+	
+	at_damping = mka(
+		MpcAttributeType.Real, 
+		'damping', 
+		'Optional. Used if combination is CQC. The modal damping ratio used to compute the modal correlation coefficients.'
+		)
+	at_damping.setDefault(0.05)
+	
+	at_sets = mka(
+		MpcAttributeType.IndexVector, 
+		'SelectionSets', 
+		'Optional. Used if combination is not None. The selection sets whose nodes are combined. '
+		'Only the modal displacements of these nodes are stored and combined, so selecting only '
+		'the nodes of interest makes the combination much faster in large models. '
+		'If empty, all nodes are combined.'
+		)
+	at_sets.indexSource.type = MpcAttributeIndexSourceType.SelectionSet
+	
 	xom = MpcXObjectMetaData()
 	xom.name = 'responseSpectrum'
 	xom.addAttribute(at_tsTag)
 	xom.addAttribute(at_direction)
 	xom.addAttribute(at_mode_flag)
 	xom.addAttribute(at_mode)
+	xom.addAttribute(at_combination)
+	xom.addAttribute(at_directions)
+	xom.addAttribute(at_damping)
+	xom.addAttribute(at_sets)
 	
 	# visibility dependencies
 	xom.setVisibilityDependency(at_mode_flag, at_mode)
 	
 	return xom
 
+def _write_combination_proc(pinfo):
+	'''
+	writes (only once) the Tcl function that runs all modes for all directions
+	and combines the modal responses
+	'''
+	if pinfo.custom_data.get('responseSpectrumCombination', False):
+		return
+	pinfo.custom_data['responseSpectrumCombination'] = True
+	pinfo.out_file.write('''
+# Response spectrum analysis of all modes for all directions, with modal combination.
+# The modal displacements of the given nodes ("all" = all nodes in this process) are combined
+# with the SRSS or CQC rule (equal modal damping), the directions with the SRSS rule,
+# and the envelope is committed to the domain.
+# Only the modal displacements of the given nodes for one direction are kept in memory
+proc STKO_RSA_Combine {ts_tag directions method damping unorm nodes} {
+	# modal properties (eigen should be called before)
+	if {$unorm} {
+		set mp [modalProperties -return -unorm]
+	} else {
+		set mp [modalProperties -return]
+	}
+	set omega [dict get $mp eigenOmega]
+	set num_modes [llength $omega]
+	if {$nodes == "all"} {
+		set nodes [getNodeTags]
+	}
+	# CQC correlation coefficients: for each mode i, the list of 2*rho(i,j) with j > i
+	set cqc [expr {$method == "CQC"}]
+	set rho {}
+	if {$cqc} {
+		set z2 [expr {$damping * $damping}]
+		for {set i 0} {$i < $num_modes} {incr i} {
+			set wi [lindex $omega $i]
+			set row {}
+			foreach wj [lrange $omega [expr {$i + 1}] end] {
+				set r [expr {$wj / $wi}]
+				lappend row [expr {16.0 * $z2 * (1.0 + $r) * pow($r, 1.5) / (pow(1.0 - $r * $r, 2) + 4.0 * $z2 * $r * pow(1.0 + $r, 2))}]
+			}
+			lappend rho $row
+		}
+	}
+	# squared combined response of each node
+	foreach node $nodes {
+		set total($node) [lrepeat [llength [nodeDisp $node]] 0.0]
+	}
+	foreach dir $directions {
+		# modal responses for this direction (for each node, the list of modal displacements)
+		foreach node $nodes {
+			set u($node) {}
+		}
+		for {set i 1} {$i <= $num_modes} {incr i} {
+			responseSpectrumAnalysis $ts_tag $dir -mode $i
+			foreach node $nodes {
+				lappend u($node) [nodeDisp $node]
+			}
+		}
+		# modal combination, and SRSS among directions
+		foreach node $nodes {
+			set sum {}
+			set k 0
+			foreach previous $total($node) {
+				set values {}
+				foreach disp $u($node) {
+					lappend values [lindex $disp $k]
+				}
+				set value 0.0
+				set m 0
+				foreach ui $values row $rho {
+					incr m
+					set value [expr {$value + $ui * $ui}]
+					if {$cqc && $ui != 0.0} {
+						foreach uj [lrange $values $m end] rij $row {
+							set value [expr {$value + $rij * $ui * $uj}]
+						}
+					}
+				}
+				lappend sum [expr {$previous + $value}]
+				incr k
+			}
+			set total($node) $sum
+		}
+		array unset u
+	}
+	# commit the envelope
+	foreach node $nodes {
+		set k 0
+		foreach value $total($node) {
+			incr k
+			setNodeDisp $node $k [expr {sqrt(max(0.0, $value))}] -commit
+		}
+	}
+	record
+}
+''')
+
+def _write_node_list(f, indent, tab, nodes):
+	'''
+	writes a list of node ids as a braced Tcl list, with _IDS_PER_LINE ids per line
+	'''
+	f.write('{\n')
+	for i in range(0, len(nodes), _IDS_PER_LINE):
+		f.write('{}{}{}\n'.format(indent, tab, ' '.join(str(j) for j in nodes[i:i+_IDS_PER_LINE])))
+	f.write('{}}}\n'.format(indent))
+
+def _write_combined(pinfo, xobj, ts_tag, direction, method):
+	
+	# directions
+	directions = []
+	for item in xobj.getAttribute('directions').string.replace(',', ' ').split():
+		try:
+			directions.append(int(item))
+		except:
+			raise Exception('Error: invalid direction "{}" in responseSpectrum directions'.format(item))
+	if len(directions) == 0:
+		directions.append(direction)
+	for item in directions:
+		if item < 1 or item > 6:
+			raise Exception('Error: responseSpectrum direction should be in the range 1-6 (got {})'.format(item))
+	
+	# damping (only for CQC)
+	damping = xobj.getAttribute('damping').real
+	if method == 'CQC' and damping <= 0.0:
+		raise Exception('Error: responseSpectrum damping should be > 0 for the CQC combination')
+	
+	# use the same normalization of a previous modalProperties command
+	unorm = pinfo.custom_data.get('modalProperties', {}).get('-unorm', False)
+	
+	doc = App.caeDocument()
+	
+	# recorders defined before this command record the response of each mode and direction
+	for step_id, step in doc.analysisSteps.items():
+		if step_id == pinfo.analysis_step.id:
+			break
+		if (step.XObject is not None) and (step.XObject.Xnamespace == 'Recorders'):
+			IO.write_cerr('Warning : responseSpectrum ({}) with {} combination: the recorders defined before it '
+				'are called also for each mode and direction, not only for the combined envelope\n'.format(
+				pinfo.analysis_step.id, method))
+			break
+	
+	# the nodes to combine (optional, it may be missing in documents saved by older versions).
+	# by default all nodes
+	at_sets = xobj.getAttribute('SelectionSets')
+	selection_sets = [i for i in at_sets.indexVector if i in doc.selectionSets] if at_sets is not None else []
+	if len(selection_sets) > 0:
+		nodes = np.unique(np.concatenate([siu.get_selection_set(doc, i).nodes for i in selection_sets]))
+	else:
+		nodes = None
+	
+	_write_combination_proc(pinfo)
+	
+	# now write the string into the file.
+	# in partitioned models all processes run the analysis, each one with its own nodes
+	str_directions = ' '.join(str(i) for i in directions)
+	pinfo.out_file.write('\n{}# responseSpectrumAnalysis: all modes, directions {}, {} combination\n'.format(pinfo.indent, str_directions, method))
+	command = 'STKO_RSA_Combine {} {{{}}} {} {} {}'.format(ts_tag, str_directions, method, damping, int(unorm))
+	if nodes is None:
+		pinfo.out_file.write('{}{} all\n'.format(pinfo.indent, command))
+	elif pinfo.process_count > 1:
+		for process_id, process_nodes in enumerate(siu.split_nodes(doc, nodes)):
+			pinfo.out_file.write('{}if {{$STKO_VAR_process_id == {}}} {{\n'.format(pinfo.indent, process_id))
+			pinfo.out_file.write('{}{}{} '.format(pinfo.indent, pinfo.tabIndent, command))
+			_write_node_list(pinfo.out_file, pinfo.indent + pinfo.tabIndent, pinfo.tabIndent, process_nodes.tolist())
+			pinfo.out_file.write('{}}}\n'.format(pinfo.indent))
+	else:
+		pinfo.out_file.write('{}{} '.format(pinfo.indent, command))
+		_write_node_list(pinfo.out_file, pinfo.indent, pinfo.tabIndent, nodes.tolist())
+
 def writeTcl(pinfo):
 	
 	'''
@@ -80,6 +295,12 @@ def writeTcl(pinfo):
 	at_mode_flag = geta('-mode').boolean
 	at_mode = geta('mode').integer
 	
+	# optional, it may be missing in documents saved by older versions
+	at_combination = xobj.getAttribute('combination')
+	if (at_combination is not None) and (at_combination.string != 'None'):
+		_write_combined(pinfo, xobj, at_tsTag, at_direction, at_combination.string)
+		return
+	
 	str_tcl = '{}responseSpectrumAnalysis {} {}'.format(pinfo.indent, at_tsTag, at_direction)
 	if at_mode_flag:
 		str_tcl += ' -mode {}'.format(at_mode)
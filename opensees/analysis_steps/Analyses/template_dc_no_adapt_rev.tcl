@@ -39,6 +39,7 @@ if {$STKO_VAR_process_id == 0} {
 	puts "TOTAL DURATION: $total_duration"
 }
 
+__checkpoint_begin__ set ncycles 0
 # for each cycle...
 set STKO_VAR_increment 1
 for {set i 1} {$i <= $ncycles} {incr i} {
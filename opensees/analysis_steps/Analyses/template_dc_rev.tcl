@@ -28,6 +28,19 @@ set min_factor_increment __min_factor__
 set max_iter __max_iter__
 set desired_iter __des_iter__
 
+# fallback algorithms (and optional tests) tried before reducing the increment factor
+set fallback_algorithms __fallback_algorithms__
+set fallback_tests __fallback_tests__
+
+# step controller (0 = iterations ratio, 1 = PI) and gains of the PI controller
+set step_controller __step_controller__
+set controller_kI __controller_kI__
+set controller_kP __controller_kP__
+
+# batch mode: the integrator is re-issued only when the increment changes
+set batch_mode __batch_mode__
+set integrator_increment 0.0
+
 # ======================================================================================
 # CALCULATION 
 # ======================================================================================
@@ -47,6 +60,7 @@ if {$STKO_VAR_process_id == 0} {
 	puts "TOTAL DURATION: $total_duration"
 }
 
+__checkpoint_begin__ set ncycles 0
 # for each cycle...
 set STKO_VAR_increment 1
 for {set i 1} {$i <= $ncycles} {incr i} {
@@ -79,6 +93,8 @@ for {set i 1} {$i <= $ncycles} {incr i} {
 	# adaptive time stepping
 	set factor 1.0
 	set old_factor $factor
+	set controller_error_old 1.0
+	set controller_rejected 0
 	set dU_cumulative 0.0
 	set STKO_VAR_time $itime_old
 	while 1 {
@@ -102,7 +118,10 @@ for {set i 1} {$i <= $ncycles} {incr i} {
 		set STKO_VAR_time_increment [expr $dT * $dU_adapt/$dU]
 		
 		# update integrator
-		integrator $integrator_type $control_node $control_dof $dU_adapt
+		if {$batch_mode == 0 || $dU_adapt != $integrator_increment} {
+			integrator $integrator_type $control_node $control_dof $dU_adapt
+			set integrator_increment $dU_adapt
+		}
 		
 		# before analyze
 		STKO_CALL_OnBeforeAnalyze
@@ -110,6 +129,30 @@ for {set i 1} {$i <= $ncycles} {incr i} {
 		# perform this step
 		set STKO_VAR_analyze_done [analyze 1]
 		
+		# on non convergence, try the fallback algorithms with the same increment
+		set fallback_used 0
+		if {$STKO_VAR_analyze_done != 0} {
+			foreach fallback_algorithm $fallback_algorithms fallback_test $fallback_tests {
+				if {$fallback_algorithm == ""} {
+					continue
+				}
+				if {$STKO_VAR_process_id == 0} {
+					puts "Trying fallback algorithm: $fallback_algorithm"
+				}
+				if {$fallback_test != ""} {
+					eval test $fallback_test
+				} elseif {$fallback_used} {
+					__test__
+				}
+				eval algorithm $fallback_algorithm
+				set fallback_used 1
+				set STKO_VAR_analyze_done [analyze 1]
+				if {$STKO_VAR_analyze_done == 0} {
+					break
+				}
+			}
+		}
+		
 		# update common variables
 		if {$STKO_VAR_analyze_done == 0} {
 			set STKO_VAR_num_iter [testIter]
@@ -119,6 +162,12 @@ for {set i 1} {$i <= $ncycles} {incr i} {
 			if {$STKO_VAR_num_iter > 0} {set STKO_VAR_error_norm [lindex $norms [expr $STKO_VAR_num_iter-1]]} else {set STKO_VAR_error_norm 0.0}
 		}
 		
+		# back to the main algorithm and test
+		if {$fallback_used} {
+			__test__
+			__algorithm__
+		}
+		
 		# after analyze
 		set STKO_VAR_afterAnalyze_done 0
 		STKO_CALL_OnAfterAnalyze
@@ -132,11 +181,38 @@ for {set i 1} {$i <= $ncycles} {incr i} {
 			}
 			
 			# update adaptive factor
-			set factor_increment [expr min($max_factor_increment, [expr double($desired_iter) / double($STKO_VAR_num_iter)])]
+			# step controller:
+			# - 0: factor_increment = desired_iter/num_iter
+			# - 1: PI controller on the normalized error e = num_iter/desired_iter.
+			#      if the error norm contracts slowly in the last iteration, the step is close
+			#      to the convergence limit and it is considered as if it took the desired iterations
+			if {$step_controller == 1} {
+				set controller_error [expr max(1.0e-2, double($STKO_VAR_num_iter) / double($desired_iter))]
+				if {$STKO_VAR_num_iter > 1} {
+					set controller_contraction [expr [lindex $norms [expr $STKO_VAR_num_iter-1]] / max(1.0e-300, [lindex $norms [expr $STKO_VAR_num_iter-2]])]
+					if {$controller_contraction > 0.5} {
+						set controller_error [expr max(1.0, $controller_error)]
+					}
+				}
+				set factor_increment [expr pow(1.0 / $controller_error, $controller_kI) * pow($controller_error_old / $controller_error, $controller_kP)]
+				set controller_error_old $controller_error
+				# smooth limiter, and no growth right after a rejected step
+				set factor_increment [expr 1.0 + atan($factor_increment - 1.0)]
+				if {$controller_rejected} {
+					set factor_increment [expr min(1.0, $factor_increment)]
+				}
+				set factor_increment [expr min($max_factor_increment, $factor_increment)]
+			} else {
+				set factor_increment [expr min($max_factor_increment, [expr double($desired_iter) / double($STKO_VAR_num_iter)])]
+			}
+			set controller_rejected 0
 			
 			# check STKO_VAR_afterAnalyze_done. Simulate a reduction similar to non-convergence
 			if {$STKO_VAR_afterAnalyze_done != 0} {
 				set factor_increment [expr max($min_factor_increment, [expr double($desired_iter) / double($max_iter)])]
+				set controller_rejected 1
+				# the error of the last accepted step refers to a different step size
+				set controller_error_old 1.0
 				if {$STKO_VAR_process_id == 0} {
 					puts "Reducing increment factor due to custom error controls. Factor = $factor"
 				}
@@ -161,6 +237,9 @@ for {set i 1} {$i <= $ncycles} {incr i} {
 			
 			# update adaptive factor
 			set STKO_VAR_num_iter $max_iter
+			set controller_rejected 1
+			# the error of the last accepted step refers to a different step size
+			set controller_error_old 1.0
 			set factor_increment [expr max($min_factor_increment, [expr double($desired_iter) / double($STKO_VAR_num_iter)])]
 			set factor [expr $factor * $factor_increment]
 			if {$STKO_VAR_process_id == 0} {
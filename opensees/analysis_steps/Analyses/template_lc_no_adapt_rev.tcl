@@ -14,7 +14,9 @@ set STKO_VAR_time 0.0
 set STKO_VAR_time_increment [expr $total_duration / $initial_num_incr]
 set STKO_VAR_initial_time_increment $STKO_VAR_time_increment
 integrator __integrator_type__ $STKO_VAR_time_increment __more_int_data__
-for {set STKO_VAR_increment 1} {$STKO_VAR_increment <= $initial_num_incr} {incr STKO_VAR_increment} {
+set STKO_VAR_increment 1
+__checkpoint_begin__ set STKO_VAR_increment [expr $initial_num_incr + 1]; set STKO_VAR_time $total_duration
+for {} {$STKO_VAR_increment <= $initial_num_incr} {incr STKO_VAR_increment} {
 	
 	# before analyze
 	STKO_CALL_OnBeforeAnalyze
@@ -41,6 +43,7 @@ for {set STKO_VAR_increment 1} {$STKO_VAR_increment <= $initial_num_incr} {incr
 		if {$STKO_VAR_process_id == 0} {
 			puts [format "Increment: %6d | Iterations: %4d | Norm: %8.3e | Progress: %7.3f %%" $STKO_VAR_increment $STKO_VAR_num_iter  $STKO_VAR_error_norm [expr $STKO_VAR_percentage*100.0]]
 		}
+		__checkpoint_increment__ [expr $STKO_VAR_increment + 1]
 	} else {
 		# stop analysis
 		error "ERROR: the analysis did not converge"
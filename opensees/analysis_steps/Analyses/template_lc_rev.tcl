@@ -18,14 +18,39 @@ set min_factor_increment __min_factor__
 set max_iter __max_iter__
 set desired_iter __des_iter__
 
+# fallback algorithms (and optional tests) tried before reducing the increment factor
+set fallback_algorithms __fallback_algorithms__
+set fallback_tests __fallback_tests__
+
+# step controller (0 = iterations ratio, 1 = PI) and gains of the PI controller
+set step_controller __step_controller__
+set controller_kI __controller_kI__
+set controller_kP __controller_kP__
+
+# batch mode: the integrator is re-issued only when the increment changes,
+# and steps are performed in batches (analyze N) while the increment factor is stable
+set batch_mode __batch_mode__
+set max_batch_steps __max_batch_steps__
+# no batches if functions must be called at each step (custom error controls, monitors, ...):
+# they could not reject or observe the single steps of a batch
+if {[llength $STKO_VAR_OnBeforeAnalyze_CustomFunctions] > 0 || [llength $STKO_VAR_OnAfterAnalyze_CustomFunctions] > 0 ||
+	[llength $STKO_VAR_MonitorFunctions] > 0 || [llength $all_custom_functions] > 0} {
+	set max_batch_steps 1
+}
+set batch_steps 1
+set integrator_increment 0.0
+
 set STKO_VAR_increment 1
 set factor 1.0
 set old_factor $factor
+set controller_error_old 1.0
+set controller_rejected 0
 set STKO_VAR_time 0.0
 set initial_time_increment [expr $total_duration / $initial_num_incr]
 set STKO_VAR_initial_time_increment $initial_time_increment
 set time_tolerance [expr abs($initial_time_increment) * 1.0e-8]
 
+__checkpoint_begin__ set STKO_VAR_time $total_duration
 while 1 {
 	
 	# check end of analysis
@@ -43,24 +68,76 @@ while 1 {
 		set STKO_VAR_time_increment [expr $total_duration - $STKO_VAR_time]
 	}
 	
+	# number of steps for this analyze command (only in batch mode with a stable increment factor)
+	set num_steps [expr min($batch_steps, int(floor((abs($total_duration) - abs($STKO_VAR_time) + $time_tolerance) / abs($STKO_VAR_time_increment))))]
+	if {$num_steps < 1} {
+		set num_steps 1
+	}
+	
 	# update integrator
-	integrator __integrator_type__ $STKO_VAR_time_increment __more_int_data__
+	if {$batch_mode == 0 || $STKO_VAR_time_increment != $integrator_increment} {
+		integrator __integrator_type__ $STKO_VAR_time_increment __more_int_data__
+		set integrator_increment $STKO_VAR_time_increment
+	}
 	
 	# before analyze
 	STKO_CALL_OnBeforeAnalyze
 	
-	# perform this step
-	set STKO_VAR_analyze_done [analyze 1]
+	# perform this step (or a batch of steps)
+	if {$num_steps > 1} {
+		set batch_start_time [getTime]
+		set STKO_VAR_analyze_done [analyze $num_steps]
+		if {$STKO_VAR_analyze_done != 0} {
+			# the steps of the batch that converged have been committed.
+			# account for them and continue from the step that failed
+			set num_done [expr int(round(([getTime] - $batch_start_time) / $STKO_VAR_time_increment))]
+			set STKO_VAR_time [expr $STKO_VAR_time + $num_done * $STKO_VAR_time_increment]
+			incr STKO_VAR_increment $num_done
+			set num_steps 1
+		}
+	} else {
+		set STKO_VAR_analyze_done [analyze 1]
+	}
+	
+	# on non convergence, try the fallback algorithms with the same increment
+	set fallback_used 0
+	if {$STKO_VAR_analyze_done != 0} {
+		foreach fallback_algorithm $fallback_algorithms fallback_test $fallback_tests {
+			if {$fallback_algorithm == ""} {
+				continue
+			}
+			if {$STKO_VAR_process_id == 0} {
+				puts "Trying fallback algorithm: $fallback_algorithm"
+			}
+			if {$fallback_test != ""} {
+				eval test $fallback_test
+			} elseif {$fallback_used} {
+				__test__
+			}
+			eval algorithm $fallback_algorithm
+			set fallback_used 1
+			set STKO_VAR_analyze_done [analyze 1]
+			if {$STKO_VAR_analyze_done == 0} {
+				break
+			}
+		}
+	}
 	
 	# update common variables
 	if {$STKO_VAR_analyze_done == 0} {
 		set STKO_VAR_num_iter [testIter]
-		set STKO_VAR_time [expr $STKO_VAR_time + $STKO_VAR_time_increment]
+		set STKO_VAR_time [expr $STKO_VAR_time + $num_steps * $STKO_VAR_time_increment]
 		set STKO_VAR_percentage [expr $STKO_VAR_time/$total_duration]
 		set norms [testNorms]
 		if {$STKO_VAR_num_iter > 0} {set STKO_VAR_error_norm [lindex $norms [expr $STKO_VAR_num_iter-1]]} else {set STKO_VAR_error_norm 0.0}
 	}
 	
+	# back to the main algorithm and test
+	if {$fallback_used} {
+		__test__
+		__algorithm__
+	}
+	
 	# after analyze
 	set STKO_VAR_afterAnalyze_done 0
 	STKO_CALL_OnAfterAnalyze
@@ -74,11 +151,39 @@ while 1 {
 		}
 		
 		# update adaptive factor
-		set factor_increment [expr min($max_factor_increment, [expr double($desired_iter) / double($STKO_VAR_num_iter)])]
+		set previous_factor $factor
+		# step controller:
+		# - 0: factor_increment = desired_iter/num_iter
+		# - 1: PI controller on the normalized error e = num_iter/desired_iter.
+		#      if the error norm contracts slowly in the last iteration, the step is close
+		#      to the convergence limit and it is considered as if it took the desired iterations
+		if {$step_controller == 1} {
+			set controller_error [expr max(1.0e-2, double($STKO_VAR_num_iter) / double($desired_iter))]
+			if {$STKO_VAR_num_iter > 1} {
+				set controller_contraction [expr [lindex $norms [expr $STKO_VAR_num_iter-1]] / max(1.0e-300, [lindex $norms [expr $STKO_VAR_num_iter-2]])]
+				if {$controller_contraction > 0.5} {
+					set controller_error [expr max(1.0, $controller_error)]
+				}
+			}
+			set factor_increment [expr pow(1.0 / $controller_error, $controller_kI) * pow($controller_error_old / $controller_error, $controller_kP)]
+			set controller_error_old $controller_error
+			# smooth limiter, and no growth right after a rejected step
+			set factor_increment [expr 1.0 + atan($factor_increment - 1.0)]
+			if {$controller_rejected} {
+				set factor_increment [expr min(1.0, $factor_increment)]
+			}
+			set factor_increment [expr min($max_factor_increment, $factor_increment)]
+		} else {
+			set factor_increment [expr min($max_factor_increment, [expr double($desired_iter) / double($STKO_VAR_num_iter)])]
+		}
+		set controller_rejected 0
 		
 		# check STKO_VAR_afterAnalyze_done. Simulate a reduction similar to non-convergence
 		if {$STKO_VAR_afterAnalyze_done != 0} {
 			set factor_increment [expr max($min_factor_increment, [expr double($desired_iter) / double($max_iter)])]
+			set controller_rejected 1
+			# the error of the last accepted step refers to a different step size
+			set controller_error_old 1.0
 			if {$STKO_VAR_process_id == 0} {
 				puts "Reducing increment factor due to custom error controls. Factor = $factor"
 			}
@@ -95,13 +200,26 @@ while 1 {
 		}
 		set old_factor $factor
 		
+		# in batch mode, double the number of steps per analyze command while the factor is stable
+		# (in practice, while it stays at max_factor)
+		if {$batch_mode && $factor == $previous_factor} {
+			set batch_steps [expr min($max_batch_steps, $batch_steps * 2)]
+		} else {
+			set batch_steps 1
+		}
+		
 		# increment time step
-		incr STKO_VAR_increment
+		incr STKO_VAR_increment $num_steps
+		__checkpoint_increment__ $STKO_VAR_increment
 		
 	} else {
 		
 		# update adaptive factor
+		set batch_steps 1
 		set STKO_VAR_num_iter $max_iter
+		set controller_rejected 1
+		# the error of the last accepted step refers to a different step size
+		set controller_error_old 1.0
 		set factor_increment [expr max($min_factor_increment, [expr double($desired_iter) / double($STKO_VAR_num_iter)])]
 		set factor [expr $factor * $factor_increment]
 		if {$STKO_VAR_process_id == 0} {
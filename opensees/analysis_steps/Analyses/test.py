@@ -1042,7 +1042,7 @@ def testCommand(xom, group_suffix=''):
 	
 	xom.setBooleanAutoExclusiveDependency(at_testCommand, at_FixedNumIter)
 
-def writeTcl_test(pinfo, xobj, group_suffix='', iter_override = None):
+def getTclTest(xobj, iter_override = None):
 	
 	# utility to get attribute from xobject
 	def get_attr(at_name):
@@ -1085,5 +1085,8 @@ def writeTcl_test(pinfo, xobj, group_suffix='', iter_override = None):
 		pFlag = ''
 	if nType is None:
 		nType = ''
+	return 'test {} {} {} {} {}'.format(cmd_name, tol, iter, pFlag, nType)
+
+def writeTcl_test(pinfo, xobj, group_suffix='', iter_override = None):
 	# write
-	pinfo.out_file.write('{}test {} {} {} {} {}\n'.format(pinfo.indent, cmd_name, tol, iter, pFlag, nType))
\ No newline at end of file
+	pinfo.out_file.write('{}{}\n'.format(pinfo.indent, getTclTest(xobj, iter_override = iter_override)))
\ No newline at end of file
@@ -190,22 +190,74 @@ def writeTcl(pinfo):
 	else:
 		param_name = 'avgImplexError'
 		pre_op = 'set implex_error [expr $implex_error + $other_implex_error]'
-		post_op = 'set implex_error [expr $implex_error / double([getNP])]\n\t\t\t'
+		post_op = 'if {$pid == 0} {\n\t\tset implex_error [expr $implex_error / double($np)]\n\t}\n\t'
 	
-	# write the custom function
+	# write the custom function.
+	# the error parameter is created once here, at the beginning of the stage,
+	# and it is reset before each step. after each step it is created again:
+	# getParamValue returns the value stored in the parameter, that is taken from
+	# the element only when the parameter is added to it.
+	# for parallel analysis (MP) the error is reduced on process 0 and then broadcast
+	# to all processes, along a binomial tree (log2(NP) send/recv steps per process).
 	pinfo.out_file.write('''#
 # IMPL-EX Error Control Functions.
 #
+# Define a function to (re)create the error parameter,
+# reading the current error of the element
+proc STKO_IMPLEX_ErrorControl_CreateParameter {{}} {{
+	global STKO_IMPLEX_ErrorControl_TargetElements
+	if {{[lsearch -exact [getParamTags] {0}] != -1}} {{
+		remove parameter {0}
+	}}
+	if {{ [llength $STKO_IMPLEX_ErrorControl_TargetElements] > 0 }} {{
+		parameter {0}
+		addToParameter {0} element [lindex $STKO_IMPLEX_ErrorControl_TargetElements 0] {3}
+	}}
+}}
+# Create the persistent error parameter
+STKO_IMPLEX_ErrorControl_CreateParameter
+# create it again after the state is restored from a checkpoint
+lappend STKO_VAR_OnRestore_CustomFunctions STKO_IMPLEX_ErrorControl_CreateParameter
+# Define a function to reduce the error of all processes
+proc STKO_IMPLEX_ErrorControl_Reduce {{implex_error}} {{
+	set np [getNP]
+	set pid [getPID]
+	# reduce on process 0
+	set step 1
+	while {{$step < $np}} {{
+		if {{[expr $pid % (2 * $step)] == 0}} {{
+			if {{[expr $pid + $step] < $np}} {{
+				recv -pid [expr $pid + $step] other_implex_error
+				{4}
+			}}
+		}} else {{
+			send -pid [expr $pid - $step] $implex_error
+			break
+		}}
+		set step [expr $step * 2]
+	}}
+	{5}# broadcast from process 0
+	set step 1
+	while {{[expr $step * 2] < $np}} {{
+		set step [expr $step * 2]
+	}}
+	while {{$step >= 1}} {{
+		if {{[expr $pid % (2 * $step)] == 0}} {{
+			if {{[expr $pid + $step] < $np}} {{
+				send -pid [expr $pid + $step] $implex_error
+			}}
+		}} elseif {{[expr $pid % (2 * $step)] == $step}} {{
+			recv -pid [expr $pid - $step] implex_error
+		}}
+		set step [expr $step / 2]
+	}}
+	return $implex_error
+}}
 # Define a function to be called before the current time step
 proc STKO_IMPLEX_ErrorControl_OnBeforeAnalyze {{}} {{
 	global STKO_IMPLEX_ErrorControl_TargetElements
 	if {{ [llength $STKO_IMPLEX_ErrorControl_TargetElements] > 0 }} {{
-		set first_element_id [lindex $STKO_IMPLEX_ErrorControl_TargetElements 0]
-		parameter {0}
-		addToParameter {0} element $first_element_id {3}
 		updateParameter {0} 0.0
-		set implex_error [expr [getParamValue {0}]]
-		remove parameter {0}
 	}}
 }}
 # add it to the list of functions
@@ -219,29 +271,12 @@ proc STKO_IMPLEX_ErrorControl_OnAfterAnalyze {{}} {{
 	global STKO_VAR_afterAnalyze_done
 	set implex_error 0.0
 	if {{ [llength $STKO_IMPLEX_ErrorControl_TargetElements] > 0 }} {{
-		set first_element_id [lindex $STKO_IMPLEX_ErrorControl_TargetElements 0]
-		parameter {0}
-		addToParameter {0} element $first_element_id {3}
+		STKO_IMPLEX_ErrorControl_CreateParameter
 		set implex_error [expr [getParamValue {0}]]
-		remove parameter {0}
 	}}
 	# for parallel analysis (MP)
 	if {{[getNP] > 1}} {{
-		if {{[getPID] == 0}} {{
-			for {{set pcounter 1}} {{$pcounter < [getNP]}} {{incr pcounter}} {{
-				recv -pid $pcounter other_implex_error
-				{4}
-			}}
-		}} else {{
-			send -pid 0 $implex_error
-		}}
-		if {{[getPID] == 0}} {{
-			{5}for {{set pcounter 1}} {{$pcounter < [getNP]}} {{incr pcounter}} {{
-				send -pid $pcounter $implex_error
-			}}
-		}} else {{
-			recv -pid 0 implex_error
-		}}
+		set implex_error [STKO_IMPLEX_ErrorControl_Reduce $implex_error]
 	}}
 	# check
 	if {{$implex_error > {1}}} {{
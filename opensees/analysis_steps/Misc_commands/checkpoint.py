@@ -0,0 +1,77 @@
+import PyMpc.Units as u
+from PyMpc import *
+from mpc_utils_html import *
+import opensees.utils.tcl_input as tclin
+import opensees.utils.checkpoint_utils as cpu
+
+def makeXObjectMetaData():
+	
+	def mka(name, group, descr, atype, adim = None, dval = None):
+		a = MpcAttributeMetaData()
+		a.type = atype
+		a.name = name
+		a.group = group
+		a.description = (
+			html_par(html_begin()) +
+			html_par(html_boldtext(name)+'<br/>') +
+			html_par(descr) +
+			html_end()
+			)
+		if adim is not None:
+			a.dimension = adim
+		if dval is not None:
+			a.setDefault(dval)
+		return a
+	
+	at_dir = mka('Directory', 'Default',
+		'The directory (relative to the analysis directory) where the checkpoint files are saved. '
+		'Each process saves its own database (data.PID) and restart data (restart.PID.tcl).<br/>'
+		'Note: only the value of the first checkpoint step is used',
+		MpcAttributeType.String,
+		dval = 'checkpoint')
+	
+	at_interval = mka('Interval', 'Default',
+		'If greater than 0, a checkpoint is also saved every N increments in the following '
+		'load control and transient analyses, that can be resumed from the last saved increment. '
+		'If 0, the checkpoint is saved only here, at the stage boundary',
+		MpcAttributeType.Integer,
+		dval = 0)
+	
+	at_restart = mka('Restart', 'Default',
+		'If checked and a checkpoint is found, the analysis restarts from it: '
+		'the stages completed before the checkpoint are skipped and the saved state is restored '
+		'(time, increment counter and adaptive factor included).<br/>'
+		'Otherwise the analysis starts from the beginning.<br/>'
+		'Note: only the value of the first checkpoint step is used. '
+		'Recorders are not part of the saved state, so they record only from the restart point',
+		MpcAttributeType.Boolean,
+		dval = True)
+	
+	xom = MpcXObjectMetaData()
+	xom.name = 'checkpoint'
+	xom.addAttribute(at_dir)
+	xom.addAttribute(at_interval)
+	xom.addAttribute(at_restart)
+	
+	return xom
+
+def writeTcl(pinfo):
+	
+	# checkpoint
+	
+	xobj = pinfo.analysis_step.XObject
+	
+	interval = xobj.getAttribute('Interval').integer
+	if interval < 0:
+		raise Exception('Error in "checkpoint": Interval should be >= 0')
+	
+	FileName = xobj.name
+	if pinfo.currentDescription != FileName:
+		pinfo.out_file.write('\n{}# {} {}\n'.format(pinfo.indent, xobj.Xnamespace, FileName))
+		pinfo.currentDescription = FileName
+	
+	# the runtime is written only once, before the first analysis or checkpoint
+	cpu.write_setup(pinfo)
+	
+	pinfo.out_file.write('{}set STKO_VAR_checkpoint_interval {}\n'.format(pinfo.indent, interval))
+	pinfo.out_file.write('{}STKO_CALL_CheckpointBoundary\n'.format(pinfo.indent))
@@ -5,6 +5,7 @@ from itertools import groupby, count
 import opensees.utils.tcl_input as tclin
 import opensees.utils.write_element as write_element
 import opensees.utils.write_node as write_node
+import opensees.utils.selection_index_utils as siu
 
 def makeXObjectMetaData():
 	
@@ -31,22 +32,6 @@ def makeXObjectMetaData():
 	
 	return xom
 
-def __process_domain(pinfo, domain):
-	# process all elements
-	for elem in domain.elements:
-		# skip if already written
-		if elem.id in pinfo.loaded_element_subset:
-			continue
-		# add current element
-		pinfo.element_subset.add(elem.id)
-		# process all nodes of this element
-		for node in elem.nodes:
-			# skip if already written
-			if node.id in pinfo.loaded_node_subset:
-				continue
-			# add current node
-			pinfo.node_subset.add(node.id)
-
 def writeTcl(pinfo):
 	
 	# get xobject and its parent component id
@@ -71,38 +56,17 @@ def writeTcl(pinfo):
 	pinfo.node_subset = set()
 	pinfo.element_subset = set()
 	for selection_set_id in SelectionSets:
-		selection_set = doc.selectionSets[selection_set_id]
-		# process all geometry subsets
-		for geometry_id, geometry_subset in selection_set.geometries.items():
-			# get associated mesh
-			mesh_of_geom = doc.mesh.meshedGeometries[geometry_id]
-			# process all vertices
-			for vertex_id in geometry_subset.vertices:
-				node = mesh_of_geom.vertices[vertex_id]
-				# skip if already written
-				if node.id in pinfo.loaded_node_subset:
-					continue
-				# add current node
-				pinfo.node_subset.add(node.id)
-			# process all edges
-			for domain_id in geometry_subset.edges:
-				domain = mesh_of_geom.edges[domain_id];
-				__process_domain(pinfo, domain)
-			# process all faces
-			for domain_id in geometry_subset.faces:
-				domain = mesh_of_geom.faces[domain_id]
-				__process_domain(pinfo, domain)
-			# process all solids
-			for domain_id in geometry_subset.solids:
-				domain = mesh_of_geom.solids[domain_id]
-				__process_domain(pinfo, domain)
-		# process all interaction subsets
-		for interaction_id in selection_set.interactions:
-			# get associated mesh
-			mesh_of_inter = doc.mesh.meshedInteractions[interaction_id]
-			# even if it is not a domain, in the __process_domain we only access the "elements" property
-			# which is present also in mesh_of_inter
-			__process_domain(pinfo, mesh_of_inter)
+		# nodes and elements of the selection set are resolved once per export
+		index = siu.get_selection_set(doc, selection_set_id)
+		# add elements, skipping those already written
+		for ele_id in index.elements.tolist():
+			if ele_id not in pinfo.loaded_element_subset:
+				pinfo.element_subset.add(ele_id)
+		# add nodes (of elements and vertices), skipping those already written.
+		# note: nodes of elements already written have been written as well
+		for node_id in index.nodes.tolist():
+			if node_id not in pinfo.loaded_node_subset:
+				pinfo.node_subset.add(node_id)
 	
 	# save current out_file, to be restore later on
 	current_out_file = pinfo.out_file
@@ -3,6 +3,7 @@ from PyMpc import *
 import PyMpc.App
 from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
+import opensees.utils.selection_index_utils as siu
 import shutil
 import os
 import glob
@@ -28,29 +29,8 @@ class _monitor_globals:
 	# but not for results such as displacements!
 	MAP_RES_PARALLEL_AVG = ('nodeDisp', 'nodeVel', 'nodeAccel')
 
-def __get_domain_nodes(domain, tags):
-	for element in domain.elements:
-		for node in element.nodes:
-			tags.append(node.id)
-
-def __get_set_nodes(doc, sset):
-	tags = []
-	for geometry_id, geometry_subset in sset.geometries.items():
-		mesh_of_geom = doc.mesh.meshedGeometries[geometry_id]
-		for domain_id in geometry_subset.edges:
-			domain = mesh_of_geom.edges[domain_id]
-			__get_domain_nodes(domain, tags)
-		for domain_id in geometry_subset.faces:
-			domain = mesh_of_geom.faces[domain_id]
-			__get_domain_nodes(domain, tags)
-		for domain_id in geometry_subset.solids:
-			domain = mesh_of_geom.solids[domain_id]
-			__get_domain_nodes(domain, tags)
-		for domain_id in geometry_subset.vertices:
-			node = mesh_of_geom.vertices[domain_id]
-			tags.append(node.id)
-	tags = list(set(tags))
-	return tags
+def __get_set_nodes(doc, sset_id):
+	return siu.get_selection_set(doc, sset_id).geometry_nodes.tolist()
 
 def makeXObjectMetaData():
 	
@@ -401,8 +381,7 @@ def writeTcl(pinfo):
 		if itype == 'Results {} Axis Plot'.format(COMP):
 			# get nodes from all selection set entitites
 			sset_at = geta('Selection Set/{}'.format(COMP))
-			sset = doc.selectionSets[sset_at.index]
-			tags = __get_set_nodes(doc, sset)
+			tags = __get_set_nodes(doc, sset_at.index)
 			# write nodes and partition map if necessary
 			f.write('set nodes_{}_{} {{{}}}\n'.format(COMP, id_monitor, ' '.join([ str(node_id) for node_id in tags ])))
 			if is_par:
@@ -1,6 +1,11 @@
 from PyMpc import *
 from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
+import opensees.utils.selection_index_utils as siu
+import numpy as np
+
+# groups with less nodes than this are written one command per node
+_MIN_BLOCK_SIZE = 4
 
 def makeXObjectMetaData():
 	
@@ -31,6 +36,32 @@ def makeXObjectMetaData():
 	
 	return xom
 
+def _write_nodes(f, indent, doc, node_ids, is_2d, FMT):
+	'''
+	writes the node commands.
+	large groups are written as a packed coordinate block (a Tcl foreach loop)
+	'''
+	def coordinates(node_id):
+		node = doc.mesh.nodes[node_id]
+		if is_2d:
+			return '{} {} {}'.format(node_id, FMT(node.x), FMT(node.y))
+		return '{} {} {} {}'.format(node_id, FMT(node.x), FMT(node.y), FMT(node.z))
+	if len(node_ids) < _MIN_BLOCK_SIZE:
+		f.write('{}# tag x y z\n'.format(indent))
+		for node_id in node_ids:
+			f.write('{}node {}\n'.format(indent, coordinates(node_id)))
+		return
+	fields = ['STKO_VAR_node_id', 'STKO_VAR_node_x', 'STKO_VAR_node_y']
+	if not is_2d:
+		fields.append('STKO_VAR_node_z')
+	f.write('{}# tag x y z\n'.format(indent))
+	f.write('{}foreach {{{}}} {{\n'.format(indent, ' '.join(fields)))
+	for node_id in node_ids:
+		f.write('{}\t{}\n'.format(indent, coordinates(node_id)))
+	f.write('{}}} {{\n'.format(indent))
+	f.write('{}\tnode {}\n'.format(indent, ' '.join('${}'.format(i) for i in fields)))
+	f.write('{}}}\n'.format(indent))
+
 def writeTcl(pinfo):
 	
 	# node tag x y z
@@ -52,60 +83,40 @@ def writeTcl(pinfo):
 	indent =  pinfo.tabIndent
 	
 	'''
-	here we map all the nodes in the selected selection sets
-	to avoid duplicates
+	here we collect all the nodes in the selected selection sets,
+	sorted and without duplicates
 	'''
-	map_node = {}
-
+	nodes = [np.zeros(0, dtype=np.int64)]
 	for selection_set_id in SelectionSets:
 		if not selection_set_id in doc.selectionSets: continue
-		selection_set = doc.selectionSets[selection_set_id]
-		for geometry_id, geometry_subset in selection_set.geometries.items():
-			mesh_of_geom = doc.mesh.meshedGeometries[geometry_id]
-			for domain_id in geometry_subset.vertices:
-				node = mesh_of_geom.vertices[domain_id]
-				map_node[node.id] = (node.x, node.y, node.z)
-			for domain_id in geometry_subset.edges:
-				domain = mesh_of_geom.edges[domain_id]
-				for elem in domain.elements:
-					for node in elem.nodes:
-						map_node[node.id] = (node.x, node.y, node.z)
-			for domain_id in geometry_subset.faces:
-				domain = mesh_of_geom.faces[domain_id]
-				for elem in domain.elements:
-					for node in elem.nodes:
-						map_node[node.id] = (node.x, node.y, node.z)
-			for domain_id in geometry_subset.solids:
-				domain = mesh_of_geom.solids[domain_id]
-				for elem in domain.elements:
-					for node in elem.nodes:
-						map_node[node.id] = (node.x, node.y, node.z)
+		nodes.append(siu.get_selection_set(doc, selection_set_id).geometry_nodes)
+	nodes = np.unique(np.concatenate(nodes))
 	
-	process_block_count = 0
+	'''
+	in a single pass over the nodes, we find the partitions that don't have each node.
+	the missing nodes of each partition are grouped by model builder (ndm, ndf)
+	'''
+	pdata = doc.mesh.partitionData
+	process_count = len(pdata.partitions)
+	missing = [{} for i in range(process_count)]
+	for node_id in nodes.tolist():
+		for process_id in range(process_count):
+			if pdata.isNodeOnParition(node_id, process_id):
+				continue
+			model = pinfo.node_to_model_map[node_id]
+			missing[process_id].setdefault((model[0], model[1]), []).append(node_id)
+	
+	# write the missing nodes of each partition
 	FMT = pinfo.get_double_formatter()
-	for process_id in range(len(doc.mesh.partitionData.partitions)):
+	for process_id in range(process_count):
+		groups = missing[process_id]
+		if len(groups) == 0:
+			continue
 		pinfo.setProcessId(process_id)
-		first_done = False
-		for node_id in map_node:
-			if doc.mesh.partitionData.isNodeOnParition(node_id, process_id):
-				continue
-			else:
-				if not first_done:
-					if process_block_count == 0:
-						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-						pinfo.out_file.write('\n{}{}# nodeOnAllPartitions\n'.format(pinfo.indent, indent))
-						pinfo.out_file.write('{}{}{} {} {} {} {}\n'.format(pinfo.indent, indent, '#', 'tag', 'x', 'y', 'z'))
-					else:
-						pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-						pinfo.out_file.write('{}{}{} {} {} {} {}\n'.format(pinfo.indent, indent, '#', 'tag', 'x', 'y', 'z'))
-					first_done = True
-				pinfo.updateModelBuilder(pinfo.node_to_model_map[node_id][0], pinfo.node_to_model_map[node_id][1])
-				if (pinfo.node_to_model_map[node_id][0] == 2):
-					pinfo.out_file.write('{}{}node {} {} {}\n'.format(pinfo.indent, indent, node_id, FMT(map_node[node_id][0]), FMT(map_node[node_id][1])))
-				else :
-					pinfo.out_file.write('{}{}node {} {} {} {}\n'.format(pinfo.indent, indent, node_id, FMT(map_node[node_id][0]), FMT(map_node[node_id][1]), FMT(map_node[node_id][2])))
-			if first_done:
-				process_block_count += 1
-				
-		if process_block_count > 0 and first_done:
-			pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
\ No newline at end of file
+		pinfo.out_file.write('\n{}if {{$STKO_VAR_process_id == {}}} {{\n'.format(pinfo.indent, process_id))
+		pinfo.out_file.write('{}{}# nodeOnAllPartitions\n'.format(pinfo.indent, indent))
+		# start with the current model builder (if any), to avoid switching it
+		for model in sorted(groups.keys(), key = lambda item : item != (pinfo.ndm, pinfo.ndf)):
+			pinfo.updateModelBuilder(model[0], model[1])
+			_write_nodes(pinfo.out_file, pinfo.indent + indent, doc, groups[model], model[0] == 2, FMT)
+		pinfo.out_file.write('{}}}\n'.format(pinfo.indent))
\ No newline at end of file
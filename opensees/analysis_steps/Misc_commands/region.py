@@ -3,6 +3,7 @@ from PyMpc import *
 from mpc_utils_html import *
 from itertools import groupby, count
 import opensees.utils.tcl_input as tclin
+import opensees.utils.selection_index_utils as siu
 
 def ele_range_string(tagList):
 	l = list(tagList)
@@ -201,34 +202,28 @@ def makeXObjectMetaData():
 	
 	return xom
 
-def extract_tags(pinfo, domain, tag, xobj, is_ele):
-	if is_ele:
-		include_auto_generated_elements_at = xobj.getAttribute('include_auto_generated_elements')
-		if(include_auto_generated_elements_at is None):
-			raise Exception('Error: cannot find "include_auto_generated_elements" attribute')
-		include_auto_generated_elements = include_auto_generated_elements_at.string
-		if include_auto_generated_elements == 'selection':
-			for elem in domain.elements:
-				tag.append(elem.id) # include source
-		elif include_auto_generated_elements == 'selection + include_auto_generated_elements':
-			for elem in domain.elements:
-				tag.append(elem.id) # include source
-				if elem.id in pinfo.auto_generated_element_data_map:
-					ele_map = pinfo.auto_generated_element_data_map[elem.id]
-					if (ele_map is not None):
-						for id_elem_auto_generated in ele_map.elements:
-							tag.append(id_elem_auto_generated) # include also auto-gen
-		elif include_auto_generated_elements == 'include_auto_generated_elements - selection':
-			for elem in domain.elements:
-				if elem.id in pinfo.auto_generated_element_data_map:
-					ele_map = pinfo.auto_generated_element_data_map[elem.id]
-					if (ele_map is not None):
-						for id_elem_auto_generated in ele_map.elements:
-							tag.append(id_elem_auto_generated) # include only auto-gen
-	else:
-		for elem in domain.elements:
-			for node in elem.nodes:
-				tag.append(node.id)
+def extract_tags(pinfo, ele_ids, tag, xobj):
+	include_auto_generated_elements_at = xobj.getAttribute('include_auto_generated_elements')
+	if(include_auto_generated_elements_at is None):
+		raise Exception('Error: cannot find "include_auto_generated_elements" attribute')
+	include_auto_generated_elements = include_auto_generated_elements_at.string
+	if include_auto_generated_elements == 'selection':
+		tag.extend(ele_ids) # include source
+	elif include_auto_generated_elements == 'selection + include_auto_generated_elements':
+		for ele_id in ele_ids:
+			tag.append(ele_id) # include source
+			if ele_id in pinfo.auto_generated_element_data_map:
+				ele_map = pinfo.auto_generated_element_data_map[ele_id]
+				if (ele_map is not None):
+					for id_elem_auto_generated in ele_map.elements:
+						tag.append(id_elem_auto_generated) # include also auto-gen
+	elif include_auto_generated_elements == 'include_auto_generated_elements - selection':
+		for ele_id in ele_ids:
+			if ele_id in pinfo.auto_generated_element_data_map:
+				ele_map = pinfo.auto_generated_element_data_map[ele_id]
+				if (ele_map is not None):
+					for id_elem_auto_generated in ele_map.elements:
+						tag.append(id_elem_auto_generated) # include only auto-gen
 
 def writeTcl(pinfo):
 	# region $regTag <-ele ($ele1 $ele2 ...)> <-eleOnly ($ele1 $ele2 ...)> <-eleRange $startEle $endEle>
@@ -262,25 +257,12 @@ def writeTcl(pinfo):
 	for selection_set_id in SelectionSets:
 		if not selection_set_id in doc.selectionSets: 
 			continue
-		selection_set = doc.selectionSets[selection_set_id]
-		for geometry_id, geometry_subset in selection_set.geometries.items():
-			mesh_of_geom = doc.mesh.meshedGeometries[geometry_id]
-			for domain_id in geometry_subset.edges:
-				domain = mesh_of_geom.edges[domain_id]
-				extract_tags(pinfo, domain, tags, xobj, is_ele)
-			for domain_id in geometry_subset.faces:
-				domain = mesh_of_geom.faces[domain_id]
-				extract_tags(pinfo, domain, tags, xobj, is_ele)
-			for domain_id in geometry_subset.solids:
-				domain = mesh_of_geom.solids[domain_id]
-				extract_tags(pinfo, domain, tags, xobj, is_ele)
-			if not is_ele:
-				for domain_id in geometry_subset.vertices:
-					domain = mesh_of_geom.vertices[domain_id]
-					tags.append(domain.id)
-		for interaction_id in selection_set.interactions:
-			domain = doc.mesh.meshedInteractions[interaction_id]
-			extract_tags(pinfo, domain, tags, xobj, is_ele)
+		# nodes and elements of the selection set are resolved once per export
+		index = siu.get_selection_set(doc, selection_set_id)
+		if is_ele:
+			extract_tags(pinfo, index.elements.tolist(), tags, xobj)
+		else:
+			tags.extend(index.nodes.tolist())
 	
 	# quick return
 	if len(tags) == 0:
@@ -5,6 +5,8 @@ from itertools import groupby, count
 import opensees.utils.tcl_input as tclin
 import opensees.utils.write_element as write_element
 import opensees.utils.write_node as write_node
+import opensees.utils.selection_index_utils as siu
+import numpy as np
 
 '''
 @TODO:
@@ -53,58 +55,22 @@ def makeXObjectMetaData():
 	return xom
 
 def _process_sets(doc, sets, pinfo=None):
-	nodes = []
-	eles = []
-	# process a list of elements
-	def process_domain(domain):
-		for elem in domain.elements:
-			# add current element
-			if not elem.id in eles:
-				eles.append(elem.id)
-				if pinfo is not None:
-					pinfo.remove_element_from_loaded_subset(elem.id)
-
-			# process all nodes of this element
-			for node in elem.nodes:
-				if not node.id in nodes:
-					nodes.append(node.id)
-					if pinfo is not None:
-						pinfo.remove_node_from_loaded_subset(node.id)
-      
-	# process all selection sets
+	# sorted unique node and element ids of all selection sets.
+	# each selection set is resolved only once per export (see selection_index_utils)
+	nodes = [np.zeros(0, dtype=np.int64)]
+	eles = [np.zeros(0, dtype=np.int64)]
 	for selection_set_id in sets:
-		selection_set = doc.selectionSets[selection_set_id]
-		# process all geometry subsets
-		for geometry_id, geometry_subset in selection_set.geometries.items():
-			# get associated mesh
-			mesh_of_geom = doc.mesh.meshedGeometries[geometry_id]
-			# process all vertices
-			for vertex_id in geometry_subset.vertices:
-				node = mesh_of_geom.vertices[vertex_id]
-				if not node.id in nodes:
-					nodes.append(node.id)
-					if pinfo is not None:
-						pinfo.remove_node_from_loaded_subset(node.id)
-      
-			# process all edges
-			for domain_id in geometry_subset.edges:
-				domain = mesh_of_geom.edges[domain_id];
-				process_domain(domain)
-			# process all faces
-			for domain_id in geometry_subset.faces:
-				domain = mesh_of_geom.faces[domain_id]
-				process_domain(domain)
-			# process all solids
-			for domain_id in geometry_subset.solids:
-				domain = mesh_of_geom.solids[domain_id]
-				process_domain(domain)
-		# process all interaction subsets
-		for interaction_id in selection_set.interactions:
-			# get associated mesh
-			mesh_of_inter = doc.mesh.meshedInteractions[interaction_id]
-			# even if it is not a domain, in the process_domain we only access the "elements" property
-			# which is present also in mesh_of_inter
-			process_domain(mesh_of_inter)
+		index = siu.get_selection_set(doc, selection_set_id)
+		nodes.append(index.nodes)
+		eles.append(index.elements)
+	nodes = np.unique(np.concatenate(nodes))
+	eles = np.unique(np.concatenate(eles))
+	# remove them from the loaded subsets
+	if pinfo is not None:
+		for ele_id in eles.tolist():
+			pinfo.remove_element_from_loaded_subset(ele_id)
+		for node_id in nodes.tolist():
+			pinfo.remove_node_from_loaded_subset(node_id)
 	# done
 	return (nodes, eles)
 
@@ -171,7 +137,7 @@ def writeTcl(pinfo):
 	rem_nodes, rem_eles = _process_sets(doc, remove_sets.indexVector, pinfo)
 	
 	# remove nodes to be kept
-	rem_nodes = [i for i in rem_nodes if not i in keep_nodes]
+	rem_nodes = np.setdiff1d(rem_nodes, keep_nodes, assume_unique=True)
 	
 	# quick return
 	if len(rem_nodes) == 0 and len(rem_eles) == 0:
@@ -179,9 +145,13 @@ def writeTcl(pinfo):
 	
 	# write for sequential or partitioned models
 	if is_partitioned:
+		# split by partition: elements with their own partition, nodes with the partitions
+		# where the node writer defined them (see selection_index_utils.split_nodes)
+		rem_nodes_buckets = siu.split_nodes(doc, rem_nodes)
+		rem_eles_buckets = siu.split_elements(doc, rem_eles)
 		for process_id in range(len(pdata.partitions)):
-			rem_nodes_p = [i for i in rem_nodes if pdata.isNodeOnParition(i, process_id)]
-			rem_eles_p = [i for i in rem_eles if pdata.elementPartition(i) == process_id]
+			rem_nodes_p = rem_nodes_buckets[process_id].tolist()
+			rem_eles_p = rem_eles_buckets[process_id].tolist()
 			if len(rem_nodes_p) + len(rem_eles_p) > 0:
 				pinfo.setProcessId(process_id)
 				pinfo.out_file.write('{}if {{$STKO_VAR_process_id == {}}} {{\n'.format(pinfo.indent, process_id))
@@ -189,7 +159,7 @@ def writeTcl(pinfo):
 				pinfo.out_file.write('{}}}\n'.format(pinfo.indent))
 				pinfo.setProcessId(0)
 	else:
-		_write(pinfo.out_file, pinfo.indent, rem_nodes, rem_eles)
+		_write(pinfo.out_file, pinfo.indent, rem_nodes.tolist(), rem_eles.tolist())
 	
 	# done, run a domainChange in all partitions
 	pinfo.out_file.write('\n{}domainChange\n'.format(pinfo.indent))
\ No newline at end of file
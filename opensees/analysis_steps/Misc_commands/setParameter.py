@@ -88,6 +88,7 @@ def writeTcl(pinfo):
 	
 	from io import StringIO
 	import opensees.utils.RandomMaterialTable as RMT
+	import opensees.utils.element_centroid_utils as ecu
 	import os
 	from datetime import datetime
 	import numpy as np
@@ -165,6 +166,23 @@ def writeTcl(pinfo):
 	else:
 		pid_element_map[0] = parameter_map_elem
 	
+	# make command string (a single command for multiple elements)
+	def commandstring(eles, indent, param, value):
+		stream = StringIO()
+		stream.write('{}setParameter -val {} -ele \\\n'.format(indent, value))
+		count = 0
+		n = len(eles)
+		for i in range(n):
+			count += 1
+			if count == 1:
+				stream.write('{}{}'.format(indent, pinfo.tabIndent))
+			stream.write('{} '.format(eles[i]))
+			if count == 10 and i < n-1:
+				count = 0
+				stream.write('\\\n')
+		stream.write(' {}\n'.format(param))
+		return stream.getvalue()
+	
 	# process based on parameter mode
 	if pmode == 'From Table':
 		
@@ -177,39 +195,19 @@ def writeTcl(pinfo):
 		# create the RMT
 		if not os.path.isabs(fname):
 			fname = os.path.join(pinfo.out_dir, fname)
-		rmt = RMT.RMT(fname)
+		rmt = RMT.get(fname)
 		
 		# compute element centers
-		# in a numpy Nx3 matrix
+		# in a numpy Nx3 matrix, using the element centroid table
+		# (built once for all spatial-mapping features)
 		NC = len(parameter_map_elem)
-		EC = np.zeros((NC, 3))
-		for i in range(NC):
+		EC, found = ecu.get_table(pinfo).centers_of(parameter_map_elem)
+		for i in np.nonzero(~found)[0].tolist():
+			# it can be an auto-generated element
 			ele_id = parameter_map_elem[i]
-			element = doc.mesh.getElement(ele_id)
-			if element:
-				# the element exists in STKO
-				ic = element.computeCenter()
-				EC[i,0] = ic.x
-				EC[i,1] = ic.y
-				EC[i,2] = ic.z
-			else:
-				# it can be an auto-generated element
-				econn = auto_gen_elements_conn_map.get(ele_id, None)
-				if econn and len(econn) > 0: # otherwise leave zeros...
-					icx = 0.0
-					icy = 0.0
-					icz = 0.0
-					for nid, npos in econn:
-						icx += npos[0]
-						icy += npos[1]
-						icz += npos[2]
-					nconn = float(len(econn))
-					icx /= nconn
-					icy /= nconn
-					icz /= nconn
-					EC[i,0] = icx
-					EC[i,1] = icy
-					EC[i,2] = icz
+			econn = auto_gen_elements_conn_map.get(ele_id, None)
+			if econn and len(econn) > 0: # otherwise leave zeros...
+				EC[i,:] = np.mean([npos for nid, npos in econn], axis=0)
 		
 		# find, for each center, the 0-based position of the nearest material point
 		print('setParameter ({})'.format(pinfo.analysis_step.id))
@@ -235,6 +233,35 @@ def writeTcl(pinfo):
 		args = rmt.args
 		nargs = len(args)
 		
+		# group elements by (argument, value).
+		# elements sharing the same nearest material share all its values,
+		# so we first group them by material id
+		def grouped_commands(elements, indent):
+			mat_groups = {}
+			for ele_id in elements:
+				mat_id = rmt.mat_point_ids[ele_nearest_pos_map[ele_id]]
+				mat_eles = mat_groups.get(mat_id, None)
+				if mat_eles is None:
+					mat_eles = []
+					mat_groups[mat_id] = mat_eles
+				mat_eles.append(ele_id)
+			groups = [{} for i in range(nargs)]
+			for mat_id, mat_eles in mat_groups.items():
+				mat_values = mat_map[mat_id]
+				for i in range(nargs):
+					ival = str(mat_values[i])
+					group = groups[i].get(ival, None)
+					if group is None:
+						group = []
+						groups[i][ival] = group
+					group.extend(mat_eles)
+			stream = StringIO()
+			for i in range(nargs):
+				iarg = '"{}"'.format(args[i])
+				for ival, eles in groups[i].items():
+					stream.write(commandstring(eles, indent, iarg, ival))
+			return stream.getvalue()
+		
 		# create an auxiliary file
 		param_file_name = 'setParameter_{}.tcl'.format(pinfo.analysis_step.id)
 		pinfo.out_file.write('{}source {}\n'.format(pinfo.indent, param_file_name))
@@ -244,23 +271,12 @@ def writeTcl(pinfo):
 				for pid, elements in pid_element_map.items():
 					if len(elements) > 0:
 						param_file.write('if {{$STKO_VAR_process_id == {}}} {{\n'.format(pid))
-						for ele_id in elements:
-							ele_nearest_pos = ele_nearest_pos_map[ele_id]
-							mat_values = mat_map[rmt.mat_point_ids[ele_nearest_pos]]
-							for i in range(nargs):
-								iarg = args[i]
-								ival = mat_values[i]
-								param_file.write('{}setParameter -val {} -ele {} "{}"\n'.format(pinfo.tabIndent, ival, ele_id, iarg))
+						param_file.write(grouped_commands(elements, pinfo.tabIndent))
 						param_file.write('}\n')
 			else:
 				elements = pid_element_map[0]
-				for ele_id in elements:
-					ele_nearest_pos = ele_nearest_pos_map[ele_id]
-					mat_values = mat_map[rmt.mat_point_ids[ele_nearest_pos]]
-					for i in range(nargs):
-						iarg = args[i]
-						ival = mat_values[i]
-						param_file.write('setParameter -val {} -ele {} "{}"\n'.format(ival, ele_id, iarg))
+				if len(elements) > 0:
+					param_file.write(grouped_commands(elements, ''))
 		
 	else:
 		
@@ -268,23 +284,6 @@ def writeTcl(pinfo):
 		param = _geta(xobj, 'Parameter Name').string
 		value = _geta(xobj, 'Parameter New Value').real
 		
-		# make command string
-		def commandstring(eles, indent, param, value):
-			stream = StringIO()
-			stream.write('{}setParameter -val {} -ele \\\n'.format(indent, value))
-			count = 0
-			n = len(eles)
-			for i in range(n):
-				count += 1
-				if count == 1:
-					stream.write('{}{}'.format(indent, pinfo.tabIndent))
-				stream.write('{} '.format(eles[i]))
-				if count == 10 and i < n-1:
-					count = 0
-					stream.write('\\\n')
-			stream.write(' {}\n'.format(param))
-			return stream.getvalue()
-		
 		# comment
 		pinfo.out_file.write('\n{}# setParameter ({}) = {}\n'.format(pinfo.indent, param, value))
 		
@@ -1,6 +1,7 @@
 from PyMpc import *
 from mpc_utils_html import *
 import os
+import shutil
 
 def makeXObjectMetaData():
 	
@@ -355,20 +356,32 @@ def writeTcl(pinfo):
 	
 	doc = App.caeDocument()
 	if doc is not None:
-		if pinfo.process_count > 1:
-			for i in range(pinfo.process_count):
-				cdata_filename = '{}.part-{}.mpco.cdata'.format(mpco_file_name, i)
-				if not os.path.isabs(cdata_filename):
-					cdata_filename = os.path.normpath(os.path.join(pinfo.out_dir, cdata_filename))
+		# the cdata file depends only on the mesh and on the partition,
+		# so it is generated only once per export for each partition.
+		# other recorders (or the same recorder in other stages) reuse it.
+		# key = partition (None if not partitioned), value = (source file name, set of all written file names)
+		cdata_files = pinfo.custom_data.get('MPCOCdataFiles', None)
+		if cdata_files is None:
+			cdata_files = {}
+			pinfo.custom_data['MPCOCdataFiles'] = cdata_files
+		def write_cdata(cdata_filename, partition):
+			if not os.path.isabs(cdata_filename):
+				cdata_filename = os.path.normpath(os.path.join(pinfo.out_dir, cdata_filename))
+			item = cdata_files.get(partition, None)
+			if item is None:
 				cdata_io = MpcMeshIOMpcoCdata(cdata_filename)
-				cdata_io.setPartition(i)
+				if partition is not None:
+					cdata_io.setPartition(partition)
 				cdata_io.write(doc.mesh)
+				cdata_files[partition] = (cdata_filename, set([cdata_filename]))
+			elif not cdata_filename in item[1]:
+				shutil.copyfile(item[0], cdata_filename)
+				item[1].add(cdata_filename)
+		if pinfo.process_count > 1:
+			for i in range(pinfo.process_count):
+				write_cdata('{}.part-{}.mpco.cdata'.format(mpco_file_name, i), i)
 		else:
-			cdata_filename = '{}.mpco.cdata'.format(mpco_file_name)
-			if not os.path.isabs(cdata_filename):
-				cdata_filename = os.path.normpath(os.path.join(pinfo.out_dir, cdata_filename))
-			cdata_io = MpcMeshIOMpcoCdata(cdata_filename)
-			cdata_io.write(doc.mesh)
+			write_cdata('{}.mpco.cdata'.format(mpco_file_name), None)
 	
 	################################################################
 	# write the last newline
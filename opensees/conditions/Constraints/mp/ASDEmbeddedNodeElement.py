@@ -220,128 +220,133 @@ def writeTcl_mpConstraints(pinfo):
 	# some stats
 	stats = [0, 0]
 	
-	# internal function to process all interactions
-	def internal(process_id, process_block_count):
+	
+	# source element families supported as embedding domain.
+	# for each family: (number of corner nodes, embedding sub-simplices, batched local coordinates function)
+	# note: for any triangle, the first 3 nodes are the corner ones,
+	# for any tetrahedron or quadrilateral, the first 4 nodes are the corner ones,
+	# for any hexahedron, the first 8 nodes are the corner ones
+	family_info = {
+		MpcElementGeometryFamilyType.Triangle : (3, [[0,1,2]], ebu.lct3_batch),
+		MpcElementGeometryFamilyType.Tetrahedron : (4, [[0,1,2,3]], ebu.lct4_batch),
+		MpcElementGeometryFamilyType.Quadrilateral : (4, ebu.QSubs, ebu.lct3_batch),
+		MpcElementGeometryFamilyType.Hexahedron : (8, ebu.HSubs, ebu.lct4_batch),
+		}
+	
+	# collect all link elements in a single pass, grouped by source element family.
+	# links are stored in the same order they are found, so that the output
+	# does not depend on the grouping
+	links = []
+	family_links = {}
+	for inter in all_inter:
+		# get info about master geometry and do some checks
+		if inter.type != MpcInteractionType.NodeToElement:
+			raise Exception(_err(pinfo.condition.id, 
+				'Interaction "{}" [{}] should be a Node-to-Element interaction, not {}.'.format(
+					inter.name, inter.id, inter.type)
+					))
+		# process all link elements
+		moi = doc.mesh.getMeshedInteraction(inter.id)
+		for elem in moi.elements:
+			# partition of this element
+			process_id = doc.mesh.partitionData.elementPartition(elem.id) if is_partitioned else 0
+			if process_id < 0 or process_id >= pinfo.process_count:
+				raise Exception(_err(pinfo.condition.id, 
+					'Link element {} has an invalid partition ({}), expected a value in [0, {})'.format(
+						elem.id, process_id, pinfo.process_count)
+					))
+			# number of retained nodes and constrained nodes
+			NN = len(elem.nodes)
+			NM = elem.numberOfMasterNodes()
+			NS = NN - NM
+			if NS != 1:
+				raise Exception(_err(pinfo.condition.id, 'Link element should have only 1 constrained node'))
+			# the constrained node
+			Cnode = elem.nodes[-1]
+			# get source element
+			source_elem = elem.sourceElement
+			if source_elem is None:
+				raise Exception(_err(pinfo.condition.id, 'Link element should have a valid source element'))
+			# check source element
+			family = source_elem.geometryFamilyType()
+			info = family_info.get(family, None)
+			if info is None:
+				# unsupported element type
+				raise Exception(_err(pinfo.condition.id, 
+					'The source element (master geometry) of the Link element {} '
+					'has a wrong family type ({})'.format(elem.id, family)
+					))
+			corners = [source_elem.nodes[i] for i in range(info[0])]
+			# store (process_id, elem_id, Cnode_id, corner nodes), retained nodes and distance are computed later
+			family_data = family_links.get(family, None)
+			if family_data is None:
+				family_data = ([], [], [])
+				family_links[family] = family_data
+			family_data[0].append(len(links))
+			family_data[1].append([[n.x for n in corners], [n.y for n in corners], [n.z for n in corners]])
+			family_data[2].append([Cnode.x, Cnode.y, Cnode.z])
+			links.append([process_id, elem.id, Cnode.id, corners, None, 0.0])
+	
+	# solve all barycentric systems of each family at once,
+	# and extract the embedding sub-simplex (3-node triangle or 4-node tetrahedron)
+	for family, (indices, XE, G) in family_links.items():
+		_, subs, lct_batch = family_info[family]
+		best, distance = ebu.closestSubSimplex(np.asarray(XE, dtype=float), np.asarray(G, dtype=float), subs, lct_batch)
+		for index, ibest, idistance in zip(indices, best.tolist(), distance.tolist()):
+			link = links[index]
+			link[4] = [link[3][i] for i in subs[ibest]]
+			link[5] = idistance
+	
+	# bucket links by partition in a single pass
+	buckets = [[] for i in range(pinfo.process_count)]
+	for link in links:
+		buckets[link[0]].append(link)
+	
+	# write description
+	description = '\n{}# element ASDEmbeddedNodeElement $Tag  $Cnode   $Rnode1 $Rnode2 $Rnode3 <$Rnode4>   <-K $K> <-rot> <-p> <-KP $KP>\n'.format(pinfo.indent)
+	pinfo.out_file.write(description)
+	
+	# write each partition
+	process_block_count = 0
+	for process_id in range(pinfo.process_count):
+		if is_partitioned:
+			pinfo.setProcessId(process_id)
 		# first-done flag for partitioned process
 		first_done = False
-		# process each interaction
-		for inter in all_inter:
-			# get info about master geometry and do some checks
-			if inter.type != MpcInteractionType.NodeToElement:
-				raise Exception(_err(pinfo.condition.id, 
-					'Interaction "{}" [{}] should be a Node-to-Element interaction, not {}.'.format(
-						inter.name, inter.id, inter.type)
-						))
-			# process all link elements
-			moi = doc.mesh.getMeshedInteraction(inter.id)
-			for elem in moi.elements:
-				# skip elements not on this partition
-				if is_partitioned:
-					if doc.mesh.partitionData.elementPartition(elem.id) != process_id:
-						continue
-				# number of retained nodes and constrained nodes
-				NN = len(elem.nodes)
-				NM = elem.numberOfMasterNodes()
-				NS = NN - NM
-				if NS != 1:
-					raise Exception(_err(pinfo.condition.id, 'Link element should have only 1 constrained node'))
-				# the constrained node
-				Cnode = elem.nodes[-1]
-				Cpos = np.asarray([[Cnode.x],[Cnode.y], [Cnode.z]])
-				# get source element
-				source_elem = elem.sourceElement
-				if source_elem is None:
-					raise Exception(_err(pinfo.condition.id, 'Link element should have a valid source element'))
-				# check source element and extract embedding sub-simplex (3-node triangle or 4-node tetrahedron)
-				retained_nodes = []
-				distance = 1.0e10
-				family = source_elem.geometryFamilyType()
-				if family == MpcElementGeometryFamilyType.Triangle:
-					# for any triangle, the first 3 nodes are the corner ones
-					retained_nodes = [source_elem.nodes[i] for i in range(3)]
-					_, distance = ebu.lct3(retained_nodes, Cpos)
-				elif family == MpcElementGeometryFamilyType.Tetrahedron:
-					# for any tetrahedron, the first 4 nodes are the corner ones
-					retained_nodes = [source_elem.nodes[i] for i in range(4)]
-					_, distance = ebu.lct4(retained_nodes, Cpos)
-				elif family == MpcElementGeometryFamilyType.Quadrilateral:
-					# for any quadrilateral, the first 4 nodes are the corner ones.
-					# we need to find the closest sub-simplex
-					aux = []
-					for sub in ebu.QSubs:
-						trial_nodes = [source_elem.nodes[i] for i in sub]
-						_, trial_distance = ebu.lct3(trial_nodes, Cpos)
-						aux.append((trial_nodes, trial_distance))
-					aux = sorted(aux, key = lambda variable: variable[1])
-					retained_nodes = aux[0][0]
-					distance = aux[0][1]
-				elif family == MpcElementGeometryFamilyType.Hexahedron:
-					# for any hexahedron, the first 8 nodes are the corner ones.
-					# we need to find the closest sub-simplex
-					aux = []
-					for sub in ebu.HSubs:
-						trial_nodes = [source_elem.nodes[i] for i in sub]
-						_, trial_distance = ebu.lct4(trial_nodes, Cpos)
-						aux.append((trial_nodes, trial_distance))
-					aux = sorted(aux, key = lambda variable: variable[1])
-					retained_nodes = aux[0][0]
-					distance = aux[0][1]
+		for _, elem_id, Cnode_id, _, retained_nodes, distance in buckets[process_id]:
+			# check distance
+			if distance > 1.0e-2:
+				if ignore_outside:
+					stats[1] += 1
+					continue
 				else:
-					# unsupported element type
 					raise Exception(_err(pinfo.condition.id, 
-						'The source element (master geometry) of the Link element {} '
-						'has a wrong family type ({})'.format(elem.id, family)
+						'The constrained node of the Link element {} '
+						'is outside the embedding domain (error = {} %; Max allowed error = 1.0 %)'.format(elem_id, distance*100.0)
 						))
-				# check distance
-				if distance > 1.0e-2:
-					if ignore_outside:
-						stats[1] += 1
-						continue
+			# open process if-statement block
+			block_indent = ''
+			if is_partitioned:
+				block_indent = pinfo.tabIndent
+				if not first_done:
+					if process_block_count == 0:
+						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
 					else:
-						raise Exception(_err(pinfo.condition.id, 
-							'The constrained node of the Link element {} '
-							'is outside the embedding domain (error = {} %; Max allowed error = 1.0 %)'.format(elem.id, distance*100.0)
-							))
-				# open process if-statement block
-				block_indent = ''
-				if is_partitioned:
-					block_indent = pinfo.tabIndent
-					if not first_done:
-						if process_block_count == 0:
-							pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-						else:
-							pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-						first_done = True
-				# write this element
-				pinfo.out_file.write(
-					'{}{}element ASDEmbeddedNodeElement {}  {}   {}   -K {} {} {} {}\n'.format(
-						pinfo.indent, block_indent, elem.id, Cnode.id, 
-						' '.join(str(Rnode.id) for Rnode in retained_nodes),
-						K, rot, pressure, KP
-						)
+						pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
+					first_done = True
+			# write this element
+			pinfo.out_file.write(
+				'{}{}element ASDEmbeddedNodeElement {}  {}   {}   -K {} {} {} {}\n'.format(
+					pinfo.indent, block_indent, elem_id, Cnode_id, 
+					' '.join(str(Rnode.id) for Rnode in retained_nodes),
+					K, rot, pressure, KP
 					)
-				stats[0] += 1
-		# end-for-each-interaction
+				)
+			stats[0] += 1
 		# update process block count
-		if is_partitioned:
-			if first_done:
-				process_block_count += 1
-			if process_block_count > 0 and first_done:
-				pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
-		return process_block_count
-	
-	# write description
-	description = '\n{}# element ASDEmbeddedNodeElement $Tag  $Cnode   $Rnode1 $Rnode2 $Rnode3 <$Rnode4>   <-K $K> <-rot> <-p> <-KP $KP>\n'.format(pinfo.indent)
-	pinfo.out_file.write(description)
-	
-	# call the internal function based on partitions
-	if is_partitioned:
-		process_block_count = 0
-		for process_id in range(pinfo.process_count):
-			pinfo.setProcessId(process_id)
-			process_block_count = internal(process_id, process_block_count)
-	else:
-		internal(0, 0)
+		if is_partitioned and first_done:
+			process_block_count += 1
+			pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
 	
 	# print stats
 	print('Processed "ASDEmbeddedNodeElement" at "Condition {}":'.format(pinfo.condition.id))
@@ -78,4 +78,61 @@ class ASDEmbeddedNodeElementUtils:
 			iN = N[i][0]
 			if iN < 0.0:
 				distance = max(distance, -iN)
-		return ((x,y,z), distance)
\ No newline at end of file
+		return ((x,y,z), distance)
+	
+	# local coordinates from global coordinates of a batch of triangles.
+	# X = (n,3,3) stacked position matrices, G = (n,3) stacked global points
+	def lct3_batch(X, G):
+		n = X.shape[0]
+		dN = np.asarray([
+			[-1.0, -1.0, 0.0],
+			[1.0, 0.0, 0.0],
+			[0.0, 1.0, 0.0]])
+		J = np.matmul(X,dN)
+		vz = np.cross(J[:,:,0], J[:,:,1])
+		vz /= np.maximum(np.linalg.norm(vz, axis=1), 1.0e-16)[:,None]
+		J[:,:,2] = vz
+		D = G-X[:,:,0]
+		L = np.linalg.solve(J, D.reshape(n,3,1)).reshape(n,3)
+		# result
+		x,y = L[:,0], L[:,1]
+		# check for negative values as an error measure
+		N = np.stack((1.0-x-y, x, y), axis=1)
+		distance = np.maximum(-N.min(axis=1), 0.0)
+		return (L[:,0:2], distance)
+	
+	# local coordinates from global coordinates of a batch of tetrahedra.
+	# X = (n,3,4) stacked position matrices, G = (n,3) stacked global points
+	def lct4_batch(X, G):
+		n = X.shape[0]
+		dN = np.asarray([
+			[-1.0, -1.0, -1.0],
+			[1.0, 0.0, 0.0],
+			[0.0, 1.0, 0.0],
+			[0.0, 0.0, 1.0]])
+		J = np.matmul(X,dN)
+		D = G-X[:,:,0]
+		L = np.linalg.solve(J, D.reshape(n,3,1)).reshape(n,3)
+		x,y,z = L[:,0], L[:,1], L[:,2]
+		N = np.stack((1.0-x-y-z, x, y, z), axis=1)
+		distance = np.maximum(-N.min(axis=1), 0.0)
+		return (L, distance)
+	
+	# find the closest sub-simplex of a batch of elements.
+	# XE = (n,3,NE) stacked position matrices of the corner nodes,
+	# G = (n,3) stacked global points, subs = list of sub-simplices
+	# (use [list(range(NE))] for simplices).
+	# returns the index of the best sub-simplex and its distance for each element
+	def closestSubSimplex(XE, G, subs, lct_batch):
+		n = XE.shape[0]
+		nsub = len(subs)
+		if n == 0:
+			return (np.zeros(0, dtype=int), np.zeros(0))
+		# stack all (element, sub-simplex) pairs and solve them at once
+		XS = np.concatenate([XE[:,:,sub] for sub in subs], axis=0)
+		GS = np.tile(G, (nsub,1))
+		_, distance = lct_batch(XS, GS)
+		distance = distance.reshape(nsub, n)
+		# argmin returns the first minimum, as a stable sort would do
+		best = np.argmin(distance, axis=0)
+		return (best, distance[best, np.arange(n)])
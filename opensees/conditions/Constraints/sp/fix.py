@@ -2,6 +2,7 @@ import PyMpc.Units as u
 from PyMpc import *
 from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
+import opensees.utils.selection_index_utils as siu
 
 class my_data:
 	def __init__(self):
@@ -385,30 +386,7 @@ def __control(xobj):
 
 def __get_nodes(condition):
 	doc = App.caeDocument()
-	all_geom = condition.assignment.geometries
-	nodes = []
-	for geom, subset in all_geom.items():
-		mesh_of_geom = doc.mesh.getMeshedGeometry(geom.id)
-		for i in subset.edges:
-			domain = mesh_of_geom.edges[i]
-			for elem in domain.elements:
-				for node in elem.nodes:
-					nodes.append(node.id)
-		for i in subset.faces:
-			domain = mesh_of_geom.faces[i]
-			for elem in domain.elements:
-				for node in elem.nodes:
-					nodes.append(node.id)
-		for i in subset.solids:
-			domain = mesh_of_geom.solids[i]
-			for elem in domain.elements:
-				for node in elem.nodes:
-					nodes.append(node.id)
-		for i in subset.vertices:
-			node = mesh_of_geom.vertices[i]
-			nodes.append(node.id)
-	nodes = list(set(nodes))
-	return nodes
+	return siu.get_condition(doc, condition).geometry_nodes.tolist()
 
 def makeConditionRepresentationData(xobj):
 	d = MpcConditionRepresentationData()
@@ -510,9 +488,9 @@ def SP_getNodesAndDofs(pinfo):
 	
 	return (nodes, dofs)
 
-def __build_fix_string(node_ndf, ndf, indent, tabIndent, node_id, sopt):
+def __build_fix_flags(node_ndf, ndf, sopt):
 	'''
-	builds the fix command string taking care of consistency between
+	builds the fix flags string taking care of consistency between
 	the NDF of the current node and the NDF of the SP constraint
 	@note: in string like this: sopt[:node_ndf*2]))
 	the *2 factor is there because sopt is string with 1 and 0, with white spaces in between
@@ -523,14 +501,14 @@ def __build_fix_string(node_ndf, ndf, indent, tabIndent, node_id, sopt):
 		# when we are in 2D with 3 dofs:
 		# even if both node_ndf and ndf = 3, it may happen that
 		# the user selected 2D U-P for node and 2D U-R for constraint.
-		return '{}{}fix {}{}\n'.format(indent, tabIndent, node_id , sopt)
+		return sopt
 	elif(node_ndf < ndf):
 		# get only the first node_ndf fix flags
 		if(node_ndf == 4):
 			# avoid considering Rx as P (only with node = 3DUP -> SP = 3DUR)
-			return '{}{}fix {}{} 0\n'.format(indent, tabIndent, node_id ,sopt[:(node_ndf-1)*2])
+			return '{} 0'.format(sopt[:(node_ndf-1)*2])
 		# any other case
-		return '{}{}fix {}{}\n'.format(indent, tabIndent, node_id , sopt[:node_ndf*2])
+		return sopt[:node_ndf*2]
 	elif(node_ndf > ndf):
 		# fill the difference with zero flags
 		ndf_diff = node_ndf - ndf # general case 4-3 6-3
@@ -538,8 +516,7 @@ def __build_fix_string(node_ndf, ndf, indent, tabIndent, node_id, sopt):
 		if ndf == 4: # avoid considering Rx as P
 			ndf_diff += 1
 			trim = 1
-		s = '{} {}'.format(sopt[:len(sopt)-2*trim], ' '.join(['0']*ndf_diff))
-		return '{}{}fix {}{}\n'.format(indent, tabIndent, node_id , s)
+		return '{} {}'.format(sopt[:len(sopt)-2*trim], ' '.join(['0']*ndf_diff))
 		
 def writeTcl_spConstraints(pinfo):
 	
@@ -604,56 +581,50 @@ def writeTcl_spConstraints(pinfo):
 	# fixed 6/2/2020. not used in opensees
 	#pinfo.updateModelBuilder(ndm, ndf)
 	
-	nodes = __get_nodes(pinfo.condition)
-	
 	doc = App.caeDocument()
 	if(doc is None):
 		raise Exception('null cae document')
 	
+	# get the fix flags of each node (they depend on the node NDF)
+	index = siu.get_condition(doc, pinfo.condition)
+	node_flags = {}
+	for node_id in index.geometry_nodes.tolist():
+		if (node_id in pinfo.node_to_model_map):
+			spatial_info = pinfo.node_to_model_map[node_id]
+			node_ndm = spatial_info[0]
+			node_ndf = spatial_info[1]
+			if (ndm != node_ndm) :
+				raise Exception('Error: condition and node have different NDM')
+		else :
+			raise Exception('Error: node without assigned element')		#nodo senza elemento assegnato
+		node_flags[node_id] = __build_fix_flags(node_ndf, ndf, sopt)
+	
+	# write nodes with the same fix flags together.
+	# nodes are bucketed by partition in a single pass
+	def write_nodes(nodes):
+		groups = {}
+		for node_id in nodes.tolist():
+			flags = node_flags[node_id]
+			group = groups.get(flags, None)
+			if group is None:
+				group = []
+				groups[flags] = group
+			group.append(node_id)
+		for flags, group in groups.items():
+			siu.write_id_commands(pinfo.out_file, '{}{}'.format(pinfo.indent, pinfo.tabIndent), group, ['fix {0}' + flags])
+	
 	if pinfo.process_count > 1:
 		process_block_count = 0
-		for process_id in range(pinfo.process_count):
-			first_done = False
-			
-			str_tcl = []
-			for node_id in nodes:
-				if (node_id in pinfo.node_to_model_map):
-				
-					if not doc.mesh.partitionData.isNodeOnParition(node_id, process_id):
-						continue
-					if not first_done:
-						if process_block_count == 0:
-							pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-						else:
-							pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-						first_done = True
-				
-					spatial_info = pinfo.node_to_model_map[node_id]
-					node_ndm = spatial_info[0]
-					node_ndf = spatial_info[1]
-					if (ndm != node_ndm) :
-						raise Exception('Error: condition and node have different NDM')
-				else :
-					raise Exception('Error: node without assigned element')		#nodo senza elemento assegnato
-				pinfo.out_file.write(__build_fix_string(node_ndf, ndf, pinfo.indent, pinfo.tabIndent, node_id, sopt))
-			
-			if first_done:
-				process_block_count += 1
-			if process_block_count > 0 and first_done:
-				pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
+		for process_id, nodes in enumerate(index.node_buckets(doc, 'geometry_nodes')):
+			if len(nodes) == 0:
+				continue
+			if process_block_count == 0:
+				pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
+			else:
+				pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
+			write_nodes(nodes)
+			process_block_count += 1
+			pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
 		pinfo.out_file.write('\n')
 	else:
-		str_tcl = []
-		for node_id in nodes:
-			if (node_id in pinfo.node_to_model_map):
-				spatial_info = pinfo.node_to_model_map[node_id]
-				node_ndm = spatial_info[0]
-				node_ndf = spatial_info[1]
-				if (ndm != node_ndm) :
-					raise Exception('Error: condition and node have different NDM')
-			else :
-				raise Exception('Error: node without assigned element')		#nodo senza elemento assegnato
-			pinfo.out_file.write(__build_fix_string(node_ndf, ndf, pinfo.indent, pinfo.tabIndent, node_id, sopt))
-		
-		# now write the string into the file
-		pinfo.out_file.write(''.join(str_tcl))
\ No newline at end of file
+		write_nodes(index.geometry_nodes)
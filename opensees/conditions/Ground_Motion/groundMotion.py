@@ -2,6 +2,7 @@ import PyMpc.Units as u
 from PyMpc import *
 from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
+import opensees.utils.selection_index_utils as siu
 import PyMpc.App
 
 def makeXObjectMetaData():
@@ -462,64 +463,48 @@ def writeTcl_groundMotion(pinfo, xobj, tag):
 	# get document
 	doc = App.caeDocument()
 	
-	# process all geometries and map nodes to their process id
-	pcount = pinfo.process_count
-	if pcount > 1:
-		partition_data = doc.mesh.partitionData
-		nodes = [[] for i in range(pcount)]
-	else:
-		partition_data = None
-		nodes = []
-	# utility to append the node_id to its proper list
-	def append_node(node_id):
-		if pcount > 1:
-			for pid in range(pcount):
-				if partition_data.isNodeOnParition(node_id, pid):
-					nodes[pid].append(node_id)
-		else:
-			nodes.append(node_id)
-	# process nodes in the selection
-	for geom, subset in all_geom.items():
-		mesh_of_geom = doc.mesh.getMeshedGeometry(geom.id)
-		for i in subset.vertices:
-			domain = mesh_of_geom.vertices[i]
-			append_node(domain.id)
-		sset = [subset.edges, subset.faces, subset.solids]
-		gset = [mesh_of_geom.edges, mesh_of_geom.faces, mesh_of_geom.solids]
-		for gid in range(len(sset)):
-			set_item = sset[gid]
-			geo_item = gset[gid]
-			for domain_id in set_item:
-				domain = geo_item[domain_id]
-				for element in domain.elements:
-					for node in element.nodes:
-						append_node(node.id)
-	# avoid duplicates
-	if pcount > 1:
-		for pid in range(pcount):
-			nodes[pid] = list(set(nodes[pid]))
-	else:
-		nodes = list(set(nodes))
-	
-	# utility to write imposedMotion on a node
-	def write_im_node(node_id, extra_indent = ''):
-		ndm, ndf = pinfo.node_to_model_map[node_id]
-		map = _gstore.MAP[ndm][ndf]
-		for j in range(len(map.labels)):
-			dof_label = map.labels[j]
-			if geta(dof_label).boolean:
-				pinfo.out_file.write('{}{}{}imposedMotion {} {} {}\n'.format(pinfo.indent, pinfo.tabIndent, extra_indent, node_id, map.ids[j], tag))
+	# nodes of all geometries (vertices and nodes of edges/faces/solids), bucketed by process id
+	# with the partitions where the node writer defined them (no new isNodeOnParition call
+	# for each node and partition). see selection_index_utils
+	index = siu.get_condition(doc, pinfo.condition)
+	nodes = index.node_buckets(doc, 'geometry_nodes')
+	
+	# directions to impose for each NDM/NDF pair (the DOF mask)
+	mask_map = {}
+	def get_mask(ndm, ndf):
+		key = (ndm, ndf)
+		mask = mask_map.get(key, None)
+		if mask is None:
+			map = _gstore.MAP[ndm][ndf]
+			mask = tuple(map.ids[j] for j in range(len(map.labels)) if geta(map.labels[j]).boolean)
+			mask_map[key] = mask
+		return mask
+	
+	# utility to write imposedMotion commands on nodes grouped by DOF mask.
+	# nodes with the same mask are written as a packed list walked by a Tcl loop
+	# imposedMotion $nodeTag $dirn $gMotionTag
+	def write_im_nodes(pnodes, extra_indent = ''):
+		groups = {}
+		for node_id in pnodes.tolist():
+			mask = get_mask(*pinfo.node_to_model_map[node_id])
+			if len(mask) > 0:
+				item = groups.get(mask, None)
+				if item is None:
+					item = []
+					groups[mask] = item
+				item.append(node_id)
+		for mask, group in groups.items():
+			commands = ['imposedMotion {{0}} {} {}'.format(dof, tag) for dof in mask]
+			siu.write_id_commands(pinfo.out_file, '{}{}{}'.format(pinfo.indent, pinfo.tabIndent, extra_indent), group, commands)
 	
 	# write imposedMotion commands
-	if pcount > 1:
+	if len(nodes) > 1:
 		etab = pinfo.tabIndent
-		for pid in range(pcount):
+		for pid in range(len(nodes)):
 			pnodes = nodes[pid]
 			if len(pnodes) > 0:
 				pinfo.out_file.write('{}{}if {{$STKO_VAR_process_id == {}}} {{\n'.format(pinfo.indent, etab, pid))
-				for inode in pnodes:
-					write_im_node(inode, etab)
+				write_im_nodes(pnodes, etab)
 				pinfo.out_file.write('{}{}}}\n'.format(pinfo.indent, etab))
 	else:
-		for inode in nodes:
-			write_im_node(inode)
\ No newline at end of file
+		write_im_nodes(nodes[0])
\ No newline at end of file
@@ -12,6 +12,7 @@ from PyMpc import *
 from mpc_utils_html import *
 from PyMpc.Math import *
 from opensees.conditions.utils import SpatialFunctionEval
+import opensees.utils.gauss_lumping_utils as glu
 from math import sin, cos, radians
 
 ####################################################################################
@@ -579,6 +580,9 @@ def _evaluateTclLoad(pinfo, doc, geom, mesh_of_geom, edge, i, FT, is_partitioned
 		if uv_el[len(uv_el)-1] < uv_el[0]:
 			segno = -1;
 	
+	# first pass: parametric coordinates and nodal values of the distributed condition
+	# for all elements of this partition
+	elements = []
 	for e in range(len(domain.elements)):
 		elem = domain.elements[e]
 		info = domain.elementGeomInfos[e]
@@ -593,7 +597,6 @@ def _evaluateTclLoad(pinfo, doc, geom, mesh_of_geom, edge, i, FT, is_partitioned
 		u_edge = []
 		
 		n = len(elem.nodes)
-		ngp = len(elem.integrationRule.integrationPoints)
 		
 		# obtain nodal values of the distributed condition
 		nodal_values = [[0.0, 0.0, 0.0] for i in range(n)]
@@ -620,7 +623,18 @@ def _evaluateTclLoad(pinfo, doc, geom, mesh_of_geom, edge, i, FT, is_partitioned
 			nodal_values[j][0] = trib_width_node*FT.x
 			nodal_values[j][1] = trib_width_node*FT.y
 			nodal_values[j][2] = trib_width_node*FT.z
-			
+		
+		elements.append((elem, u, u_edge, nodal_values))
+	
+	# do nodal lumping of all elements at once
+	if edge.repartitionRule == 1:
+		all_lumped_values = glu.lump_elements([item[0] for item in elements], [item[3] for item in elements])
+	
+	# second pass: write loads
+	for e in range(len(elements)):
+		elem, u, u_edge, nodal_values = elements[e]
+		n = len(elem.nodes)
+		
 		discr, trib = edge.getDiscretizedTributaryWidth(u_edge[0],u_edge[1],n_max=10)
 		pinfo.out_file.write("# Elem {} \n".format(elem.id))
 		
@@ -652,34 +666,10 @@ def _evaluateTclLoad(pinfo, doc, geom, mesh_of_geom, edge, i, FT, is_partitioned
 				pinfo.out_file.write(str_tcl)
 		elif edge.repartitionRule == 1:
 			pinfo.out_file.write("# Repartition as edgeLoad\n")
-			# do nodal lumping
-			nodal_lumped_values = [[0.0, 0.0, 0.0, 0.0] for ii in range(n)]
-			for gp in range(ngp):
-				gauss_point = elem.integrationRule.integrationPoints[gp]
-				N = elem.shapeFunctionsAt(gauss_point)
-				det_J = elem.jacobianAt(gauss_point).det()
-				W = gauss_point.w
-				
-				# interpolate nodal value at this gp
-				fx = 0.0
-				fy = 0.0
-				fz = 0.0
-				for ii in range(n):
-					Ni = N[ii]
-					fx += Ni * nodal_values[ii][0]
-					fy += Ni * nodal_values[ii][1]
-					fz += Ni * nodal_values[ii][2]
-				
-				for ii in range(n):
-					fact = N[ii] * det_J * W
-					lump = nodal_lumped_values[ii]
-					lump[0] = elem.nodes[ii].id
-					lump[1] += fx * fact
-					lump[2] += fy * fact
-					lump[3] += fz * fact
+			# lumped nodal values (node_id, fx, fy, fz)
+			lumped_values = all_lumped_values[e].tolist()
 			for ii in range(n):
-				lump = nodal_lumped_values[ii]
-				lump[0] = elem.nodes[ii].id
+				lump = [elem.nodes[ii].id] + lumped_values[ii]
 				str_tcl = []
 				sopt = ('\n'.join(['{} {}'.format(lump[1], lump[2])]))
 				if (lump[0] in pinfo.node_to_model_map):
@@ -4,6 +4,7 @@ from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
 from PyMpc.Math import *
 from opensees.conditions.utils import SpatialFunctionEval
+import opensees.utils.selection_index_utils as siu
 
 class my_data:
 	def __init__(self):
@@ -552,7 +553,13 @@ def makeConditionRepresentationData(xobj):
 	d.on_interactions = False
 	return d
 
-def controlInternal(pinfo, xobj, node):
+def __get_sp_data(xobj):
+	'''
+	returns a tuple with:
+	- is_constant: True for constant values, False for function-based values
+	- is_relative: True if values are relative to the current displacement
+	- a list of (attribute_prefix, dof_id) pairs for all constrained dofs
+	'''
 	
 	# util: get attributes and check it
 	def get_xobj_attribute(attribute_name):
@@ -582,150 +589,53 @@ def controlInternal(pinfo, xobj, node):
 			Rz = get_xobj_attribute('Rz').boolean
 	if UP:
 		P = get_xobj_attribute('P').boolean
-		
-	# util: write value
 	
-	def write_value(attribute_prefix, dof_id):
-		# get constant or function-based value
-		if is_constant:
-			value = get_xobj_attribute('{} value'.format(attribute_prefix)).real
-		else:
-			seval = SpatialFunctionEval(node.position)
-			value = seval.make(get_xobj_attribute('{} function'.format(attribute_prefix)).string)
-		# in case of relative displacement....
-		if is_relative:
-			current_value = value
-			value = '[expr {} + [nodeDisp {} {}]]'.format(current_value, node.id, dof_id)
-		# write the sp command
-		pinfo.out_file.write('{}{}sp {} {} {}\n'.format(pinfo.indent, pinfo.tabIndent, node.id, dof_id, value))
-		
-	# values
+	# dofs
+	dofs = []
 	if Ux:
-		write_value('Ux', 1)
+		dofs.append(('Ux', 1))
 	if Uy:
-		write_value('Uy', 2)
+		dofs.append(('Uy', 2))
 	if is_3d:
 		if Uz:
-			write_value('Uz', 3)
+			dofs.append(('Uz', 3))
 		if UR:
 			if Rx:
-				write_value('Rx', 4)
+				dofs.append(('Rx', 4))
 			if Ry:
-				write_value('Ry', 5)
+				dofs.append(('Ry', 5))
 			if Rz:
-				write_value('Rz', 6)
+				dofs.append(('Rz', 6))
 		elif UP:
-			write_value('P', 4)
+			dofs.append(('P', 4))
 	else:
 		if UR:
 			if Rz:
-				write_value('Rz', 3)
+				dofs.append(('Rz', 3))
 		elif UP:
-			write_value('P', 3)
+			dofs.append(('P', 3))
+	
+	return (is_constant, is_relative, dofs)
 
-def __process_sp(pinfo, xobj, doc, all_geom, is_partitioned, process_id, process_block_count):
-	first_done = False
-	for geom, subset in all_geom.items():
-		mesh_of_geom = doc.mesh.getMeshedGeometry(geom.id)
-		'''
-		vertices
-		'''
-		for i in subset.vertices:
-			domain = mesh_of_geom.vertices[i]
-			node_id = domain.id
-			if not is_partitioned :
-				pinfo.out_file.write('{} # sp node\n'.format(pinfo.indent))
-			if is_partitioned :
-				if not doc.mesh.partitionData.isNodeOnParition(node_id, process_id):
-					continue
-			if is_partitioned :
-				if not first_done:
-					if process_block_count == 0:
-						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-					else:
-						pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-					first_done = True
-					pinfo.out_file.write('{} # sp node\n'.format(pinfo.indent))
-			controlInternal(pinfo, xobj, domain)
-		'''
-		edges
-		'''
-		node_list = {}
-		for i in subset.edges:
-			domain = mesh_of_geom.edges[i]
-			if not is_partitioned :
-				pinfo.out_file.write('{} # sp edge\n'.format(pinfo.indent))
-			for elem in domain.elements:
-				for node in elem.nodes:
-					node_list[node.id] = node
-		for node_id, node in node_list.items():
-			if is_partitioned :
-				if not doc.mesh.partitionData.isNodeOnParition(node_id, process_id):
-					continue
-			if is_partitioned :
-				if not first_done:
-					if process_block_count == 0:
-						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-					else:
-						pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-					first_done = True
-					pinfo.out_file.write('{} # sp edge\n'.format(pinfo.indent))
-			controlInternal(pinfo, xobj, node)
-		'''
-		faces
-		'''
-		node_list = {}
-		for i in subset.faces:
-			domain = mesh_of_geom.faces[i]
-			if not is_partitioned :
-				pinfo.out_file.write('{} # sp face\n'.format(pinfo.indent))
-			for elem in domain.elements:
-				for node in elem.nodes:
-					node_list[node.id] = node
-		for node_id, node in node_list.items():
-			if is_partitioned :
-				if not doc.mesh.partitionData.isNodeOnParition(node_id, process_id):
-					continue
-			if is_partitioned :
-				if not first_done:
-					if process_block_count == 0:
-						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-					else:
-						pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-					first_done = True
-					pinfo.out_file.write('{} # sp face\n'.format(pinfo.indent))
-			controlInternal(pinfo, xobj, node)
-		'''
-		solids
-		'''
-		node_list = {}
-		for i in subset.solids:
-			domain = mesh_of_geom.solids[i]
-			for elem in domain.elements:
-				if not is_partitioned :
-					pinfo.out_file.write('{} # sp face\n'.format(pinfo.indent))
-				for node in elem.nodes:
-					node_list[node.id] = node
-		for node_id, node in node_list.items():
-			if is_partitioned :
-				if not doc.mesh.partitionData.isNodeOnParition(node_id, process_id):
-					continue
-			if is_partitioned :
-				if not first_done:
-					if process_block_count == 0:
-						pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
-					else:
-						pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
-					first_done = True
-					pinfo.out_file.write('{} # sp solids\n'.format(pinfo.indent))
-			controlInternal(pinfo, xobj, node)
-			
-	if is_partitioned :
-		if first_done:
-			process_block_count += 1
-		if process_block_count > 0 and first_done:
-			pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
-		return process_block_count
+def __build_sp_commands(xobj, is_constant, is_relative, dofs, node = None):
+	'''
+	returns the list of sp commands (format strings where {0} is the node id).
+	the node is used only for function-based values
+	'''
+	commands = []
+	for attribute_prefix, dof_id in dofs:
+		# get constant or function-based value
+		if is_constant:
+			value = xobj.getAttribute('{} value'.format(attribute_prefix)).real
+		else:
+			seval = SpatialFunctionEval(node.position)
+			value = seval.make(xobj.getAttribute('{} function'.format(attribute_prefix)).string)
+		# in case of relative displacement....
+		if is_relative:
+			value = '[expr {} + [nodeDisp {{0}} {}]]'.format(value, dof_id)
+		# the sp command
+		commands.append('sp {{0}} {} {}'.format(dof_id, value))
+	return commands
 
 def writeTcl_sp(pinfo, xobj):
 	
@@ -738,16 +648,41 @@ def writeTcl_sp(pinfo, xobj):
 
 	doc = App.caeDocument()
 	
-	tag = xobj.parent.componentId
 	all_geom = pinfo.condition.assignment.geometries
 	if len(all_geom) == 0:
 		return
-	is_partitioned = False
+	
+	is_constant, is_relative, dofs = __get_sp_data(xobj)
+	if len(dofs) == 0:
+		return
+	
+	# constant values are the same for all nodes, and can be written
+	# in compact form. function-based values are written node by node
+	if is_constant:
+		commands = __build_sp_commands(xobj, is_constant, is_relative, dofs)
+	def write_nodes(nodes):
+		if is_constant:
+			siu.write_id_commands(pinfo.out_file, '{}{}'.format(pinfo.indent, pinfo.tabIndent), nodes, commands)
+		else:
+			for node_id in nodes.tolist():
+				node_commands = __build_sp_commands(xobj, is_constant, is_relative, dofs, doc.mesh.nodes[node_id])
+				for command in node_commands:
+					pinfo.out_file.write('{}{}{}\n'.format(pinfo.indent, pinfo.tabIndent, command.format(node_id)))
+	
+	# nodes of the condition (each node only once) bucketed by partition in a single pass
+	index = siu.get_condition(doc, pinfo.condition)
 	if pinfo.process_count > 1:
-		is_partitioned = True
-	if is_partitioned:
 		process_block_count = 0
-		for process_id in range(pinfo.process_count):
-			process_block_count = __process_sp(pinfo, xobj, doc, all_geom, is_partitioned, process_id, process_block_count)
-	else :
-		__process_sp(pinfo, xobj, doc, all_geom, is_partitioned, 0, 0)
\ No newline at end of file
+		for process_id, nodes in enumerate(index.node_buckets(doc, 'geometry_nodes')):
+			if len(nodes) == 0:
+				continue
+			if process_block_count == 0:
+				pinfo.out_file.write('\n{}{}{}{}\n'.format(pinfo.indent, 'if {$STKO_VAR_process_id == ', process_id, '} {'))
+			else:
+				pinfo.out_file.write('{}{}{}{}\n'.format(pinfo.indent, ' elseif {$STKO_VAR_process_id == ', process_id, '} {'))
+			write_nodes(nodes)
+			process_block_count += 1
+			pinfo.out_file.write('{}{}'.format(pinfo.indent, '}'))
+		pinfo.out_file.write('\n')
+	else:
+		write_nodes(index.geometry_nodes)
@@ -3,6 +3,7 @@ from PyMpc import *
 from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
 from opensees.conditions.utils import SpatialFunctionEval
+import opensees.utils.gauss_lumping_utils as glu
 
 class my_data:
 	def __init__(self):
@@ -243,63 +244,25 @@ def fillNodeMassMap(pinfo):
 		return
 	
 	doc = App.caeDocument()
+	
+	# collect all elements of the selected solids
+	elements = []
 	for geom, subset in all_geom.items():
 		mesh_of_geom = doc.mesh.getMeshedGeometry(geom.id)
 		for i in subset.solids:
-			domain = mesh_of_geom.solids[i]
-			for elem in domain.elements:
-				n = len(elem.nodes)
-				ngp = len(elem.integrationRule.integrationPoints)
-				
-				# obtain nodal values of the distributed condition
-				nodal_values = [[0.0, 0.0, 0.0] for i in range(n)]
-				if d.Mode == 'function':
-					for i in range(n):
-						nodei = elem.nodes[i]
-						seval = SpatialFunctionEval(nodei.position)
-						nodal_values[i][0] = seval.make(sfx)
-						nodal_values[i][1] = seval.make(sfy)
-						nodal_values[i][2] = seval.make(sfz)
-				else:
-					for i in range(n):
-						nodal_values[i][0] = d.mass.value.x
-						nodal_values[i][1] = d.mass.value.y
-						nodal_values[i][2] = d.mass.value.z
-				
-				# do nodal lumping
-				nodal_lumped_values = [[0.0, 0.0, 0.0, 0.0] for i in range(n)]
-				for gp in range(ngp):
-					gauss_point = elem.integrationRule.integrationPoints[gp]
-					N = elem.shapeFunctionsAt(gauss_point)
-					det_J = elem.jacobianAt(gauss_point).det()
-					W = gauss_point.w
-					
-					# interpolate nodal value at this gp
-					fx = 0.0
-					fy = 0.0
-					fz = 0.0
-					for i in range(n):
-						Ni = N[i]
-						fx += Ni * nodal_values[i][0]
-						fy += Ni * nodal_values[i][1]
-						fz += Ni * nodal_values[i][2]
-					
-					for i in range(n):
-						fact = N[i] * det_J * W
-						lump = nodal_lumped_values[i]
-						lump[0] = elem.nodes[i].id			# node_id
-						lump[1] += fx * fact
-						lump[2] += fy * fact
-						lump[3] += fz * fact
-						
-				for i in range(n):
-					lump = nodal_lumped_values[i]
-					node_id = elem.nodes[i].id
-					
-					mass_value = [lump[1], lump[2], lump[3], 0.0, 0.0, 0.0,]
-					
-					if node_id in pinfo.mass_to_node_map:
-						for j in range(len(pinfo.mass_to_node_map[node_id])):
-							pinfo.mass_to_node_map[node_id][j]+= mass_value[j]
-					else:
-						pinfo.mass_to_node_map[node_id] = mass_value
\ No newline at end of file
+			elements.extend(mesh_of_geom.solids[i].elements)
+	
+	# do nodal lumping of all elements at once
+	if d.Mode == 'function':
+		node_ids, lumped_values = glu.lump_on_nodes(elements, functions = (sfx, sfy, sfz))
+	else:
+		node_ids, lumped_values = glu.lump_on_nodes(elements, value = (d.mass.value.x, d.mass.value.y, d.mass.value.z))
+	
+	for node_id, lump in zip(node_ids.tolist(), lumped_values.tolist()):
+		mass_value = [lump[0], lump[1], lump[2], 0.0, 0.0, 0.0]
+		
+		if node_id in pinfo.mass_to_node_map:
+			for j in range(len(pinfo.mass_to_node_map[node_id])):
+				pinfo.mass_to_node_map[node_id][j]+= mass_value[j]
+		else:
+			pinfo.mass_to_node_map[node_id] = mass_value
\ No newline at end of file
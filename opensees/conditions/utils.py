@@ -5,4 +5,25 @@ class SpatialFunctionEval:
 		self.make = Interpreter()
 		self.make.symtable['x'] = pos.x
 		self.make.symtable['y'] = pos.y
-		self.make.symtable['z'] = pos.z
\ No newline at end of file
+		self.make.symtable['z'] = pos.z
+
+class SpatialFunctionBatchEval:
+	'''
+	evaluates the same spatial functions at many positions.
+	a single interpreter is used, and each function is parsed only once
+	'''
+	def __init__(self, functions):
+		from asteval import Interpreter
+		self.make = Interpreter()
+		self.code = []
+		for function in functions:
+			try:
+				self.code.append(self.make.parse(function))
+			except Exception:
+				# keep the source: the interpreter will report the error at each evaluation
+				self.code.append(function)
+	def evaluate(self, pos):
+		self.make.symtable['x'] = pos.x
+		self.make.symtable['y'] = pos.y
+		self.make.symtable['z'] = pos.z
+		return [self.make(code) for code in self.code]
\ No newline at end of file
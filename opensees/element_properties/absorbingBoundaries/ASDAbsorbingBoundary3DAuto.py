@@ -5,6 +5,7 @@ import importlib
 import opensees.utils.tcl_input as tclin
 import math
 import os
+import numpy as np
 
 def makeXObjectMetaData():
 	
@@ -128,13 +129,78 @@ class _position_t:
 	def __repr__(self):
 		return str(self)
 
+class _node_grid_t:
+	'''
+	A spatial hash grid of nodes.
+	Positions are compared with the same tolerance used by _position_t,
+	but the lookup only visits the few grid cells (of size 2*tolerance)
+	that can contain a matching position, so that near-coincident points
+	are always found regardless of their exact coordinates.
+	Coordinates and ids are stored in NumPy arrays.
+	'''
+	def __init__(self, tol):
+		self.tolerance = tol
+		self.cell_size = 2.0*tol
+		self.count = 0
+		self.X = np.zeros((64, 3))
+		self.ids = np.zeros(64, dtype=np.int64)
+		self.cells = {} #key = (i,j,k) cell, value = list of rows in X
+	def _cell_range(self, x):
+		return range(int(math.floor((x - self.tolerance)/self.cell_size)), int(math.floor((x + self.tolerance)/self.cell_size)) + 1)
+	def find(self, x, y, z):
+		'''
+		returns the id of the node at (x, y, z) within tolerance, or None
+		'''
+		candidates = []
+		for i in self._cell_range(x):
+			for j in self._cell_range(y):
+				for k in self._cell_range(z):
+					rows = self.cells.get((i,j,k), None)
+					if rows is not None:
+						candidates.extend(rows)
+		if len(candidates) == 0:
+			return None
+		candidates = np.asarray(candidates, dtype=np.int64)
+		match = np.nonzero(np.all(np.abs(self.X[candidates] - (x, y, z)) <= self.tolerance, axis=1))[0]
+		if len(match) == 0:
+			return None
+		return int(self.ids[candidates[match].min()])
+	def insert(self, x, y, z, node_id):
+		'''
+		inserts a new node at (x, y, z), without checking for duplicates
+		'''
+		if self.count == len(self.ids):
+			self.X = np.concatenate((self.X, np.zeros_like(self.X)))
+			self.ids = np.concatenate((self.ids, np.zeros_like(self.ids)))
+		row = self.count
+		self.X[row] = (x, y, z)
+		self.ids[row] = node_id
+		self.count += 1
+		key = (int(math.floor(x/self.cell_size)), int(math.floor(y/self.cell_size)), int(math.floor(z/self.cell_size)))
+		rows = self.cells.get(key, None)
+		if rows is None:
+			rows = []
+			self.cells[key] = rows
+		rows.append(row)
+	def __getitem__(self, pos):
+		node_id = self.find(pos.x, pos.y, pos.z)
+		if node_id is None:
+			raise KeyError(pos)
+		return node_id
+	def __len__(self):
+		return self.count
+	def items(self):
+		for row in range(self.count):
+			x, y, z = self.X[row].tolist()
+			yield (_position_t(x, y, z, self.tolerance), int(self.ids[row]))
+
 class ASDAbsorbingBoundary3DInfoManager:
 	def __init__(self):
 		self.pmax = Math.vec3(0.0,0.0,0.0)
 		self.pmin = Math.vec3(0.0,0.0,0.0)
 		self.extrusion_size = 0.0
 		self.tolerance = 1.0e-12
-		self.nodes = {} #key = _position_t, value = node_id
+		self.nodes = _node_grid_t(self.tolerance) #spatial hash grid: position -> node_id
 		self.elements = {} #key = partition, value = element ids
 	def getBoundaryType(self, elem):
 		p = Math.vec3(0.0,0.0,0.0)
@@ -175,7 +241,9 @@ def preProcessElements(pinfo):
 	# whose element property is ASDAbsorbingBoundary2D
 	# 1) collect all faces in a list
 	# 2) compute bounds
-	source_elements = []
+	source_nodes = []
+	source_coords = []
+	source_parts = []
 	bbox = FxBndBox()
 	reference_count = 0
 	for geom_id, geom in doc.geometries.items():
@@ -202,8 +270,10 @@ def preProcessElements(pinfo):
 				if (elem.geometryFamilyType()) != MpcElementGeometryFamilyType.Quadrilateral or len(elem.nodes)!=4:
 					raise Exception(_err('invalid type of element or number of nodes, It should be a Quadrilateral with 4 nodes, not a {} with {} nodes'
 						.format(elem.geometryFamilyType(), len(elem.nodes))))
-				# collect element
-				source_elements.append(elem)
+				# collect element, its nodes and partition
+				source_nodes.append([node.id for node in elem.nodes])
+				source_coords.append([(node.x, node.y, node.z) for node in elem.nodes])
+				source_parts.append(doc.mesh.partitionData.elementPartition(elem.id))
 				# update bbox
 				for node in elem.nodes:
 					bbox.add(node.position)
@@ -224,54 +294,49 @@ def preProcessElements(pinfo):
 	if manager.extrusion_size == 0.0:
 		raise Exception(_err('The soil domain seems to have an empty bounding box'))
 	manager.tolerance = max(1.0e-12, 1.0e-8*bbox.maxSize)
+	# the spatial hash grid of extruded nodes uses the same tolerance
+	manager.nodes = _node_grid_t(manager.tolerance)
+	
+	# source data as NumPy arrays
+	ele_nodes = np.asarray(source_nodes, dtype=np.int64).reshape(-1, 4)
+	ele_coords = np.asarray(source_coords, dtype=float).reshape(-1, 4, 3)
+	ele_parts = np.asarray(source_parts, dtype=np.int64)
+	
+	# coordinates of source nodes (sorted by id)
+	node_ids, node_first = np.unique(ele_nodes.ravel(), return_index=True)
+	node_coords = ele_coords.reshape(-1, 3)[node_first]
+	
+	# classify elements by their center
+	center = ele_coords.mean(axis=1)
+	on_L = center[:,0] < manager.pmin.x + manager.tolerance
+	on_R = ~on_L & (center[:,0] > manager.pmax.x - manager.tolerance)
+	on_F = center[:,1] < manager.pmin.y + manager.tolerance
+	on_K = ~on_F & (center[:,1] > manager.pmax.y - manager.tolerance)
+	on_B = center[:,2] < manager.pmin.z + manager.tolerance
 	
 	# map face nodes to their boundary type and process_id (from elements)
+	# using unique (node_id, boundary type, partition) triplets
 	# key = node_id
 	# value = map with:
 	#         key = boundary type
 	#         value = set of partitions for that boundary type
+	triplets = [np.zeros((0, 3), dtype=np.int64)]
+	for btype, on_btype in ((_globals.B, on_B), (_globals.L, on_L), (_globals.R, on_R), (_globals.F, on_F), (_globals.K, on_K)):
+		inodes = ele_nodes[on_btype].ravel()
+		iparts = np.repeat(ele_parts[on_btype], 4)
+		triplets.append(np.stack((inodes, np.full_like(inodes, btype), iparts), axis=1))
+	triplets = np.unique(np.concatenate(triplets), axis=0)
 	node_info = {}
-	for elem in source_elements:
-		pid = doc.mesh.partitionData.elementPartition(elem.id)
-		center = (elem.nodes[0].position + elem.nodes[1].position + elem.nodes[2].position + elem.nodes[3].position)/4.0
-		x = center.x
-		y = center.y
-		z = center.z
-		for node in elem.nodes:
-			info = node_info.get(node.id, None)
-			if info is None:
-				info = {}
-				node_info[node.id] = info
-			if x < manager.pmin.x + manager.tolerance:
-				item = info.get(_globals.L, None)
-				if item is None:
-					item = set()
-					info[_globals.L] = item
-				item.add(pid)
-			elif x > manager.pmax.x - manager.tolerance:
-				item = info.get(_globals.R, None)
-				if item is None:
-					item = set()
-					info[_globals.R] = item
-				item.add(pid)
-			if y < manager.pmin.y + manager.tolerance:
-				item = info.get(_globals.F, None)
-				if item is None:
-					item = set()
-					info[_globals.F] = item
-				item.add(pid)
-			elif y > manager.pmax.y - manager.tolerance:
-				item = info.get(_globals.K, None)
-				if item is None:
-					item = set()
-					info[_globals.K] = item
-				item.add(pid)
-			if z < manager.pmin.z + manager.tolerance:
-				item = info.get(_globals.B, None)
-				if item is None:
-					item = set()
-					info[_globals.B] = item
-				item.add(pid)
+	for node_id, btype, pid in triplets.tolist():
+		info = node_info.get(node_id, None)
+		if info is None:
+			info = {}
+			node_info[node_id] = info
+		item = info.get(btype, None)
+		if item is None:
+			item = set()
+			info[btype] = item
+		item.add(pid)
 	# second pass. on multi-btype, add condition of lowest btype
 	for _, info in node_info.items():
 		if len(info) > 1:
@@ -296,8 +361,9 @@ def preProcessElements(pinfo):
 	if verbose:
 		print('> Creating extruded nodes...')
 	part_nodes = {}
+	part_node_ids = {}
 	for source_node_id, info in node_info.items():
-		source_node = doc.mesh.getNode(source_node_id)
+		source_x, source_y, source_z = node_coords[np.searchsorted(node_ids, source_node_id)].tolist()
 		# get btype in a list
 		btypes = list(info.keys())
 		# create combinations of btypes
@@ -330,20 +396,26 @@ def preProcessElements(pinfo):
 			if verbose:
 				combo_name = ''.join(_btype_to_string(i) for i in icombo)
 				print('   {} {} - partitions: {}'.format(combo_name, (vx,vy,vz), icombo_partitions))
-			# extrude
-			new_node_id = next_node_id()
-			new_node_pos = _position_t(source_node.x + vx, source_node.y + vy, source_node.z + vz, manager.tolerance)
-			# put it node to model map
-			pinfo.node_to_model_map[new_node_id] = (3, 3)
-			# put it in the manager
-			manager.nodes[new_node_pos] = new_node_id
+			# extrude (re-use a coincident node if already extruded)
+			new_node_pos = _position_t(source_x + vx, source_y + vy, source_z + vz, manager.tolerance)
+			new_node_id = manager.nodes.find(new_node_pos.x, new_node_pos.y, new_node_pos.z)
+			if new_node_id is None:
+				new_node_id = next_node_id()
+				# put it node to model map
+				pinfo.node_to_model_map[new_node_id] = (3, 3)
+				# put it in the manager
+				manager.nodes.insert(new_node_pos.x, new_node_pos.y, new_node_pos.z, new_node_id)
 			# put it part_nodes
 			for ipar in icombo_partitions:
 				ipar_nodes = part_nodes.get(ipar, None)
 				if ipar_nodes is None:
 					ipar_nodes = []
 					part_nodes[ipar] = ipar_nodes
-				ipar_nodes.append((new_node_id, new_node_pos))
+					part_node_ids[ipar] = set()
+				ipar_node_ids = part_node_ids[ipar]
+				if new_node_id not in ipar_node_ids:
+					ipar_node_ids.add(new_node_id)
+					ipar_nodes.append((new_node_id, new_node_pos))
 	if verbose:
 		for ipart, inodes in part_nodes.items():
 			print('   Partition {} -> {}'.format(ipart, inodes))
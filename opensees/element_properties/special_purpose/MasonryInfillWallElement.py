@@ -55,179 +55,41 @@ def getNodalSpatialDim(xobj, xobj_phys_prop):
 	# This is an assembly of beams in 3D space
 	return [(3, 6), (3, 6), (3, 6), (3, 6)]
 
-def writeTcl(pinfo):
-	
-	# This is a macro-element, a 4 node quad in STKO, 
-	# that generates an assembly of 2 beam elements + 1 central node.
-	# It also generate a collapse recorder
-	
-	#############################################################################
-	# utilities
-	#############################################################################
-	
-	# get attribute from xobject
-	def geta(xobj, at_name):
-		attribute = xobj.getAttribute(at_name)
-		if attribute is None:
-			raise Exception('Error: cannot find "{}" attribute'.format(at_name))
-		return attribute
-	
-	# get order of magnitute
-	def OM(x):
-		if x == 0.0:
-			return 0.0
-		return round(log10(abs(x)))
-	
-	# return [0,1,2,3] (the standard connectivity) if the angle between the local x axis and the 0-1 axis 
-	# is < then the angle between the local x axis and the 2-1 axis (in this case we return [1, 2, 3, 0])
-	def get_oriented_ids(elem):
-		elem_dir_x = elem.nodes[1].position - elem.nodes[0].position
-		elem_dir_y = elem.nodes[2].position - elem.nodes[1].position
-		elem_dir_y.normalize()
-		elem_dir_x.normalize()
-		# get orientation matrix and local x direction
-		orientation_matrix = elem.orientation.quaternion.toRotationMatrix()
-		dir_x = orientation_matrix.col(0)
-		if abs(dir_x.dot(elem_dir_x)) > abs(dir_x.dot(elem_dir_y)):
-			if dir_x.dot(elem_dir_x) > 0.0:
-				return [0,1,2,3]
-			else:
-				return [2,3,0,1]
-		else:
-			if dir_x.dot(elem_dir_y) > 0.0:
-				return [3,0,1,2]
-			else:
-				return [1,2,3,0]
-	
-	#############################################################################
-	# initial checks
-	#############################################################################
-	
-	# get document
-	doc = App.caeDocument()
-	if(doc is None):
-		raise Exception('Error: No cae document')
-	
-	# check mesh element
-	elem = pinfo.elem
-	if (elem.geometryFamilyType() != MpcElementGeometryFamilyType.Quadrilateral or len(elem.nodes)!=4):
-		raise Exception('Error: Invalid Element type ({}) or number of nodes ({}). Expected: element type = {}, number of nodes = 4'.format(
-			elem.geometryFamilyType(), len(elem.nodes), MpcElementGeometryFamilyType.Quadrilateral))
-	
-	# get physical property and check it
-	phys_prop = pinfo.phys_prop
-	if phys_prop is None:
-		raise Exception('Error: No physical property provided for "MasonryInfillWallElement" element {}'.format(elem.id))
-	if phys_prop.XObject.name != 'MasonryInfillWallMaterial':
-		raise Exception('Error: Wrong physical property ({}) assigned to "MasonryInfillWallElement" element {}. Use "MasonryInfillWallMaterial"'.format(phys_prop.XObject.name, elem.id))
-	
-	# get element property
-	elem_prop = pinfo.elem_prop
-	
-	# get nodal permutation
-	perm = get_oriented_ids(elem)
-	
-	# get nodes
-	n1 = elem.nodes[perm[0]]
-	n2 = elem.nodes[perm[1]]
-	n3 = elem.nodes[perm[2]]
-	n4 = elem.nodes[perm[3]]
-	
-	#############################################################################
-	# some formula here assume kip/inches... 
-	# so we need the follwing unit system tools
-	#############################################################################
-	
-	kip = 1.0
-	inc = 1.0
-	sec = 1.0
-	
-	m = inc/0.0254
-	dm = 0.1*m
-	cm = 0.01*m
-	mm = 0.001*m
-	foot = 0.3048*m
-	
-	kN  = 0.224808943*kip
-	hN  = 0.1*kN
-	daN = 0.01*kN
-	N   = 0.001*kN
-	
-	MPa = 1000.0*kN/m/m
-	psi = MPa/145.037738
-	
-	lbf = psi*inc*inc
-	ksi = 1000.0*psi
-	
-	g = 9.81*m/sec/sec
-	
-	# map by string
-	UFMap = ({
-		'kip': kip,
-		'N'  : N,
-		'daN': daN,
-		'hN' : hN,
-		'kN' : kN,
-		})
-	ULMap = ({
-		'in' : inc,
-		'm'  : m,
-		'dm' : dm,
-		'cm' : cm,
-		'mm' : mm,
-		'ft' : foot,
-		})
-	
-	# User units
-	UF = geta(phys_prop.XObject, 'Force unit').string
-	UL = geta(phys_prop.XObject, 'Length unit').string
+class _infill_panel_t:
+	# calibrated parameters of the infill assembly.
+	# they only depend on the input parameters and on the panel size,
+	# so they are shared by all identical panels
+	def __init__(self):
+		self.rinf = 0.0
+		self.Aelem = 0.0
+		self.Ieq = 0.0
+		self.MASSinf = 0.0
+		self.Ninteraction = 0
+		self.Nfiber = 0
+		self.Sy = []
+		self.z = []
+		self.A = []
+		self.OOPv = []
+		self.IIPv = []
+		# the OOP-IIP curve file, written by the first panel of this type
+		self.OOP_IIP_filename = None
 
-	# scale factors from user input to base system
-	F = UFMap[UF] # force
-	L = ULMap[UL] # length
-	P = F/L/L # pressure
-	t = 1# seconds
-	Acc = L/t**2
-	M = F/Acc # mass
-	
-	#############################################################################
-	# get input from physical property
-	#############################################################################
-	
-	fme = geta(phys_prop.XObject, 'fme').quantityScalar.value * P # Masonry expected compressive strength
-	tinf = geta(phys_prop.XObject, 'tinf').quantityScalar.value * L # Thickness of masonry infill wall
-	Em = geta(phys_prop.XObject, 'Em').quantityScalar.value * P # Elastic modulus of masonry infill
-	vte = geta(phys_prop.XObject, 'vte').quantityScalar.value * P # Average bed joint strength
-	fvie = geta(phys_prop.XObject, 'fvie').quantityScalar.value * P # see FEMA356, Section 7.5.2.2
-	gamma_inf = geta(phys_prop.XObject, 'gamma_inf').quantityScalar.value * F/L**3 # Weight density of the infill bricks.
-	
-	#############################################################################
-	# get input from element property
-	#############################################################################
-	
-	Efe = geta(elem_prop.XObject, 'Efe').quantityScalar.value * P # Expected elastic modulus of frame concrete
-	Ig = geta(elem_prop.XObject, 'Ig').quantityScalar.value * L**4 # Gross moment of inertia of the concrete columns
-	Pce = geta(elem_prop.XObject, 'Pce').quantityScalar.value * F # Expected gravity compressive force applied to infill panel
-	Ninteraction = geta(elem_prop.XObject, 'Ninteraction').integer # Number of points on the interaction curve to be used for calculating fiber properties (should be an even number).
-	
-	#############################################################################
-	# get input from element geometry
-	#############################################################################
-	
-	L_bottom = (n2.position - n1.position).norm()
-	L_top = (n3.position - n4.position).norm()
-	H_left = (n4.position - n1.position).norm()
-	H_right = (n3.position - n2.position).norm()
-	
-	hinf = (H_left + H_right)/2.0 * L # Height of masonry infill wall
-	Linf = (L_bottom + L_top)/2.0 * L # Length of masonry infill wall
+class _infill_cache_t:
+	# data shared by all MasonryInfillWallElement elements during the export,
+	# stored in pinfo.custom_data
+	def __init__(self):
+		# true if the removal output directory has been created
+		self.removal_dir_created = False
+		# calibrated panels. key = panel key (see writeTcl), value = _infill_panel_t
+		self.panels = {}
+		# generated sections. key = (process id, panel key), value = (fiber section id, elastic section id)
+		self.sections = {}
+
+def _calibrate_panel(fme, tinf, Em, vte, fvie, gamma_inf, Efe, Ig, Pce, Ninteraction, hinf, Linf, g):
+	# Perform all calculations for the infill assembly (in the base unit system)
 	hcol = hinf # assumed equal
 	Lcol = Linf # assumed equal
 	
-	#############################################################################
-	# Perform all calculations for the infill assembly
-	#############################################################################
-	
 	# Calculate infill properties
 	Icol = 0.5*Ig # Effective cracked moment of inertia of the concrete columns
 	rinf = sqrt(hinf**2 + Linf**2) # Diagonal length of the infill
@@ -402,8 +264,6 @@ def writeTcl(pinfo):
 	Ey = [Sy[i]/Em for i in range(Nfiber)]
 	# Ratio
 	Ratio = [Ey[i]/z[i] for i in range(Nfiber)]
-	# GJ as a penalty parameter relative to the Em value
-	GJ = 10.0**(OM(Em)+8)
 	
 	# Calculating the IP disp - OOP disp curve for specific values of OOP disp
 	OOPv = [0.0]*Ninteraction
@@ -414,6 +274,206 @@ def writeTcl(pinfo):
 		OOPv[i] = OOPi
 		IIPv[i] = IIPi
 	
+	panel = _infill_panel_t()
+	panel.rinf = rinf
+	panel.Aelem = Aelem
+	panel.Ieq = Ieq
+	panel.MASSinf = MASSinf
+	panel.Ninteraction = Ninteraction
+	panel.Nfiber = Nfiber
+	panel.Sy = Sy
+	panel.z = z
+	panel.A = A
+	panel.OOPv = OOPv
+	panel.IIPv = IIPv
+	return panel
+
+def writeTcl(pinfo):
+	
+	# This is a macro-element, a 4 node quad in STKO, 
+	# that generates an assembly of 2 beam elements + 1 central node.
+	# It also generate a collapse recorder
+	
+	#############################################################################
+	# utilities
+	#############################################################################
+	
+	# get attribute from xobject
+	def geta(xobj, at_name):
+		attribute = xobj.getAttribute(at_name)
+		if attribute is None:
+			raise Exception('Error: cannot find "{}" attribute'.format(at_name))
+		return attribute
+	
+	# get order of magnitute
+	def OM(x):
+		if x == 0.0:
+			return 0.0
+		return round(log10(abs(x)))
+	
+	# return [0,1,2,3] (the standard connectivity) if the angle between the local x axis and the 0-1 axis 
+	# is < then the angle between the local x axis and the 2-1 axis (in this case we return [1, 2, 3, 0])
+	def get_oriented_ids(elem):
+		elem_dir_x = elem.nodes[1].position - elem.nodes[0].position
+		elem_dir_y = elem.nodes[2].position - elem.nodes[1].position
+		elem_dir_y.normalize()
+		elem_dir_x.normalize()
+		# get orientation matrix and local x direction
+		orientation_matrix = elem.orientation.quaternion.toRotationMatrix()
+		dir_x = orientation_matrix.col(0)
+		if abs(dir_x.dot(elem_dir_x)) > abs(dir_x.dot(elem_dir_y)):
+			if dir_x.dot(elem_dir_x) > 0.0:
+				return [0,1,2,3]
+			else:
+				return [2,3,0,1]
+		else:
+			if dir_x.dot(elem_dir_y) > 0.0:
+				return [3,0,1,2]
+			else:
+				return [1,2,3,0]
+	
+	#############################################################################
+	# initial checks
+	#############################################################################
+	
+	# get document
+	doc = App.caeDocument()
+	if(doc is None):
+		raise Exception('Error: No cae document')
+	
+	# check mesh element
+	elem = pinfo.elem
+	if (elem.geometryFamilyType() != MpcElementGeometryFamilyType.Quadrilateral or len(elem.nodes)!=4):
+		raise Exception('Error: Invalid Element type ({}) or number of nodes ({}). Expected: element type = {}, number of nodes = 4'.format(
+			elem.geometryFamilyType(), len(elem.nodes), MpcElementGeometryFamilyType.Quadrilateral))
+	
+	# get physical property and check it
+	phys_prop = pinfo.phys_prop
+	if phys_prop is None:
+		raise Exception('Error: No physical property provided for "MasonryInfillWallElement" element {}'.format(elem.id))
+	if phys_prop.XObject.name != 'MasonryInfillWallMaterial':
+		raise Exception('Error: Wrong physical property ({}) assigned to "MasonryInfillWallElement" element {}. Use "MasonryInfillWallMaterial"'.format(phys_prop.XObject.name, elem.id))
+	
+	# get element property
+	elem_prop = pinfo.elem_prop
+	
+	# get nodal permutation
+	perm = get_oriented_ids(elem)
+	
+	# get nodes
+	n1 = elem.nodes[perm[0]]
+	n2 = elem.nodes[perm[1]]
+	n3 = elem.nodes[perm[2]]
+	n4 = elem.nodes[perm[3]]
+	
+	#############################################################################
+	# some formula here assume kip/inches... 
+	# so we need the follwing unit system tools
+	#############################################################################
+	
+	kip = 1.0
+	inc = 1.0
+	sec = 1.0
+	
+	m = inc/0.0254
+	dm = 0.1*m
+	cm = 0.01*m
+	mm = 0.001*m
+	foot = 0.3048*m
+	
+	kN  = 0.224808943*kip
+	hN  = 0.1*kN
+	daN = 0.01*kN
+	N   = 0.001*kN
+	
+	MPa = 1000.0*kN/m/m
+	psi = MPa/145.037738
+	
+	lbf = psi*inc*inc
+	ksi = 1000.0*psi
+	
+	g = 9.81*m/sec/sec
+	
+	# map by string
+	UFMap = ({
+		'kip': kip,
+		'N'  : N,
+		'daN': daN,
+		'hN' : hN,
+		'kN' : kN,
+		})
+	ULMap = ({
+		'in' : inc,
+		'm'  : m,
+		'dm' : dm,
+		'cm' : cm,
+		'mm' : mm,
+		'ft' : foot,
+		})
+	
+	# User units
+	UF = geta(phys_prop.XObject, 'Force unit').string
+	UL = geta(phys_prop.XObject, 'Length unit').string
+
+	# scale factors from user input to base system
+	F = UFMap[UF] # force
+	L = ULMap[UL] # length
+	P = F/L/L # pressure
+	t = 1# seconds
+	Acc = L/t**2
+	M = F/Acc # mass
+	
+	#############################################################################
+	# get input from physical property
+	#############################################################################
+	
+	fme = geta(phys_prop.XObject, 'fme').quantityScalar.value * P # Masonry expected compressive strength
+	tinf = geta(phys_prop.XObject, 'tinf').quantityScalar.value * L # Thickness of masonry infill wall
+	Em = geta(phys_prop.XObject, 'Em').quantityScalar.value * P # Elastic modulus of masonry infill
+	vte = geta(phys_prop.XObject, 'vte').quantityScalar.value * P # Average bed joint strength
+	fvie = geta(phys_prop.XObject, 'fvie').quantityScalar.value * P # see FEMA356, Section 7.5.2.2
+	gamma_inf = geta(phys_prop.XObject, 'gamma_inf').quantityScalar.value * F/L**3 # Weight density of the infill bricks.
+	
+	#############################################################################
+	# get input from element property
+	#############################################################################
+	
+	Efe = geta(elem_prop.XObject, 'Efe').quantityScalar.value * P # Expected elastic modulus of frame concrete
+	Ig = geta(elem_prop.XObject, 'Ig').quantityScalar.value * L**4 # Gross moment of inertia of the concrete columns
+	Pce = geta(elem_prop.XObject, 'Pce').quantityScalar.value * F # Expected gravity compressive force applied to infill panel
+	Ninteraction = geta(elem_prop.XObject, 'Ninteraction').integer # Number of points on the interaction curve to be used for calculating fiber properties (should be an even number).
+	
+	#############################################################################
+	# get input from element geometry
+	#############################################################################
+	
+	L_bottom = (n2.position - n1.position).norm()
+	L_top = (n3.position - n4.position).norm()
+	H_left = (n4.position - n1.position).norm()
+	H_right = (n3.position - n2.position).norm()
+	
+	hinf = (H_left + H_right)/2.0 * L # Height of masonry infill wall
+	Linf = (L_bottom + L_top)/2.0 * L # Length of masonry infill wall
+	
+	#############################################################################
+	# Perform all calculations for the infill assembly
+	#############################################################################
+	
+	# identical panels (same units, input parameters and size) share the calibration,
+	# the OOP-IIP curve file and (in the same process) the generated sections.
+	# the size is rounded to avoid tiny differences due to the mesh coordinates
+	if not 'MasonryInfillWallElement' in pinfo.custom_data:
+		pinfo.custom_data['MasonryInfillWallElement'] = _infill_cache_t()
+	cache = pinfo.custom_data['MasonryInfillWallElement']
+	panel_key = (UF, UL, fme, tinf, Em, vte, fvie, gamma_inf, Efe, Ig, Pce, Ninteraction, '{:.10g}'.format(hinf), '{:.10g}'.format(Linf))
+	panel = cache.panels.get(panel_key, None)
+	if panel is None:
+		panel = _calibrate_panel(fme, tinf, Em, vte, fvie, gamma_inf, Efe, Ig, Pce, Ninteraction, hinf, Linf, g)
+		cache.panels[panel_key] = panel
+	
+	# GJ as a penalty parameter relative to the Em value
+	GJ = 10.0**(OM(Em)+8)
+	
 	#############################################################################
 	# initialize IDs for dynamically created items
 	#############################################################################
@@ -441,28 +501,35 @@ def writeTcl(pinfo):
 	write('')
 	write('# MasonryInfillWallElement Assembly : generated from STKO quad element {}'.format(elem.id))
 	
-	# write the section fiber
-	fiber_section_id = mat_id # save it for later
-	write('section fiberSec {} -GJ {:.2e} {{'.format(mat_id, GJ/(F*L**2))) # open the fiber loop
-	# write nonlinear fibers in local Y direction (for OOP bending)
-	mat_id += 1
-	for i in range(Nfiber):
-		write('\t# Fiber {}'.format(i+1))
-		write('\tuniaxialMaterial Steel01 {} {} {} 0.02;'.format(mat_id, Sy[i]/P, Em/P))
-		write('\tfiber {} 0.0 {} {};'.format(z[i]/L, A[i]/(L**2), mat_id))
+	# write the sections, only for the first panel of this type in the current process
+	section_key = (pinfo.process_id, panel_key)
+	if section_key in cache.sections:
+		fiber_section_id, elastic_section_id = cache.sections[section_key]
+	else:
+		# write the section fiber
+		fiber_section_id = mat_id # save it for later
+		write('section fiberSec {} -GJ {:.2e} {{'.format(mat_id, GJ/(F*L**2))) # open the fiber loop
+		# write nonlinear fibers in local Y direction (for OOP bending)
+		mat_id += 1
+		for i in range(panel.Nfiber):
+			write('\t# Fiber {}'.format(i+1))
+			write('\tuniaxialMaterial Steel01 {} {} {} 0.02;'.format(mat_id, panel.Sy[i]/P, Em/P))
+			write('\tfiber {} 0.0 {} {};'.format(panel.z[i]/L, panel.A[i]/(L**2), mat_id))
+			mat_id += 1
+		# write 2 dummy (small) fibers in the local Z direction to provide non-zero IP bending stiffness
+		write('\t# Add 2 dummy Fibers in Z direction')
+		write('\tuniaxialMaterial Elastic {} {};'.format(mat_id, Em/P))
+		write('\tlayer straight {0} 2 {1:.2e} 0.0 {2:.2e} 0.0 -{2:.2e};'.format(mat_id, 10.0**(OM(panel.Aelem/(L**2))-6), 10.0**(OM(panel.z[0]/L)-2)))
 		mat_id += 1
-	# write 2 dummy (small) fibers in the local Z direction to provide non-zero IP bending stiffness
-	write('\t# Add 2 dummy Fibers in Z direction')
-	write('\tuniaxialMaterial Elastic {} {};'.format(mat_id, Em/P))
-	write('\tlayer straight {0} 2 {1:.2e} 0.0 {2:.2e} 0.0 -{2:.2e};'.format(mat_id, 10.0**(OM(Aelem/(L**2))-6), 10.0**(OM(z[0]/L)-2)))
-	mat_id += 1
-	write('}') # close the fiber loop
-	
-	# write elastic section
-	write('#elastic section')
-	elastic_section_id = mat_id # save it for later
-	write('section Elastic {0} {1} {2} {3:.2e} {3:.2e} [expr {1}/2.5] {3:.2e}'.format(mat_id, Em/P, Aelem/(L**2), 10.0**(OM(Aelem/(L**2))-5)))
-	mat_id += 1
+		write('}') # close the fiber loop
+		
+		# write elastic section
+		write('#elastic section')
+		elastic_section_id = mat_id # save it for later
+		write('section Elastic {0} {1} {2} {3:.2e} {3:.2e} [expr {1}/2.5] {3:.2e}'.format(mat_id, Em/P, panel.Aelem/(L**2), 10.0**(OM(panel.Aelem/(L**2))-5)))
+		mat_id += 1
+		
+		cache.sections[section_key] = (fiber_section_id, elastic_section_id)
 	
 	# write midspan node
 	write('# midspan node with OOP mass')
@@ -471,7 +538,7 @@ def writeTcl(pinfo):
 	# we assume the vertical axis is the global Z
 	if abs(wallNormal.z) > 1.0e-6:
 		raise Exception('MasonryInfillWallElement Error: The infill wall can be customly oriented, but the vertical direction should coincide with the global Z axis')
-	mpM = wallNormal * MASSinf
+	mpM = wallNormal * panel.MASSinf
 	mpM.x = abs(mpM.x)
 	mpM.y = abs(mpM.y)
 	mpM.z = abs(mpM.z)
@@ -490,17 +557,16 @@ def writeTcl(pinfo):
 	write('geomTransf Linear {}  0.0 0.0 1.0'.format(ele_id_2))
 	write('# elements')
 	write('element beamWithHinges {0} {1}  {2} {3} [expr {4}*0.1] {10} [expr {4}*0.05] {5} {6} {8} {9}   [expr {5}/2.5] {7} {0}'.format(
-		ele_id_1, center_node_id, n1.id, fiber_section_id, rinf/L, Em/P, Aelem/(L**2), GJ/(F*L**2), Ieq/(L**4), 10.0**(OM(Ieq/(L**4))-8), elastic_section_id))
+		ele_id_1, center_node_id, n1.id, fiber_section_id, panel.rinf/L, Em/P, panel.Aelem/(L**2), GJ/(F*L**2), panel.Ieq/(L**4), 10.0**(OM(panel.Ieq/(L**4))-8), elastic_section_id))
 	write('element beamWithHinges {0} {1}  {2} {3} [expr {4}*0.1] {10} [expr {4}*0.05] {5} {6} {8} {9}   [expr {5}/2.5] {7} {0}'.format(
-		ele_id_2, center_node_id, n3.id, fiber_section_id, rinf/L, Em/P, Aelem/(L**2), GJ/(F*L**2), Ieq/(L**4), 10.0**(OM(Ieq/(L**4))-8), elastic_section_id))
+		ele_id_2, center_node_id, n3.id, fiber_section_id, panel.rinf/L, Em/P, panel.Aelem/(L**2), GJ/(F*L**2), panel.Ieq/(L**4), 10.0**(OM(panel.Ieq/(L**4))-8), elastic_section_id))
 	
 	# write recorders for removal
 	# first create a directory for storing the collapse recorders outputs. remove it first, if it already exists.
-	# we want to do it only once, so use the pinfo.custom_map to check whether it has been done already
+	# we want to do it only once, so use the cache in pinfo.custom_data to check whether it has been done already
 	removal_dir = 'MasonryInfillWallElementRemovalOutput'
-	if not 'MasonryInfillWallElement' in pinfo.custom_data:
-		# just a value to fill the map
-		pinfo.custom_data['MasonryInfillWallElement'] = 1
+	if not cache.removal_dir_created:
+		cache.removal_dir_created = True
 		# create the removal output directory
 		removal_dir_abs = '{}/{}'.format(pinfo.out_dir, removal_dir)
 		if os.path.exists(removal_dir_abs):
@@ -510,11 +576,13 @@ def writeTcl(pinfo):
 		for filename in glob.glob('{}/OOP_IIP_curve_wall_*'.format(pinfo.out_dir)):
 			print('removing OOP-IIP file: {}'.format(filename))
 			os.remove(filename)
-	# create the OOP-IIP tcl file needed by the recorder
-	OOP_IIP_filename = 'OOP_IIP_curve_wall_{}.tcl'.format(elem.id) # we use the quad element id for this wall file
-	with open('{}/{}'.format(pinfo.out_dir, OOP_IIP_filename), 'w', encoding='utf-8') as OOP_IIP_file:
-		for i in range(Ninteraction):
-			OOP_IIP_file.write('{}\t{}\n'.format(OOPv[i]/L, IIPv[i]/L))
+	# create the OOP-IIP tcl file needed by the recorder (shared by identical panels)
+	if panel.OOP_IIP_filename is None:
+		panel.OOP_IIP_filename = 'OOP_IIP_curve_wall_{}.tcl'.format(elem.id) # we use the quad element id of the first wall of this type
+		with open('{}/{}'.format(pinfo.out_dir, panel.OOP_IIP_filename), 'w', encoding='utf-8') as OOP_IIP_file:
+			for i in range(panel.Ninteraction):
+				OOP_IIP_file.write('{}\t{}\n'.format(panel.OOPv[i]/L, panel.IIPv[i]/L))
+	OOP_IIP_filename = panel.OOP_IIP_filename
 	# write recorders for removal
 	write('# recorders for removal')
 	write('recorder Collapse -ele {}   -time  -crit INFILLWALL  -file "{}/CollapseSequence.out"  -file_infill "{}" -global_gravaxis 3 -checknodes {} {} {}'.format(
@@ -333,6 +333,63 @@ def getNodalSpatialDim(xobj, xobj_phys_prop):
 		ndf = 6
 	
 	return [(ndm,ndf),(ndm,ndf)]
+
+class _write_cache_t:
+	'''
+	data shared by all RCBeamColumnElement elements during the export,
+	stored in pinfo.custom_data
+	'''
+	def __init__(self):
+		# parsed element datastores. key = element property id
+		self.elem_models = {}
+		# parsed physical property datastores. key = physical property id
+		self.pp_models = {}
+		# automatically generated sections. key = (process id, section type, definition), value = section tag
+		self.sections = {}
+
+def _get_write_cache(pinfo):
+	cache = pinfo.custom_data.get('RCBeamColumnElement', None)
+	if cache is None:
+		cache = _write_cache_t()
+		pinfo.custom_data['RCBeamColumnElement'] = cache
+	return cache
+
+def _get_models(pinfo, elem_prop, phys_prop):
+	'''
+	returns the models of the element and physical properties.
+	datastores are parsed only once for each property id.
+	'''
+	cache = _get_write_cache(pinfo)
+	elem_model = cache.elem_models.get(elem_prop.id, None)
+	if elem_model is None:
+		elem_model = readDatastore(elem_prop.XObject)
+		cache.elem_models[elem_prop.id] = elem_model
+	pp_model = cache.pp_models.get(phys_prop.id, None)
+	if pp_model is None:
+		# import the module of the material and if the function exists get the parameters
+		pp_xobj = phys_prop.XObject
+		module_name = 'opensees.physical_properties.{}.{}'.format(pp_xobj.Xnamespace, pp_xobj.name)
+		module = importlib.import_module(module_name)
+		if hasattr(module, 'readDatastore'):
+			pp_model = module.readDatastore(pp_xobj)
+			cache.pp_models[phys_prop.id] = pp_model
+	return elem_model, pp_model
+
+def _get_auto_section(pinfo, section_type, definition):
+	'''
+	returns a tuple with the tag of an automatically generated section (section section_type tag definition),
+	and a boolean that is True if the section is new and has to be written.
+	sections with the same definition are shared by all elements of the same process.
+	'''
+	cache = _get_write_cache(pinfo)
+	key = (pinfo.process_id, section_type, definition)
+	tag = cache.sections.get(key, None)
+	if tag is not None:
+		return tag, False
+	tag = pinfo.next_physicalProperties_id # auto-generated material
+	pinfo.next_physicalProperties_id += 1
+	cache.sections[key] = tag
+	return tag, True
 	
 def writeTcl(pinfo):
 
@@ -373,14 +430,9 @@ def writeTcl(pinfo):
 	elem_xobj = elem_prop.XObject
 	pp_xobj = phys_prop.XObject
 	
-	# get the model from datastore
+	# get the model from datastore (parsed once for each property)
 	try:
-		elem_model = readDatastore(elem_xobj)
-		# import the module of the material and if the function exists get the parameters
-		module_name = 'opensees.physical_properties.{}.{}'.format(pp_xobj.Xnamespace, pp_xobj.name)
-		module = importlib.import_module(module_name)
-		if hasattr(module, 'readDatastore'):
-			pp_model = module.readDatastore(pp_xobj)
+		elem_model, pp_model = _get_models(pinfo, elem_prop, phys_prop)
 	except Exception:
 		IO.write_cerr('Error: impossibile to get model from datastore\n')
 		raise
@@ -452,17 +504,17 @@ def writeTcl(pinfo):
 					if aggregateTorsion:
 						sopt += ' {} T'.format(torsionTag)
 					sopt += ' -section {}'.format(secTag)
-					# update the Section Tag to a new generated value
-					secTag = pinfo.next_physicalProperties_id # auto-generated material
-					pinfo.next_physicalProperties_id += 1
-					str_tcl_aggregator = '\n{}{}\n'.format(pinfo.indent,'# Automatically generated section aggregator')
-					str_tcl_aggregator += '{}section Aggregator {}{}\n'.format(pinfo.indent, secTag, sopt)
-					pinfo.out_file.write(str_tcl_aggregator)
+					# update the Section Tag to a new generated value (shared by elements with the same aggregator)
+					secTag, is_new = _get_auto_section(pinfo, 'Aggregator', sopt)
+					if is_new:
+						str_tcl_aggregator = '\n{}{}\n'.format(pinfo.indent,'# Automatically generated section aggregator')
+						str_tcl_aggregator += '{}section Aggregator {}{}\n'.format(pinfo.indent, secTag, sopt)
+						pinfo.out_file.write(str_tcl_aggregator)
 				sopt1 = 'Lobatto {} {}'.format(secTag,numIntPts)
 			else:
 				# User defined integration with Lobatto 5P distribution
 				numIntPts = pp_model.numIntPts
-				secTag = pp_model.crossSection
+				secTag = list(pp_model.crossSection) # a copy, the model is shared by all elements
 				weights = bsutils.beam_int_lobatto.get_weights(numIntPts)
 				positions = bsutils.beam_int_lobatto.get_locations(numIntPts)
 				
@@ -509,16 +561,16 @@ def writeTcl(pinfo):
 						if aggregateTorsion:
 							sopt += ' {} T'.format(torsionTag)
 						sopt += ' -section {}'.format(secTag[i])
-						# update the Section Tag to a new generated value
-						secTag[i] = pinfo.next_physicalProperties_id # auto-generated material
-						pinfo.next_physicalProperties_id += 1
-						if first:
-							str_tcl_aggregator = '\n{}{}\n'.format(pinfo.indent,'# Automatically generated section aggregators')
-							first = False
-						else:
-							str_tcl_aggregator = ''
-						str_tcl_aggregator += '{}section Aggregator {}{}\n'.format(pinfo.indent, secTag[i], sopt)
-						pinfo.out_file.write(str_tcl_aggregator)
+						# update the Section Tag to a new generated value (shared by elements with the same aggregator)
+						secTag[i], is_new = _get_auto_section(pinfo, 'Aggregator', sopt)
+						if is_new:
+							if first:
+								str_tcl_aggregator = '\n{}{}\n'.format(pinfo.indent,'# Automatically generated section aggregators')
+								first = False
+							else:
+								str_tcl_aggregator = ''
+							str_tcl_aggregator += '{}section Aggregator {}{}\n'.format(pinfo.indent, secTag[i], sopt)
+							pinfo.out_file.write(str_tcl_aggregator)
 					secTag_ += ' {}'.format(secTag[i])
 					positions_ += ' {}'.format(positions[i])
 					weights_ += ' {}'.format(weights[i])
@@ -526,7 +578,7 @@ def writeTcl(pinfo):
 				sopt1 = 'UserDefined {}{}{}{}'.format(numIntPts, secTag_, positions_, weights_)
 		elif (pp_model.formulation == 'lumpedFL'):
 			# Hinge integration - default HingeRadau
-			secTag = pp_model.crossSection
+			secTag = list(pp_model.crossSection) # a copy, the model is shared by all elements
 			# computation of plastic hinge length
 			# TODO: move somewhere in utils????
 			if not pp_model.automaticHingeLength:
@@ -600,17 +652,19 @@ def writeTcl(pinfo):
 				Izz *= Izz_modifier
 				A = p.area
 				
-				secTag[1] = pinfo.next_physicalProperties_id # auto-generated material
-				pinfo.next_physicalProperties_id += 1
-				str_tcl_elastic = '\n{}{}\n'.format(pinfo.indent,'# Automatically generated elastic section')
 				if pp_model.dimension == '2D':
-					str_tcl_elastic += '{}section Elastic {} {} {} {}\n'.format(pinfo.indent, secTag[1], Ec, A, Izz)
+					sopt = ' {} {} {}'.format(Ec, A, Izz)
 				else:
 					Iyy = p.Iyy
 					Iyy *= Iyy_modifier
 					J = p.J
-					str_tcl_elastic += '{}section Elastic {} {} {} {} {} {} {}\n'.format(pinfo.indent, secTag[1], Ec, A, Izz, Iyy, G, J)
-				pinfo.out_file.write(str_tcl_elastic)
+					sopt = ' {} {} {} {} {} {}'.format(Ec, A, Izz, Iyy, G, J)
+				# shared by elements with the same elastic section
+				secTag[1], is_new = _get_auto_section(pinfo, 'Elastic', sopt)
+				if is_new:
+					str_tcl_elastic = '\n{}{}\n'.format(pinfo.indent,'# Automatically generated elastic section')
+					str_tcl_elastic += '{}section Elastic {}{}\n'.format(pinfo.indent, secTag[1], sopt)
+					pinfo.out_file.write(str_tcl_elastic)
 			# If necessary create the aggregators
 			first = True
 			for i in range(3):
@@ -646,16 +700,16 @@ def writeTcl(pinfo):
 					if aggregateTorsion:
 						sopt += ' {} T'.format(torsionTag)
 					sopt += ' -section {}'.format(secTag[i])
-					# update the Section Tag to a new generated value
-					secTag[i] = pinfo.next_physicalProperties_id # auto-generated material
-					pinfo.next_physicalProperties_id += 1
-					if first:
-						str_tcl_aggregator = '\n{}{}\n'.format(pinfo.indent,'# Automatically generated section aggregators')
-						first = False
-					else:
-						str_tcl_aggregator = ''
-					str_tcl_aggregator += '{}section Aggregator {}{}\n'.format(pinfo.indent, secTag[i], sopt)
-					pinfo.out_file.write(str_tcl_aggregator)
+					# update the Section Tag to a new generated value (shared by elements with the same aggregator)
+					secTag[i], is_new = _get_auto_section(pinfo, 'Aggregator', sopt)
+					if is_new:
+						if first:
+							str_tcl_aggregator = '\n{}{}\n'.format(pinfo.indent,'# Automatically generated section aggregators')
+							first = False
+						else:
+							str_tcl_aggregator = ''
+						str_tcl_aggregator += '{}section Aggregator {}{}\n'.format(pinfo.indent, secTag[i], sopt)
+						pinfo.out_file.write(str_tcl_aggregator)
 			
 			sopt1 = 'HingeRadau {} {} {} {} {}'.format(secTag[0], lpI, secTag[2], lpJ, secTag[1])
 		
@@ -883,12 +937,12 @@ def writeTcl(pinfo):
 					if aggregateTorsion:
 						sopt += ' {} T'.format(torsionTag)
 					sopt += ' -section {}'.format(secTag)
-					# update the Section Tag to a new generated value
-					secTag = pinfo.next_physicalProperties_id # auto-generated material
-					pinfo.next_physicalProperties_id += 1
-					str_tcl_aggregator = '\n{}{}\n'.format(pinfo.indent,'# Automatically generated section aggregator')
-					str_tcl_aggregator += '{}section Aggregator {}{}\n'.format(pinfo.indent, secTag, sopt)
-					pinfo.out_file.write(str_tcl_aggregator)
+					# update the Section Tag to a new generated value (shared by elements with the same aggregator)
+					secTag, is_new = _get_auto_section(pinfo, 'Aggregator', sopt)
+					if is_new:
+						str_tcl_aggregator = '\n{}{}\n'.format(pinfo.indent,'# Automatically generated section aggregator')
+						str_tcl_aggregator += '{}section Aggregator {}{}\n'.format(pinfo.indent, secTag, sopt)
+						pinfo.out_file.write(str_tcl_aggregator)
 				sopt1 = 'Lobatto {} {}'.format(secTag,numIntPts)
 				
 				sopt = ''
@@ -15,6 +15,7 @@ import opensees.utils.write_definitions as write_definitions
 import opensees.utils.write_element as write_element
 import opensees.utils.write_node as write_node
 import opensees.utils.time_increment_utils as dt_utils
+import opensees.utils.selection_index_utils as siu
 from io import StringIO
 
 def write_tcl_int(out_dir):
@@ -115,6 +116,8 @@ def write_tcl_int(out_dir):
 	main_file.write('{}set STKO_VAR_OnBeforeAnalyze_CustomFunctions {{}}\n'.format(pinfo.indent))
 	main_file.write('{}# A list of custom functions called after solving the current time step\n'.format(pinfo.indent))
 	main_file.write('{}set STKO_VAR_OnAfterAnalyze_CustomFunctions {{}}\n'.format(pinfo.indent))
+	main_file.write('{}# A list of custom functions called after the state is restored from a checkpoint\n'.format(pinfo.indent))
+	main_file.write('{}set STKO_VAR_OnRestore_CustomFunctions {{}}\n'.format(pinfo.indent))
 	main_file.write('{}# A list of monitor functions\n'.format(pinfo.indent))
 	main_file.write('{}set STKO_VAR_MonitorFunctions {{}}\n'.format(pinfo.indent))
 	main_file.write('{}# for backward compatibility (STKO version < 3.1.0).\n'.format(pinfo.indent))
@@ -412,7 +415,12 @@ def write_tcl(out_dir):
 	Use this code block to just run the process of writing input files
 	without profiling
 	'''
-	write_tcl_int(out_dir)
+	# selection sets and condition assignments are resolved once per export
+	siu.begin()
+	try:
+		write_tcl_int(out_dir)
+	finally:
+		siu.end()
 	'''
 	Use this code block to profile the process of writing input files
 	to look for possible bottlenecks.
@@ -6,6 +6,7 @@ from PyMpc import *
 from mpc_utils_html import *
 import opensees.utils.tcl_input as tclin
 import opensees.utils.RandomMaterialTable as RMT
+import opensees.utils.element_centroid_utils as ecu
 
 from scipy.spatial import KDTree
 import numpy as np
@@ -96,7 +97,7 @@ def writeTcl(pinfo):
 	fname = _get_xobj_attribute(xobj, 'Table File').string
 	if not os.path.isabs(fname):
 		fname = os.path.join(pinfo.out_dir, fname)
-	rmt = RMT.RMT(fname)
+	rmt = RMT.get(fname)
 	
 	# check arguments
 	nargs = len(rmt.args)
@@ -164,41 +165,9 @@ def writeTcl(pinfo):
 	
 	# find all elements with this material
 	# prepare a list element ids and element center points (samples for the KDTree)
-	mesh = doc.mesh
-	ele_list = []
-	ele_centers = []
-	def process_domain(elements):
-		for ele in elements:
-			# element id
-			ele_list.append(ele.id)
-			# element center
-			C = ele.computeCenter()
-			ele_centers.append((C.x, C.y, C.z))
-	for geom_id, geom in doc.geometries.items():
-		mog = mesh.getMeshedGeometry(geom_id)
-		pas = geom.physicalPropertyAssignment
-		for i in range(len(pas.onEdges)):
-			trial = pas.onEdges[i]
-			if trial and trial.id == phys_prop.id:
-				domain = mog.edges[i]
-				process_domain(domain.elements)
-		for i in range(len(pas.onFaces)):
-			trial = pas.onFaces[i]
-			if trial and trial.id == phys_prop.id:
-				domain = mog.faces[i]
-				process_domain(domain.elements)
-		for i in range(len(pas.onSolids)):
-			trial = pas.onSolids[i]
-			if trial and trial.id == phys_prop.id:
-				domain = mog.solids[i]
-				process_domain(domain.elements)
-	for inter_id, inter in doc.interactions.items():
-		if inter.physicalProperty is xobj.parent:
-			moi = mesh.getMeshedInteraction(inter_id)
-			process_domain(moi.elements)
-	
-	# convert ele centers to numpy array
-	ele_centers = np.asarray(ele_centers)
+	# using the element centroid table (built once for all spatial-mapping features)
+	ele_list, ele_centers = ecu.get_table(pinfo).property_centers(phys_prop.id)
+	ele_list = ele_list.tolist()
 	if len(ele_centers) < 1:
 		return
 	
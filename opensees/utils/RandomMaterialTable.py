@@ -1,15 +1,79 @@
 from scipy.spatial import KDTree
 import numpy as np
+import hashlib
+import os
 
 def _err(msg):
 	return 'Error in RandomMaterialTable:\n{}'.format(msg)
 
+# version of the binary companion file format (.rmt.npz)
+_BINARY_VERSION = 1
+
+# process-wide cache of loaded tables
+# key = absolute file name, value = (file stamp, RMT)
+_cache = {}
+
+def _stamp(fname):
+	'''
+	returns the (size, mtime) stamp of a file
+	'''
+	st = os.stat(fname)
+	return (st.st_size, st.st_mtime_ns)
+
+def _hash(fname):
+	'''
+	returns the sha1 hash of a file
+	'''
+	h = hashlib.sha1()
+	with open(fname, 'rb') as tfile:
+		for block in iter(lambda: tfile.read(1 << 20), b''):
+			h.update(block)
+	return h.hexdigest()
+
+def binaryFileName(fname):
+	'''
+	returns the name of the binary companion file of a Random Material Table file
+	'''
+	return '{}.npz'.format(fname)
+
+def get(fname):
+	'''
+	returns the RMT of a Random Material Table file.
+	The table (and its KDTree) is loaded only once per process,
+	and re-loaded only if the file has changed.
+	'''
+	key = os.path.abspath(fname)
+	stamp = _stamp(key)
+	item = _cache.get(key, None)
+	if item is not None and item[0] == stamp:
+		return item[1]
+	rmt = RMT(key)
+	_cache[key] = (stamp, rmt)
+	return rmt
+
 class RMT:
 	'''
 	a class for dealing with Random Material Table file format.
+	When a valid binary companion file (see binaryFileName) is found,
+	it is used instead of parsing the text file. Otherwise the text file
+	is parsed and the binary companion file is (re-)generated.
 	'''
 	def __init__(self, fname):
 		
+		# read from the binary companion file if it is up to date,
+		# otherwise parse the text file and generate the binary companion file
+		if not self._read_binary(fname):
+			self._read_text(fname)
+			self._write_binary(fname)
+		
+		# generate the KDTree
+		npts = self.mat_point_pos.shape[0]
+		perc = 0.0005
+		LFS = max(1, int(float(npts)*perc))
+		self.tree = KDTree(self.mat_point_pos, leafsize=LFS)
+	
+	def _read_text(self, fname):
+		
 		# open file and read all lines
 		with open(fname, 'r') as tfile:
 			lines = [line.strip() for line in tfile.read().split('\n') if line.strip()]
@@ -72,23 +136,115 @@ class RMT:
 		
 		# read all material points
 		# store their coordinate into a numpy Nx3 matrix (self.mat_point_pos)
-		# store also a list for each row of the matrix with the material id (self.mat_point_ids)
-		self.mat_point_pos = np.zeros((npts, 3))
-		self.mat_point_ids = [0]*npts
-		for i in range(npts):
-			line = lines[i+nmat+3]
-			words = line.split(',')
-			if len(words) != 4:
-				raise Exception(_err('Number of arguments at row {} should be equal to 4 (X,Y,Z,ID)'.format(i+nmat+3)))
-			try:
-				self.mat_point_pos[i, 0] = float(words[0])
-				self.mat_point_pos[i, 1] = float(words[1])
-				self.mat_point_pos[i, 2] = float(words[2])
-				self.mat_point_ids[i] = int(words[3])
-			except:
-				raise Exception(_err('Parsing material data failed at row {}. It should contain 1 integer + {} reals'.format(i+3, nargs)))
-		
-		# generate the KDTree
-		perc = 0.0005
-		LFS = max(1, int(float(npts)*perc))
-		self.tree = KDTree(self.mat_point_pos, leafsize=LFS)
\ No newline at end of file
+		# store also an array for each row of the matrix with the material id (self.mat_point_ids)
+		point_lines = lines[nmat+3:]
+		try:
+			# fast path: parse all points at once
+			data = np.loadtxt(point_lines, delimiter=',', ndmin=2)
+			if data.shape != (npts, 4):
+				raise ValueError()
+			self.mat_point_pos = np.ascontiguousarray(data[:, 0:3])
+			self.mat_point_ids = data[:, 3].astype(np.int64)
+			if not np.array_equal(self.mat_point_ids, data[:, 3]):
+				raise ValueError()
+		except ValueError:
+			# slow path: parse each point to find the wrong row
+			self.mat_point_pos = np.zeros((npts, 3))
+			self.mat_point_ids = np.zeros(npts, dtype=np.int64)
+			for i in range(npts):
+				line = point_lines[i]
+				words = line.split(',')
+				if len(words) != 4:
+					raise Exception(_err('Number of arguments at row {} should be equal to 4 (X,Y,Z,ID)'.format(i+nmat+3)))
+				try:
+					self.mat_point_pos[i, 0] = float(words[0])
+					self.mat_point_pos[i, 1] = float(words[1])
+					self.mat_point_pos[i, 2] = float(words[2])
+					self.mat_point_ids[i] = int(words[3])
+				except:
+					raise Exception(_err('Parsing material data failed at row {}. It should contain 1 integer + {} reals'.format(i+3, nargs)))
+	
+	def _read_binary(self, fname):
+		'''
+		reads the binary companion file, if it exists and it was generated
+		from the current contents of the text file.
+		returns True on success
+		'''
+		bname = binaryFileName(fname)
+		if not os.path.isfile(bname):
+			return False
+		try:
+			with np.load(bname, allow_pickle=False) as data:
+				if int(data['version']) != _BINARY_VERSION:
+					return False
+				# validate against the source file
+				size, mtime = _stamp(fname)
+				if int(data['source_size']) != size:
+					return False
+				if int(data['source_mtime']) != mtime and str(data['source_hash']) != _hash(fname):
+					return False
+				# arguments
+				self.args = [str(i) for i in data['args']]
+				nargs = len(self.args)
+				# materials. values are stored flattened, with offsets for each (material, argument) pair
+				self.mat_id = data['mat_id'].tolist()
+				values = data['mat_values'].tolist()
+				offsets = data['mat_offsets'].tolist()
+				is_list = data['mat_is_list'].tolist()
+				nmat = len(self.mat_id)
+				self.mat_data = [None]*nmat
+				for i in range(nmat):
+					mat_values = [None]*nargs
+					for j in range(nargs):
+						k = i*nargs+j
+						if is_list[k]:
+							mat_values[j] = values[offsets[k]:offsets[k+1]]
+						else:
+							mat_values[j] = values[offsets[k]]
+					self.mat_data[i] = tuple(mat_values)
+				# material points
+				self.mat_point_pos = data['mat_point_pos']
+				self.mat_point_ids = data['mat_point_ids']
+			return True
+		except Exception as ex:
+			print('Warning: cannot read Random Material Table binary file "{}" ({}). The text file will be parsed.'.format(bname, ex))
+			return False
+	
+	def _write_binary(self, fname):
+		'''
+		writes the binary companion file.
+		failures are not fatal (e.g. read-only directory)
+		'''
+		bname = binaryFileName(fname)
+		values = []
+		offsets = [0]
+		is_list = []
+		for mat_values in self.mat_data:
+			for ival in mat_values:
+				if isinstance(ival, list):
+					values.extend(ival)
+					is_list.append(True)
+				else:
+					values.append(ival)
+					is_list.append(False)
+				offsets.append(len(values))
+		size, mtime = _stamp(fname)
+		temp_name = '{}.tmp{}.npz'.format(bname, os.getpid())
+		try:
+			np.savez(temp_name,
+				version = np.int64(_BINARY_VERSION),
+				source_size = np.int64(size),
+				source_mtime = np.int64(mtime),
+				source_hash = np.str_(_hash(fname)),
+				args = np.asarray(self.args, dtype=str),
+				mat_id = np.asarray(self.mat_id, dtype=np.int64),
+				mat_values = np.asarray(values, dtype=float),
+				mat_offsets = np.asarray(offsets, dtype=np.int64),
+				mat_is_list = np.asarray(is_list, dtype=bool),
+				mat_point_pos = self.mat_point_pos,
+				mat_point_ids = self.mat_point_ids)
+			os.replace(temp_name, bname)
+		except Exception as ex:
+			print('Warning: cannot write Random Material Table binary file "{}" ({})'.format(bname, ex))
+			if os.path.isfile(temp_name):
+				os.remove(temp_name)
@@ -0,0 +1,242 @@
+from PyMpc import *
+import re
+
+# Checkpoint and restart of the analysis.
+#
+# When the document contains at least one "checkpoint" analysis step, the Tcl runtime
+# (database, restart data and procs) is written once, before the first analysis or
+# checkpoint step. Each analysis (AnalysesCommand) is a stage:
+# - at its beginning it calls STKO_CALL_CheckpointBeginStage, that skips the stages
+#   completed before the last checkpoint and restores the saved state in the stage
+#   where the last checkpoint was written
+# - load and transient control analyses also save a checkpoint every
+#   STKO_VAR_checkpoint_interval increments, and they can resume from it
+# - the checkpoint step saves a checkpoint at the stage boundary (STKO_CALL_CheckpointBoundary),
+#   and at restart the state is restored there
+#
+# The state of each process is saved with the OpenSees database/save commands, in its
+# own file, alternating between two commit tags: a save never overwrites the last valid
+# checkpoint, and the database does not grow with the number of saves. The restart data
+# (stage, commit tag, time, increment counter and adaptive factor) is written in a small
+# Tcl script, sourced by the main script at restart.
+# Parameters are not part of the saved state: the functions that create parameters
+# (time-increment utility, IMPL-EX error control, ...) are added to
+# STKO_VAR_OnRestore_CustomFunctions, and they are called after each restore.
+#
+# Usage (in AnalysesCommand):
+#	import opensees.utils.checkpoint_utils as cpu
+#	if cpu.is_active(pinfo):
+#		cpu.write_setup(pinfo)
+#	template = cpu.replace_checkpoint(pinfo, template, resumable)
+#	cpu.write_stage(pinfo, 'analyze 10')
+
+# placeholder lines in the analysis templates
+_BEGIN = re.compile(r'^__checkpoint_begin__(.*)\n', re.MULTILINE)
+_INCREMENT = re.compile(r'^([ \t]*)__checkpoint_increment__(.*)\n', re.MULTILINE)
+
+class _checkpoint_data_t:
+	def __init__(self):
+		# the first checkpoint step in the document (None if not found)
+		self.step = None
+		# True if the Tcl runtime has been already written
+		self.setup_done = False
+
+def _get_data(pinfo):
+	data = pinfo.custom_data.get('Checkpoint', None)
+	if data is None:
+		data = _checkpoint_data_t()
+		doc = App.caeDocument()
+		if doc is not None:
+			for _, step in doc.analysisSteps.items():
+				xobj = step.XObject
+				if (xobj is not None) and (xobj.name == 'checkpoint'):
+					data.step = step
+					break
+		pinfo.custom_data['Checkpoint'] = data
+	return data
+
+def is_active(pinfo):
+	'''
+	returns True if the document contains at least one checkpoint step
+	'''
+	return _get_data(pinfo).step is not None
+
+def write_setup(pinfo):
+	'''
+	writes the Tcl runtime for checkpoint and restart, only once.
+	the directory and the restart flag are taken from the first checkpoint step
+	'''
+	data = _get_data(pinfo)
+	if data.step is None or data.setup_done:
+		return
+	data.setup_done = True
+	xobj = data.step.XObject
+	directory = xobj.getAttribute('Directory').string.strip()
+	if not directory:
+		directory = 'checkpoint'
+	restart = int(xobj.getAttribute('Restart').boolean)
+	pinfo.out_file.write('''
+# ======================================================================================
+# CHECKPOINT AND RESTART
+# ======================================================================================
+
+set STKO_VAR_checkpoint_dir "{0}"
+set STKO_VAR_checkpoint_file "$STKO_VAR_checkpoint_dir/restart.$STKO_VAR_process_id.tcl"
+# the current stage, the commit tag of the last save (1 or 2, 0 = none), and the increment counter at the last save
+set STKO_VAR_checkpoint_stage 0
+set STKO_VAR_checkpoint_tag 0
+set STKO_VAR_checkpoint_last_increment 0
+# save every N increments in load and transient control analyses (0 = only at checkpoint steps)
+set STKO_VAR_checkpoint_interval 0
+# the restart data (stage 0 = no restart)
+set STKO_VAR_restart_stage 0
+set STKO_VAR_restart_completed 0
+set STKO_VAR_restart_tag 0
+set STKO_VAR_restart_time 0.0
+set STKO_VAR_restart_increment 1
+set STKO_VAR_restart_factor 1.0
+if {{{1} && [file exists $STKO_VAR_checkpoint_file]}} {{
+	source $STKO_VAR_checkpoint_file
+	set STKO_VAR_checkpoint_tag $STKO_VAR_restart_tag
+	if {{$STKO_VAR_process_id == 0}} {{
+		puts "Restarting from checkpoint: stage $STKO_VAR_restart_stage, time $STKO_VAR_restart_time"
+	}}
+}}
+file mkdir $STKO_VAR_checkpoint_dir
+database File "$STKO_VAR_checkpoint_dir/data.$STKO_VAR_process_id"
+# Save the state and the restart data.
+# The state is saved with the commit tag not used by the last checkpoint, and the restart
+# data is written to a temporary file and then renamed, so that a crash while saving
+# does not corrupt the last checkpoint. Only two tags are used, so the database does not grow
+proc STKO_CALL_CheckpointSave {{completed next_increment}} {{
+	global STKO_VAR_checkpoint_file STKO_VAR_checkpoint_stage STKO_VAR_checkpoint_tag STKO_VAR_checkpoint_last_increment
+	global STKO_VAR_restart_stage STKO_VAR_time STKO_VAR_process_id factor
+	# do not overwrite the last checkpoint while skipping the completed stages
+	if {{$STKO_VAR_checkpoint_stage < $STKO_VAR_restart_stage}} {{
+		return
+	}}
+	if {{$STKO_VAR_checkpoint_tag == 1}} {{set STKO_VAR_checkpoint_tag 2}} else {{set STKO_VAR_checkpoint_tag 1}}
+	save $STKO_VAR_checkpoint_tag
+	if {{[info exists factor]}} {{set current_factor $factor}} else {{set current_factor 1.0}}
+	# the time is not tracked by stages written without an analysis template (plain analyze)
+	if {{[info exists STKO_VAR_time]}} {{set current_time $STKO_VAR_time}} else {{set current_time [getTime]}}
+	set fp [open "$STKO_VAR_checkpoint_file.tmp" w]
+	puts $fp "set STKO_VAR_restart_stage $STKO_VAR_checkpoint_stage"
+	puts $fp "set STKO_VAR_restart_completed $completed"
+	puts $fp "set STKO_VAR_restart_tag $STKO_VAR_checkpoint_tag"
+	puts $fp "set STKO_VAR_restart_time $current_time"
+	puts $fp "set STKO_VAR_restart_increment $next_increment"
+	puts $fp "set STKO_VAR_restart_factor $current_factor"
+	close $fp
+	file rename -force "$STKO_VAR_checkpoint_file.tmp" $STKO_VAR_checkpoint_file
+	set STKO_VAR_checkpoint_last_increment $next_increment
+	if {{$STKO_VAR_process_id == 0}} {{
+		puts "Checkpoint saved: stage $STKO_VAR_checkpoint_stage, time $current_time"
+	}}
+}}
+# Restore the state saved with a commit tag, and create again the parameters
+proc STKO_CALL_CheckpointRestore {{tag}} {{
+	global STKO_VAR_OnRestore_CustomFunctions
+	restore $tag
+	foreach item $STKO_VAR_OnRestore_CustomFunctions {{
+		$item
+	}}
+}}
+# Save a checkpoint after a converged increment, every STKO_VAR_checkpoint_interval increments
+proc STKO_CALL_CheckpointIncrement {{next_increment}} {{
+	global STKO_VAR_checkpoint_interval STKO_VAR_checkpoint_last_increment
+	if {{$STKO_VAR_checkpoint_interval > 0 && [expr $next_increment - $STKO_VAR_checkpoint_last_increment] >= $STKO_VAR_checkpoint_interval}} {{
+		STKO_CALL_CheckpointSave 0 $next_increment
+	}}
+}}
+# Save a checkpoint at a stage boundary (checkpoint step).
+# At restart, the state is restored at the boundary where it was saved
+proc STKO_CALL_CheckpointBoundary {{}} {{
+	global STKO_VAR_checkpoint_stage STKO_VAR_restart_stage STKO_VAR_restart_completed STKO_VAR_restart_tag STKO_VAR_process_id
+	if {{$STKO_VAR_checkpoint_stage == $STKO_VAR_restart_stage && $STKO_VAR_restart_completed}} {{
+		STKO_CALL_CheckpointRestore $STKO_VAR_restart_tag
+		set STKO_VAR_restart_completed 0
+		if {{$STKO_VAR_process_id == 0}} {{
+			puts "State restored from the last checkpoint (after stage $STKO_VAR_checkpoint_stage)"
+		}}
+		return
+	}}
+	# nothing to save before the first stage
+	if {{$STKO_VAR_checkpoint_stage > 0}} {{
+		STKO_CALL_CheckpointSave 1 1
+	}}
+}}
+# Begin a new stage. Returns:
+# 0 = run the stage
+# 1 = skip the stage (completed before the last checkpoint)
+# 2 = resume the stage from the last checkpoint (time, increment counter and factor are restored)
+proc STKO_CALL_CheckpointBeginStage {{}} {{
+	global STKO_VAR_checkpoint_stage STKO_VAR_checkpoint_last_increment
+	global STKO_VAR_restart_stage STKO_VAR_restart_completed STKO_VAR_restart_tag
+	global STKO_VAR_restart_time STKO_VAR_restart_increment STKO_VAR_restart_factor
+	global STKO_VAR_time STKO_VAR_increment STKO_VAR_process_id factor old_factor
+	incr STKO_VAR_checkpoint_stage
+	set STKO_VAR_checkpoint_last_increment 1
+	if {{$STKO_VAR_checkpoint_stage < $STKO_VAR_restart_stage}} {{
+		if {{$STKO_VAR_process_id == 0}} {{
+			puts "Stage $STKO_VAR_checkpoint_stage skipped (completed before the last checkpoint)"
+		}}
+		return 1
+	}}
+	if {{$STKO_VAR_checkpoint_stage == $STKO_VAR_restart_stage}} {{
+		if {{$STKO_VAR_restart_completed}} {{
+			if {{$STKO_VAR_process_id == 0}} {{
+				puts "Stage $STKO_VAR_checkpoint_stage skipped (completed before the last checkpoint)"
+			}}
+			return 1
+		}}
+		STKO_CALL_CheckpointRestore $STKO_VAR_restart_tag
+		set STKO_VAR_time $STKO_VAR_restart_time
+		set STKO_VAR_increment $STKO_VAR_restart_increment
+		set STKO_VAR_checkpoint_last_increment $STKO_VAR_restart_increment
+		set factor $STKO_VAR_restart_factor
+		set old_factor $factor
+		if {{$STKO_VAR_process_id == 0}} {{
+			puts "Stage $STKO_VAR_checkpoint_stage resumed from the last checkpoint. Time = $STKO_VAR_time"
+		}}
+		return 2
+	}}
+	return 0
+}}
+'''.format(directory, restart))
+
+def replace_checkpoint(pinfo, template, resumable):
+	'''
+	replaces the checkpoint placeholder lines in an analysis template:
+	- "__checkpoint_begin__ <skip>" : the beginning of the stage, where <skip> is the Tcl code
+	  that makes the template skip the whole stage
+	- "__checkpoint_increment__ <next_increment>" : the end of a converged increment.
+	  only for resumable stages (load and transient control). In the other ones
+	  (displacement control, arc-length, ...) the state of the analysis is not fully
+	  described by time, increment counter and factor, so they can only be skipped
+	the placeholder lines are removed if the document has no checkpoint step
+	'''
+	if not is_active(pinfo):
+		return _BEGIN.sub('', _INCREMENT.sub('', template))
+	template = _BEGIN.sub(
+		lambda m : ('# checkpoint and restart: skip the completed stages, or resume from the last checkpoint\n'
+			'if {{[STKO_CALL_CheckpointBeginStage] == 1}} {{\n\t{}\n}}\n').format(m.group(1).strip()),
+		template)
+	if resumable:
+		return _INCREMENT.sub(lambda m : '{}STKO_CALL_CheckpointIncrement {}\n'.format(m.group(1), m.group(2).strip()), template)
+	return _INCREMENT.sub('', template)
+
+def write_stage(pinfo, command):
+	'''
+	writes a stage made of a single command, not written with an analysis template
+	(e.g. the plain analyze command). If the document has a checkpoint step,
+	the command is skipped at restart when the stage was completed before the last checkpoint
+	'''
+	if not is_active(pinfo):
+		pinfo.out_file.write('{}{}\n'.format(pinfo.indent, command))
+		return
+	pinfo.out_file.write(
+		'{0}# checkpoint and restart: skip the completed stages\n'
+		'{0}if {{[STKO_CALL_CheckpointBeginStage] != 1}} {{\n'
+		'{0}{1}{2}\n'
+		'{0}}}\n'.format(pinfo.indent, pinfo.tabIndent, command))
@@ -0,0 +1,180 @@
+from PyMpc import *
+import numpy as np
+
+# A per-run cached table of element centroids.
+#
+# The centroid of an element is the point at the natural center of its
+# parametric domain: C = sum_i (N_i(center) * X_i). The shape functions at the
+# natural center depend only on the geometry family and on the number of nodes,
+# so elements are grouped by (family, number of nodes), the weights of each group
+# are set only once, and all the centroids of a group are computed at once with
+# NumPy from the (num_elements x num_nodes x 3) array of node coordinates.
+# The weights of each group are checked against computeCenter() of its first element.
+# Groups with an unknown node ordering are computed with computeCenter().
+#
+# Centroids are computed only when they are requested (for the elements
+# of a physical property, or for a list of element ids), and they are stored
+# in the table, that is kept in pinfo.custom_data for the rest of the export.
+#
+# Usage:
+#	import opensees.utils.element_centroid_utils as ecu
+#	table = ecu.get_table(pinfo)
+#	centers, found = table.centers_of(ele_ids)
+#	ele_ids, centers = table.property_centers(phys_prop.id)
+
+# the key used to store the table in pinfo.custom_data
+_KEY = 'ElementCentroidTable'
+
+def _center_weights():
+	'''
+	returns a dict. key = (family, num nodes), value = the shape functions at the natural center.
+	nodes are ordered as: corners, mid-edge nodes, mid-face nodes, mid-volume node
+	'''
+	W = {}
+	L = MpcElementGeometryFamilyType.Line
+	T = MpcElementGeometryFamilyType.Triangle
+	Q = MpcElementGeometryFamilyType.Quadrilateral
+	TT = MpcElementGeometryFamilyType.Tetrahedron
+	H = MpcElementGeometryFamilyType.Hexahedron
+	W[(L, 2)] = [1.0/2.0]*2
+	W[(L, 3)] = [0.0]*2 + [1.0]
+	W[(T, 3)] = [1.0/3.0]*3
+	W[(T, 6)] = [-1.0/9.0]*3 + [4.0/9.0]*3
+	W[(Q, 4)] = [1.0/4.0]*4
+	W[(Q, 8)] = [-1.0/4.0]*4 + [1.0/2.0]*4
+	W[(Q, 9)] = [0.0]*8 + [1.0]
+	W[(TT, 4)] = [1.0/4.0]*4
+	W[(TT, 10)] = [-1.0/8.0]*4 + [1.0/4.0]*6
+	W[(H, 8)] = [1.0/8.0]*8
+	W[(H, 20)] = [-1.0/4.0]*8 + [1.0/4.0]*12
+	W[(H, 27)] = [0.0]*26 + [1.0]
+	return {key : np.asarray(value, dtype=float) for key, value in W.items()}
+
+def _compute_centers(elements, weights):
+	'''
+	returns the Nx3 matrix of centroids of the input elements
+	'''
+	centers = np.zeros((len(elements), 3))
+	# group elements by family and number of nodes
+	groups = {}
+	for pos, ele in enumerate(elements):
+		key = (ele.geometryFamilyType(), len(ele.nodes))
+		item = groups.get(key, None)
+		if item is None:
+			item = []
+			groups[key] = item
+		item.append(pos)
+	for key, positions in groups.items():
+		N = weights.get(key, None)
+		if N is not None:
+			# check the weights against the first element
+			first = elements[positions[0]]
+			X = np.asarray([(node.x, node.y, node.z) for node in first.nodes], dtype=float)
+			C = first.computeCenter()
+			tol = 1.0e-8*max(1.0, float(np.max(np.abs(X))))
+			if np.max(np.abs(N @ X - (C.x, C.y, C.z))) > tol:
+				N = None
+		if N is None:
+			# unknown node ordering
+			for pos in positions:
+				C = elements[pos].computeCenter()
+				centers[pos] = (C.x, C.y, C.z)
+			continue
+		# all centroids of this group in one product
+		X = np.asarray([[(node.x, node.y, node.z) for node in elements[pos].nodes] for pos in positions], dtype=float).reshape(len(positions), key[1], 3)
+		centers[positions] = np.einsum('i,eij->ej', N, X)
+	return centers
+
+class element_centroid_table:
+	def __init__(self, doc):
+		self.doc = doc
+		self.weights = _center_weights()
+		# computed element ids (sorted) and their centroids
+		self.ele_ids = np.zeros(0, dtype=np.int64)
+		self.centers = np.zeros((0, 3))
+		# physical property id -> (element ids, centroids)
+		self.phys_prop_centers = {}
+	
+	def _store(self, ele_ids, centers):
+		ele_ids = np.concatenate((self.ele_ids, ele_ids))
+		centers = np.concatenate((self.centers, centers))
+		ele_ids, first = np.unique(ele_ids, return_index=True)
+		self.ele_ids = ele_ids
+		self.centers = centers[first]
+	
+	def _lookup(self, ele_ids):
+		if len(self.ele_ids) == 0:
+			return (np.zeros(len(ele_ids), dtype=np.int64), np.zeros(len(ele_ids), dtype=bool))
+		pos = np.minimum(np.searchsorted(self.ele_ids, ele_ids), len(self.ele_ids) - 1)
+		return (pos, self.ele_ids[pos] == ele_ids)
+	
+	def centers_of(self, ele_ids):
+		'''
+		returns a tuple with:
+		- the Nx3 matrix of centroids of the input elements
+		- a boolean array that is False for elements not found in the mesh
+		  (for example auto-generated elements), whose centroid is left to 0
+		'''
+		ele_ids = np.asarray(ele_ids, dtype=np.int64).reshape(-1)
+		# compute the missing ones
+		_, found = self._lookup(ele_ids)
+		if not np.all(found):
+			missing = []
+			for ele_id in np.unique(ele_ids[~found]).tolist():
+				ele = self.doc.mesh.getElement(ele_id)
+				if ele:
+					missing.append(ele)
+			if len(missing) > 0:
+				self._store(np.asarray([ele.id for ele in missing], dtype=np.int64), _compute_centers(missing, self.weights))
+		pos, found = self._lookup(ele_ids)
+		centers = np.where(found[:, None], self.centers[pos], 0.0) if len(self.ele_ids) > 0 else np.zeros((len(ele_ids), 3))
+		return (centers, found)
+	
+	def property_centers(self, phys_prop_id):
+		'''
+		returns the element ids with the given physical property and their centroids
+		'''
+		item = self.phys_prop_centers.get(phys_prop_id, None)
+		if item is not None:
+			return item
+		# gather the elements of this physical property
+		doc = self.doc
+		elements = []
+		def process_assignment(assignment, domains):
+			for i in range(min(len(assignment), len(domains))):
+				trial = assignment[i]
+				if trial and trial.id == phys_prop_id:
+					elements.extend(domains[i].elements)
+		for geom_id, geom in doc.geometries.items():
+			mog = doc.mesh.getMeshedGeometry(geom_id)
+			if mog is None:
+				continue
+			pas = geom.physicalPropertyAssignment
+			process_assignment(pas.onEdges, mog.edges)
+			process_assignment(pas.onFaces, mog.faces)
+			process_assignment(pas.onSolids, mog.solids)
+		for inter_id, inter in doc.interactions.items():
+			if inter.physicalProperty and inter.physicalProperty.id == phys_prop_id:
+				moi = doc.mesh.getMeshedInteraction(inter_id)
+				if moi is not None:
+					elements.extend(moi.elements)
+		ele_ids = np.asarray([ele.id for ele in elements], dtype=np.int64)
+		centers = _compute_centers(elements, self.weights)
+		self._store(ele_ids, centers)
+		item = (ele_ids, centers)
+		self.phys_prop_centers[phys_prop_id] = item
+		return item
+
+def get_table(pinfo):
+	'''
+	returns the element centroid table of the current document.
+	it is created only once and stored in pinfo.custom_data
+	'''
+	table = pinfo.custom_data.get(_KEY, None)
+	if table is None:
+		doc = App.caeDocument()
+		if doc is None:
+			raise Exception('null cae document')
+		table = element_centroid_table(doc)
+		pinfo.custom_data[_KEY] = table
+	return table
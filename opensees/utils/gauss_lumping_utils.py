@@ -0,0 +1,108 @@
+from PyMpc import *
+import numpy as np
+from opensees.conditions.utils import SpatialFunctionBatchEval
+
+# Batched lumping of distributed quantities (mass, loads, ...) on element nodes.
+#
+# For each element the lumped value at node i is:
+#	L_i = sum_gp ( N_i * det(J) * W * sum_j (N_j * v_j) )
+# where v_j are the nodal values of the distributed quantity.
+#
+# Elements are grouped by geometry family, number of nodes and number of
+# integration points. For each group, shape functions and weights are evaluated
+# only once (they don't depend on the element geometry), the jacobian determinants
+# are gathered in a (num_elements x num_gauss) matrix, and the lumping of all
+# elements is done at once with NumPy.
+#
+# Usage:
+#	import opensees.utils.gauss_lumping_utils as glu
+#	node_ids, values = glu.lump_on_nodes(elements, value = (mx, my, mz))
+#	node_ids, values = glu.lump_on_nodes(elements, functions = (fx, fy, fz))
+#	lumped = glu.lump_elements(elements, nodal_values)
+
+def _groups(elements):
+	'''
+	returns a dict. key = (family, num nodes, num gauss points), value = element positions
+	'''
+	groups = {}
+	for pos, elem in enumerate(elements):
+		key = (elem.geometryFamilyType(), len(elem.nodes), len(elem.integrationRule.integrationPoints))
+		item = groups.get(key, None)
+		if item is None:
+			item = []
+			groups[key] = item
+		item.append(pos)
+	return groups
+
+def _lump_group(elements, n, values):
+	'''
+	lumps the (num_elements x n x 3) nodal values of elements of the same group.
+	returns a (num_elements x n x 3) array
+	'''
+	# shape functions (ngp x n) and weights, from the first element
+	points = elements[0].integrationRule.integrationPoints
+	N = np.zeros((len(points), n))
+	W = np.zeros(len(points))
+	for gp, gauss_point in enumerate(points):
+		Ngp = elements[0].shapeFunctionsAt(gauss_point)
+		for i in range(n):
+			N[gp, i] = Ngp[i]
+		W[gp] = gauss_point.w
+	# jacobian determinants (num_elements x ngp)
+	det_J = np.asarray([[elem.jacobianAt(gauss_point).det() for gauss_point in points] for elem in elements], dtype=float)
+	# values at gauss points (num_elements x ngp x 3), and lumping
+	values_gp = np.einsum('gj,ejc->egc', N, values)
+	return np.einsum('gi,eg,egc->eic', N, det_J * W, values_gp)
+
+def lump_elements(elements, nodal_values):
+	'''
+	returns the list of values lumped at the nodes of each element (an n x 3 array for each element).
+	nodal_values: a list with the n x 3 nodal values of each element
+	'''
+	lumped = [None]*len(elements)
+	for (_, n, _), positions in _groups(elements).items():
+		group = [elements[pos] for pos in positions]
+		values = np.asarray([nodal_values[pos] for pos in positions], dtype=float).reshape(len(group), n, 3)
+		result = _lump_group(group, n, values)
+		for k, pos in enumerate(positions):
+			lumped[pos] = result[k]
+	return lumped
+
+def lump_on_nodes(elements, value = None, functions = None):
+	'''
+	lumps a distributed quantity on the nodes of the elements.
+	the nodal values are given either as:
+	- value: a constant value (3 components)
+	- functions: 3 spatial functions of x, y and z, evaluated only once for each node
+	returns a tuple with the sorted unique node ids, and the (num_nodes x 3) summed lumped values
+	'''
+	if len(elements) == 0:
+		return (np.zeros(0, dtype=np.int64), np.zeros((0, 3)))
+	groups = _groups(elements)
+
+	# connectivity of each group, and unique nodes
+	connectivity = []
+	for (_, n, _), positions in groups.items():
+		connectivity.append(np.asarray([[node.id for node in elements[pos].nodes] for pos in positions], dtype=np.int64).reshape(len(positions), n))
+	node_ids, inverse = np.unique(np.concatenate([conn.reshape(-1) for conn in connectivity]), return_inverse=True)
+
+	# nodal values of unique nodes
+	if functions is not None:
+		nodes = {}
+		for elem in elements:
+			for node in elem.nodes:
+				nodes[node.id] = node
+		seval = SpatialFunctionBatchEval(functions)
+		node_values = np.asarray([seval.evaluate(nodes[node_id].position) for node_id in node_ids.tolist()], dtype=float).reshape(len(node_ids), 3)
+	else:
+		node_values = np.tile(np.asarray(value, dtype=float).reshape(1, 3), (len(node_ids), 1))
+
+	# lump each group and sum on nodes
+	lumped = np.zeros((len(node_ids), 3))
+	offset = 0
+	for conn, ((_, n, _), positions) in zip(connectivity, groups.items()):
+		rows = inverse[offset : offset + conn.size]
+		offset += conn.size
+		result = _lump_group([elements[pos] for pos in positions], n, node_values[rows].reshape(len(positions), n, 3))
+		np.add.at(lumped, rows, result.reshape(-1, 3))
+	return (node_ids, lumped)
@@ -0,0 +1,260 @@
+from PyMpc import *
+import numpy as np
+
+# A per-export cached index of selection sets and condition assignments.
+#
+# Each selection set (or condition assignment) is resolved only once per export
+# into sorted NumPy arrays of unique node and element ids, optionally bucketed
+# by partition, so that conditions, regions, monitors and model subsets
+# don't need to walk the same geometries and meshed domains again.
+#
+# The cache is active only during the export of the input files (see begin/end).
+# Outside of it, each request resolves the items from scratch.
+#
+# Usage:
+#	import opensees.utils.selection_index_utils as siu
+#	index = siu.get_selection_set(doc, selection_set_id)
+#	index = siu.get_condition(doc, condition)
+#	nodes = index.nodes
+#	for process_id, nodes in enumerate(index.node_buckets(doc)):
+#		...
+#	for process_id, nodes in enumerate(siu.split_nodes(doc, nodes)):
+#		...
+#	siu.write_id_commands(pinfo.out_file, pinfo.indent, nodes, ['fix {0} 1 1 1'])
+
+# the cache. key = ('S', selection set id), ('C', condition id)
+# or ('P', number of partitions) for the node-partition map of the node writer
+_cache = {}
+_active = False
+
+# write_id_commands: groups with less ids than this are written one command per id
+_MIN_LOOP_SIZE = 4
+# write_id_commands: number of ids per line in packed lists
+_IDS_PER_LINE = 20
+
+def begin():
+	'''
+	clears and activates the cache. To be called before exporting the input files
+	'''
+	global _active
+	_cache.clear()
+	_active = True
+
+def end():
+	'''
+	clears and deactivates the cache. To be called after exporting the input files
+	'''
+	global _active
+	_cache.clear()
+	_active = False
+
+def _unique(items):
+	return np.unique(np.asarray(items, dtype=np.int64))
+
+class selection_index:
+	'''
+	nodes and elements of a selection set or of a condition assignment:
+	- geometry_nodes: nodes of all elements in the selected edges/faces/solids, and nodes of the selected vertices
+	- geometry_elements: elements in the selected edges/faces/solids
+	- interaction_nodes: nodes of all elements in the selected interactions
+	- interaction_elements: elements in the selected interactions
+	- nodes: union of geometry_nodes and interaction_nodes
+	- elements: union of geometry_elements and interaction_elements
+	all arrays are sorted and without duplicates
+	'''
+	def __init__(self, doc, geometries, interactions):
+		
+		# walk geometries. geometries is a list of (geometry id, geometry subset) pairs
+		nodes = []
+		elements = []
+		def process_domain(domain):
+			for elem in domain.elements:
+				elements.append(elem.id)
+				nodes.extend(node.id for node in elem.nodes)
+		for geometry_id, geometry_subset in geometries:
+			mesh_of_geom = doc.mesh.meshedGeometries[geometry_id]
+			for domain_id in geometry_subset.edges:
+				process_domain(mesh_of_geom.edges[domain_id])
+			for domain_id in geometry_subset.faces:
+				process_domain(mesh_of_geom.faces[domain_id])
+			for domain_id in geometry_subset.solids:
+				process_domain(mesh_of_geom.solids[domain_id])
+			for domain_id in geometry_subset.vertices:
+				nodes.append(mesh_of_geom.vertices[domain_id].id)
+		self.geometry_nodes = _unique(nodes)
+		self.geometry_elements = _unique(elements)
+		
+		# walk interactions. interactions is a list of interaction ids
+		nodes = []
+		elements = []
+		for interaction_id in interactions:
+			process_domain(doc.mesh.meshedInteractions[interaction_id])
+		self.interaction_nodes = _unique(nodes)
+		self.interaction_elements = _unique(elements)
+		
+		# union
+		self.nodes = np.union1d(self.geometry_nodes, self.interaction_nodes)
+		self.elements = np.union1d(self.geometry_elements, self.interaction_elements)
+		
+		# partition buckets, computed on demand
+		self._node_buckets = {}
+		self._element_buckets = {}
+	
+	def node_buckets(self, doc, source = 'nodes'):
+		'''
+		returns a list of sorted node ids for each partition.
+		a node shared by more partitions is included in all of them.
+		source is the name of the node array to split ('nodes', 'geometry_nodes' or 'interaction_nodes')
+		'''
+		buckets = self._node_buckets.get(source, None)
+		if buckets is None:
+			buckets = split_nodes(doc, getattr(self, source))
+			self._node_buckets[source] = buckets
+		return buckets
+	
+	def element_buckets(self, doc, source = 'elements'):
+		'''
+		returns a list of sorted element ids for each partition.
+		source is the name of the element array to split ('elements', 'geometry_elements' or 'interaction_elements')
+		'''
+		buckets = self._element_buckets.get(source, None)
+		if buckets is None:
+			buckets = split_elements(doc, getattr(self, source))
+			self._element_buckets[source] = buckets
+		return buckets
+
+class _node_partition_map:
+	'''
+	the nodes of each partition, as decided by the node writer (see add_node_partitions):
+	- nodes: sorted ids of the nodes checked by the node writer
+	- partition_nodes: a sorted array of node ids for each partition
+	'''
+	def __init__(self, process_count):
+		self.nodes = np.zeros(0, dtype=np.int64)
+		self.partition_nodes = [np.zeros(0, dtype=np.int64) for i in range(process_count)]
+	
+	def add(self, nodes, partition_nodes):
+		self.nodes = np.union1d(self.nodes, _unique(nodes))
+		for process_id, items in enumerate(partition_nodes):
+			self.partition_nodes[process_id] = np.union1d(self.partition_nodes[process_id], _unique(items))
+
+def add_node_partitions(nodes, partition_nodes):
+	'''
+	stores the partitions of the nodes written by the node writer, so that split_nodes
+	takes them from the same source (isNodeOnParition) without checking them again.
+	- nodes: the ids of the checked nodes
+	- partition_nodes: a list of node ids for each partition
+	it does nothing if the cache is not active
+	'''
+	if not _active:
+		return
+	key = ('P', len(partition_nodes))
+	pmap = _cache.get(key, None)
+	if pmap is None:
+		pmap = _node_partition_map(len(partition_nodes))
+		_cache[key] = pmap
+	pmap.add(nodes, partition_nodes)
+
+def split_nodes(doc, nodes):
+	'''
+	splits a sorted array of node ids, and returns a list of node ids for each partition.
+	a node shared by more partitions is included in all of them.
+	the partitions of the nodes already written by the node writer are taken from it
+	(see add_node_partitions). The other nodes are checked with the partition data,
+	one partition at a time
+	'''
+	process_count = len(doc.mesh.partitionData.partitions)
+	if process_count <= 1:
+		return [nodes]
+	pmap = _cache.get(('P', process_count), None) if _active else None
+	if pmap is None:
+		pmap = _node_partition_map(process_count)
+	free = np.setdiff1d(nodes, pmap.nodes, assume_unique=True).tolist()
+	buckets = []
+	for process_id in range(process_count):
+		bucket = np.intersect1d(nodes, pmap.partition_nodes[process_id], assume_unique=True)
+		if len(free) > 0:
+			pdata = doc.mesh.partitionData
+			bucket = np.union1d(bucket, np.asarray([i for i in free if pdata.isNodeOnParition(i, process_id)], dtype=np.int64))
+		buckets.append(bucket)
+	return buckets
+
+def split_elements(doc, elements):
+	'''
+	splits a sorted array of element ids, and returns a list of element ids for each partition
+	'''
+	process_count = len(doc.mesh.partitionData.partitions)
+	if process_count <= 1:
+		return [elements]
+	pids = np.asarray([doc.mesh.partitionData.elementPartition(ele_id) for ele_id in elements.tolist()], dtype=np.int64)
+	order = np.argsort(pids, kind='stable')
+	bounds = np.searchsorted(pids[order], np.arange(process_count + 1))
+	return [elements[order[bounds[i]:bounds[i+1]]] for i in range(process_count)]
+
+def _get(key, builder):
+	if not _active:
+		return builder()
+	index = _cache.get(key, None)
+	if index is None:
+		index = builder()
+		_cache[key] = index
+	return index
+
+def get_selection_set(doc, selection_set_id):
+	'''
+	returns the selection_index of a selection set
+	'''
+	def builder():
+		selection_set = doc.selectionSets[selection_set_id]
+		return selection_index(doc, selection_set.geometries.items(), selection_set.interactions)
+	return _get(('S', selection_set_id), builder)
+
+def get_condition(doc, condition):
+	'''
+	returns the selection_index of the assignment of a condition
+	'''
+	def builder():
+		assignment = condition.assignment
+		return selection_index(doc,
+			[(geom.id, subset) for geom, subset in assignment.geometries.items()],
+			[inter.id for inter in assignment.interactions])
+	return _get(('C', condition.id), builder)
+
+def write_id_commands(out_file, indent, ids, commands, var = 'STKO_VAR_node_id'):
+	'''
+	writes a list of commands for each id in a compact form.
+	- commands: a list of format strings, where {0} is replaced by the id
+	- runs of consecutive ids are written as a Tcl for loop
+	- all other ids are written as a Tcl foreach loop over a packed list
+	- small groups are written as plain commands
+	ids must be sorted
+	'''
+	ids = np.asarray(ids, dtype=np.int64)
+	if len(ids) == 0:
+		return
+	def write_body(item):
+		for command in commands:
+			out_file.write('{}\t{}\n'.format(indent, command.format(item)))
+	def write_plain(items):
+		for item in items:
+			for command in commands:
+				out_file.write('{}{}\n'.format(indent, command.format(item)))
+	# split into runs of consecutive ids
+	runs = np.split(ids, np.flatnonzero(np.diff(ids) != 1) + 1)
+	scattered = []
+	for run in runs:
+		if len(run) < _MIN_LOOP_SIZE:
+			scattered.extend(run.tolist())
+			continue
+		out_file.write('{0}for {{set {1} {2}}} {{${1} <= {3}}} {{incr {1}}} {{\n'.format(indent, var, run[0], run[-1]))
+		write_body('${}'.format(var))
+		out_file.write('{}}}\n'.format(indent))
+	if len(scattered) < _MIN_LOOP_SIZE:
+		write_plain(scattered)
+		return
+	out_file.write('{}foreach {} {{\n'.format(indent, var))
+	for i in range(0, len(scattered), _IDS_PER_LINE):
+		out_file.write('{}\t{}\n'.format(indent, ' '.join(str(j) for j in scattered[i:i+_IDS_PER_LINE])))
+	out_file.write('{}}} {{\n'.format(indent))
+	write_body('${}'.format(var))
+	out_file.write('{}}}\n'.format(indent))
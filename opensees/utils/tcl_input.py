@@ -301,58 +301,66 @@ class process_info:
 		for k,v in command_names.items():
 			command_names_inv[v] = k
 		#
+		# all elements with remapped physical properties
+		mapped_pp_elements = set()
+		for values in self.mpco_cdata_utils.mapped_physical_properties.values():
+			mapped_pp_elements.update(values.keys())
+		#
 		# find all files
 		for file in os.listdir(self.out_dir):
 			if file.endswith('mpco.cdata'):
 				print('... Updating file: "{}"'.format(file))
-				with open('{}/{}'.format(self.out_dir, file), 'r+') as f:
-					#
-					# read lines, remove comments and empty lines
-					contents = [i for i in f.read().split('\n') if len(i) > 0 and not i[0].startswith('#')]
-					# split each line in words (watch out for ELEMENT_INFO!)
-					is_ele_info = False
-					lines = []
-					for line in contents:
-						if line.startswith('*'):
-							is_ele_info = False
-							if line.startswith('*ELEMENT_INFO'):
-								is_ele_info = True
-							lines.append([line])
-						else:
-							if is_ele_info:
-								# parse element info where names can contain white spaces...
-								lines.append(mpco_cdata_ele_info_reader(line).read_all())
-							else:
-								# split with white char
-								lines.append([i.strip() for i in line.split(' ') if i])
-					#lines = [ [i.strip() for i in line.split(' ') if i] for line in lines if line ]
-					#
-					# 1. parse and find all commands that need to be added for remapped elements.
-					#    Note: old lines are not removed, since in STKO the new lines overrides the old one
-					#          when using maps...
-					command_words = {
-						LOCAL_AXES : [],
-						SECTION_OFFSET : [],
-						BEAM_PROFILE_ASSIGNMENT : []
-					}
-					pars = UNKNOWN
-					for words in lines:
-						if len(words) == 0:
+				file_name = '{}/{}'.format(self.out_dir, file)
+				#
+				# stream the file line by line (skipping comments and empty lines),
+				# and keep only lines of remapped elements.
+				# 1. find all commands that need to be added for remapped elements.
+				#    Note: old lines are not removed, since in STKO the new lines overrides the old one
+				#          when using maps...
+				# 2. find lines of ELEMENT_INFO for remapped physical properties
+				command_words = {
+					LOCAL_AXES : [],
+					SECTION_OFFSET : [],
+					BEAM_PROFILE_ASSIGNMENT : []
+				}
+				mapped_lines = []
+				pars = UNKNOWN
+				with open(file_name, 'r') as f:
+					for line in f:
+						line = line.rstrip('\n')
+						stripped = line.strip()
+						if len(stripped) == 0 or line.startswith('#'):
+							continue
+						if stripped.startswith('*'):
+							pars = command_names_inv.get(stripped, UNKNOWN)
 							continue
-						w0 = words[0]
-						if w0.startswith('*'):
-							pars = command_names_inv.get(w0, UNKNOWN)
-						else:
-							if pars == ELEMENT_INFO or pars == BEAM_PROFILE_ASSIGNMENT or pars == LOCAL_AXES:
-								source_id = int(w0)
-								if source_id in self.mpco_cdata_utils.mapped_elements:
-									mapped = self.mpco_cdata_utils.mapped_elements[source_id]
-									if pars in command_words:
-										where = command_words[pars]
-										for i_mapped in mapped:
-											new_words = words[:]
-											new_words[0] = i_mapped
-											where.append(new_words)
+						if pars != ELEMENT_INFO and pars != BEAM_PROFILE_ASSIGNMENT and pars != LOCAL_AXES:
+							continue
+						# quick check on the source element id, before parsing the whole line
+						# (tolerate extra white spaces, as in the split words)
+						source_id = int(line.split(None, 1)[0])
+						is_mapped = source_id in self.mpco_cdata_utils.mapped_elements
+						if pars == ELEMENT_INFO:
+							if source_id in mapped_pp_elements:
+								# parse element info where names can contain white spaces...
+								# (ele_id, geom_id, geom_name, subgeom_id, type, ppid, ppname, epid, epname)
+								words = mpco_cdata_ele_info_reader(line).read_all()
+								ppid = words[5] # original physical property id
+								values = self.mpco_cdata_utils.mapped_physical_properties.get(ppid, None)
+								if values and source_id in values:
+									words[5] = values[source_id]
+									mapped_lines.append(words)
+						elif is_mapped:
+							# split with white char
+							words = [i.strip() for i in line.split(' ') if i]
+							where = command_words[pars]
+							for i_mapped in self.mpco_cdata_utils.mapped_elements[source_id]:
+								new_words = words[:]
+								new_words[0] = i_mapped
+								where.append(new_words)
+				#
+				# append the new data at the end of the file
+				with open(file_name, 'a') as f:
 					first_done = False
 					for k, v in command_words.items():
 						if len(v) > 0:
@@ -363,27 +371,6 @@ class process_info:
 							for iv in v:
 								f.write(' '.join([str(iw) for iw in iv]))
 								f.write('\n')
-					#
-					# 2. add lines of ELEMENT_INFO for remapped physical properties
-					pars = UNKNOWN
-					mapped_lines = []
-					for words in lines:
-						if len(words) == 0:
-							continue
-						w0 = words[0]
-						if w0.startswith('*'):
-							pars = command_names_inv.get(w0, UNKNOWN)
-						else:
-							if pars == ELEMENT_INFO:
-								# (ele_id, geom_id, geom_name, subgeom_id, type, ppid, ppname, epid, epname)
-								ppid = words[5] # original physical property id
-								values = self.mpco_cdata_utils.mapped_physical_properties.get(ppid, None)
-								if values:
-									ele_id = int(words[0]) # it is a string from the read_all !
-									if ele_id in values:
-										new_ppid = values[ele_id]
-										words[5] = new_ppid
-										mapped_lines.append(words)
 					if len(mapped_lines) > 0:
 						f.write(
 							'\n#Begin ELEMENT INFO data (FOR AUTO-REMAPPED PROPERTIES).\n'
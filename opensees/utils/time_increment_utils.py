@@ -135,25 +135,64 @@ def process_document(pinfo):
 				all_eles.append(element.id)
 		write_loop(all_eles, pinfo.indent)
 	
-	# write custom functions
+	# write custom functions.
+	# all target elements are registered under one grouped parameter for each
+	# time-increment argument (dTime, dTimeCommit, dTimeInitial), so that each new
+	# time increment requires a single updateParameter call.
+	# the grouped parameters are (re-)created at the first increment of each stage,
+	# only with the target elements that are currently in the domain (staged models),
+	# and after the state is restored from a checkpoint (a stage may resume at a later increment).
 	pinfo.out_file.write('''#
 # Time-Increment Utility Functions.
+# Define a function to (re-)create the grouped time-increment parameters
+proc STKO_DT_UTIL_CreateParameters {{}} {{
+	global STKO_VAR_TimeIncrementUpdateTargets
+	set all_param_tags [getParamTags]
+	foreach param_tag {{{0} {1} {2}}} {{
+		if {{[lsearch -exact $all_param_tags $param_tag] != -1}} {{
+			remove parameter $param_tag
+		}}
+		parameter $param_tag
+	}}
+	foreach ele_id [getEleTags] {{
+		set in_domain($ele_id) 1
+	}}
+	foreach ele_id $STKO_VAR_TimeIncrementUpdateTargets {{
+		if {{[info exists in_domain($ele_id)]}} {{
+			addToParameter {0} element $ele_id dTime
+			addToParameter {1} element $ele_id dTimeCommit
+			addToParameter {2} element $ele_id dTimeInitial
+		}}
+	}}
+}}
 # Define a function to be called before the current time step
-proc STKO_DT_UTIL_OnBeforeAnalyze {} {
+proc STKO_DT_UTIL_OnBeforeAnalyze {{}} {{
 	global STKO_VAR_increment
 	global STKO_VAR_time_increment
 	global STKO_VAR_TimeIncrementUpdateTargets
-	# update the initial time and the committed time for the first time
-	foreach ele_id $STKO_VAR_TimeIncrementUpdateTargets {
-		if {$STKO_VAR_increment == 1} {
-			setParameter -val $STKO_VAR_time_increment -ele $ele_id dTimeCommit
-			setParameter -val $STKO_VAR_time_increment -ele $ele_id dTimeInitial
-		}
-		# always update the current time increment
-		setParameter -val $STKO_VAR_time_increment -ele $ele_id dTime
-	}
-}
+	if {{[llength $STKO_VAR_TimeIncrementUpdateTargets] == 0}} {{
+		return
+	}}
+	# create the grouped parameters and update the initial time
+	# and the committed time for the first time
+	if {{$STKO_VAR_increment == 1}} {{
+		STKO_DT_UTIL_CreateParameters
+		updateParameter {1} $STKO_VAR_time_increment
+		updateParameter {2} $STKO_VAR_time_increment
+	}}
+	# always update the current time increment
+	updateParameter {0} $STKO_VAR_time_increment
+}}
 # add it to the list of functions
 lappend STKO_VAR_OnBeforeAnalyze_CustomFunctions STKO_DT_UTIL_OnBeforeAnalyze
+# Define a function to be called after the state is restored from a checkpoint
+proc STKO_DT_UTIL_OnRestore {{}} {{
+	global STKO_VAR_TimeIncrementUpdateTargets
+	if {{[llength $STKO_VAR_TimeIncrementUpdateTargets] > 0}} {{
+		STKO_DT_UTIL_CreateParameters
+	}}
+}}
+# add it to the list of functions
+lappend STKO_VAR_OnRestore_CustomFunctions STKO_DT_UTIL_OnRestore
 
-''')
\ No newline at end of file
+'''.format(ParameterManager.IMPLEX_dT, ParameterManager.IMPLEX_dTcommit, ParameterManager.IMPLEX_dT0))
\ No newline at end of file
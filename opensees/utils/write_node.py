@@ -1,5 +1,6 @@
 import importlib
 import opensees.utils.tcl_input as tclin
+import opensees.utils.selection_index_utils as siu
 from opensees.utils.tcl_input import element_nodal_dims as element_nodal_dims_t
 import PyMpc
 import PyMpc.App
@@ -376,6 +377,7 @@ def write_node_partition (doc, pinfo, node_file):
 	'''
 	
 	process_block_count = 0
+	partition_nodes = [[] for i in range(len(doc.mesh.partitionData.partitions))]
 	for process_id in range(len(doc.mesh.partitionData.partitions)):
 		pinfo.setProcessId(process_id)
 		first_done = False
@@ -385,6 +387,7 @@ def write_node_partition (doc, pinfo, node_file):
 				node_id = node_with_age.id
 				if not doc.mesh.partitionData.isNodeOnParition(node_id, process_id):
 					continue # skip it, the node is not in this partition
+				partition_nodes[process_id].append(node_id)
 				if (pinfo.node_subset is not None) and (node_id not in pinfo.node_subset):
 					continue # skip it in case of staged models if not in current stage
 				do_write_mass = (process_id == doc.mesh.partitionData.nodePartition(node_id))
@@ -409,6 +412,8 @@ def write_node_partition (doc, pinfo, node_file):
 			node_file.write('{}{}'.format(pinfo.indent, '}'))
 		# back to default
 		pinfo.setProcessId(0) 
+	# store the node partitions for the other writers (fix, sp, ...)
+	siu.add_node_partitions([node_with_age.id for v in pinfo.inv_map.values() for node_with_age in v], partition_nodes)
 
 def __check_model (write_node_not_assigned_boolean, node_file, pinfo, comment = 0):
 	if write_node_not_assigned_boolean:
@@ -451,6 +456,7 @@ def write_node_not_assigned_partition (doc, pinfo, node_file):
 	write node not assigned, at the end of the nodes assigned
 	'''
 	process_block_count = 0
+	partition_nodes = [[] for i in range(len(doc.mesh.partitionData.partitions))]
 	for process_id in range(len(doc.mesh.partitionData.partitions)):
 		pinfo.setProcessId(process_id)
 		first_done = False
@@ -459,6 +465,7 @@ def write_node_not_assigned_partition (doc, pinfo, node_file):
 			if not node_id in pinfo.node_to_model_map:
 				if not doc.mesh.partitionData.isNodeOnParition(node_id, process_id):
 					continue # skip it, the node is not in this partition
+				partition_nodes[process_id].append(node_id)
 				if (pinfo.node_subset is not None) and (node_id not in pinfo.node_subset):
 					continue # skip it in case of staged models if not in current stage
 				do_write_mass = (process_id == doc.mesh.partitionData.nodePartition(node_id))
@@ -480,6 +487,8 @@ def write_node_not_assigned_partition (doc, pinfo, node_file):
 			node_file.write('{}{}'.format(pinfo.indent, '}'))
 		# back to default
 		pinfo.setProcessId(0)
+	# store the node partitions for the other writers (fix, sp, ...)
+	siu.add_node_partitions([node_id for node_id in doc.mesh.nodes if not node_id in pinfo.node_to_model_map], partition_nodes)
 	# set them all to 3-3
 	for node_id in doc.mesh.nodes:
 		if not node_id in pinfo.node_to_model_map: